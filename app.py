@@ -1,11 +1,22 @@
-import streamlit as st
-import yfinance as yf
+import logging
 import pandas as pd
-import numpy as np
-from datetime import datetime, timedelta, timezone
-
-KST = timezone(timedelta(hours=9))
-
+import streamlit as st
+from datetime import datetime
+
+from scanner import sector_names
+from scanner.alerts import AlertState
+from scanner.breadth import LEVEL_NAMES, snapshot_breadth
+from scanner.market import KST
+from scanner.metrics import ScanMetrics
+from scanner.render import cards_html
+from scanner.scheduler import ScanScheduler
+
+MAX_AGE = 300  # 저장소가 이보다 최근에 갱신됐다면 네트워크 없이 바로 읽는다
+TOP_N = 300  # 필터 결과 상한
+PAGE_SIZE = 20  # 한 페이지 카드 수
+MIN_SCORES = {"전체 보기": 0, "50점 이상": 50, "70점 이상": 70}
+
+logging.basicConfig(level=logging.INFO, format="%(message)s")  # 스캔 계측 JSON 로그
 st.set_page_config(page_title="홍익 미래유산 검색기", layout="centered")
 
 st.markdown("""
@@ -115,258 +126,33 @@ st.markdown("""
 </div>
 """, unsafe_allow_html=True)
 
-# ===== 종목 + 섹터 매핑 =====
-SECTOR_MAP = {
-    # 반도체
-    "005930.KS": ("삼성전자", "반도체"),
-    "000660.KS": ("SK하이닉스", "반도체"),
-    "009150.KS": ("삼성전기", "반도체"),
-    "034220.KS": ("LG디스플레이", "반도체"),
-    "067310.KQ": ("하나마이크론", "반도체"),
-    "058470.KQ": ("리노공업", "반도체"),
-    "036930.KQ": ("주성엔지니어링", "반도체"),
-    "240810.KQ": ("원익IPS", "반도체"),
-    "005290.KQ": ("동진쎄미켐", "반도체"),
-    "089030.KQ": ("테크윙", "반도체"),
-    "403870.KQ": ("HPSP", "반도체"),
-    "095340.KQ": ("ISC", "반도체"),
-    "039030.KQ": ("이오테크닉스", "반도체"),
-    "140860.KQ": ("파크시스템스", "반도체"),
-    # 2차전지
-    "373220.KS": ("LG에너지솔루션", "2차전지"),
-    "051910.KS": ("LG화학", "2차전지"),
-    "006400.KS": ("삼성SDI", "2차전지"),
-    "003670.KS": ("포스코퓨처엠", "2차전지"),
-    "247540.KQ": ("에코프로비엠", "2차전지"),
-    "086520.KQ": ("에코프로", "2차전지"),
-    "383310.KQ": ("에코프로에이치엔", "2차전지"),
-    "078600.KQ": ("대주전자재료", "2차전지"),
-    "009830.KS": ("한화솔루션", "2차전지"),
-    # 자동차
-    "005380.KS": ("현대차", "자동차"),
-    "000270.KS": ("기아", "자동차"),
-    "012330.KS": ("현대모비스", "자동차"),
-    "004020.KS": ("현대제철", "자동차"),
-    "161390.KS": ("한국타이어앤테크놀로지", "자동차"),
-    "329180.KS": ("현대오토에버", "자동차"),
-    # 바이오
-    "207940.KS": ("삼성바이오로직스", "바이오"),
-    "068270.KS": ("셀트리온", "바이오"),
-    "000100.KS": ("유한양행", "바이오"),
-    "128940.KS": ("한미약품", "바이오"),
-    "326030.KS": ("SK바이오팜", "바이오"),
-    "028300.KQ": ("HLB", "바이오"),
-    "196170.KQ": ("알테오젠", "바이오"),
-    "145020.KQ": ("휴젤", "바이오"),
-    "068760.KQ": ("셀트리온제약", "바이오"),
-    "141080.KQ": ("레고켐바이오", "바이오"),
-    "298380.KQ": ("에이비엘바이오", "바이오"),
-    "214150.KQ": ("클래시스", "바이오"),
-    # IT/플랫폼
-    "035420.KS": ("NAVER", "IT/플랫폼"),
-    "035720.KS": ("카카오", "IT/플랫폼"),
-    "018260.KS": ("삼성에스디에스", "IT/플랫폼"),
-    "377300.KQ": ("카카오페이", "IT/플랫폼"),
-    "042000.KQ": ("카페24", "IT/플랫폼"),
-    "067160.KQ": ("아프리카TV", "IT/플랫폼"),
-    # 게임/엔터
-    "036570.KS": ("엔씨소프트", "게임/엔터"),
-    "259960.KQ": ("크래프톤", "게임/엔터"),
-    "263750.KQ": ("펄어비스", "게임/엔터"),
-    "293490.KQ": ("카카오게임즈", "게임/엔터"),
-    "112040.KQ": ("위메이드", "게임/엔터"),
-    "352820.KQ": ("하이브", "게임/엔터"),
-    "041510.KQ": ("에스엠", "게임/엔터"),
-    "035900.KQ": ("JYP Ent.", "게임/엔터"),
-    "253450.KQ": ("스튜디오드래곤", "게임/엔터"),
-    # 금융
-    "105560.KS": ("KB금융", "금융"),
-    "055550.KS": ("신한지주", "금융"),
-    "086790.KS": ("하나금융지주", "금융"),
-    "316140.KS": ("우리금융지주", "금융"),
-    "024110.KS": ("기업은행", "금융"),
-    "138040.KS": ("메리츠금융지주", "금융"),
-    "000810.KS": ("삼성화재", "금융"),
-    "032830.KS": ("삼성생명", "금융"),
-    "006800.KS": ("미래에셋증권", "금융"),
-    "016360.KS": ("삼성증권", "금융"),
-    # 조선/방산
-    "009540.KS": ("한국조선해양", "조선/방산"),
-    "267250.KS": ("현대중공업", "조선/방산"),
-    "042660.KS": ("한화오션", "조선/방산"),
-    "010140.KS": ("삼성중공업", "조선/방산"),
-    "047810.KS": ("한국항공우주", "조선/방산"),
-    # 철강/소재
-    "005490.KS": ("POSCO홀딩스", "철강/소재"),
-    "010130.KS": ("고려아연", "철강/소재"),
-    "011170.KS": ("롯데케미칼", "철강/소재"),
-    "003410.KS": ("쌍용C&E", "철강/소재"),
-    "011790.KS": ("SKC", "철강/소재"),
-    "357780.KQ": ("솔브레인", "철강/소재"),
-    # 유통/소비재
-    "139480.KS": ("이마트", "유통/소비재"),
-    "002790.KS": ("아모레퍼시픽", "유통/소비재"),
-    "271560.KS": ("오리온", "유통/소비재"),
-    "021240.KS": ("코웨이", "유통/소비재"),
-    "007070.KS": ("GS리테일", "유통/소비재"),
-    "008770.KS": ("호텔신라", "유통/소비재"),
-    # 에너지/인프라
-    "096770.KS": ("SK이노베이션", "에너지/인프라"),
-    "010950.KS": ("S-Oil", "에너지/인프라"),
-    "015760.KS": ("한국전력", "에너지/인프라"),
-    "036460.KS": ("한국가스공사", "에너지/인프라"),
-    "034020.KS": ("두산에너빌리티", "에너지/인프라"),
-    # 지주/통신
-    "034730.KS": ("SK", "지주/통신"),
-    "003550.KS": ("LG", "지주/통신"),
-    "028260.KS": ("삼성물산", "지주/통신"),
-    "017670.KS": ("SK텔레콤", "지주/통신"),
-    "030200.KS": ("KT", "지주/통신"),
-    "078930.KS": ("GS", "지주/통신"),
-    "006260.KS": ("LS", "지주/통신"),
-    # 물류/운송
-    "011200.KS": ("HMM", "물류/운송"),
-    "003490.KS": ("대한항공", "물류/운송"),
-    "180640.KS": ("한진칼", "물류/운송"),
-    "047050.KS": ("포스코인터내셔널", "물류/운송"),
-}
-
 # ===== 필터 UI =====
 col1, col2 = st.columns(2)
 with col1:
-    sector_options = ["전체"] + sorted(set(v[1] for v in SECTOR_MAP.values()))
+    sector_options = ["전체"] + sector_names()
     selected_sector = st.selectbox("📂 섹터 필터", sector_options)
 with col2:
-    min_score = st.selectbox("🎯 최소 점수", ["전체 보기", "50점 이상", "70점 이상"])
+    min_score = st.selectbox("🎯 최소 점수", list(MIN_SCORES))
 
 
 # ===== 분석 엔진 =====
-@st.cache_data(ttl=300)
-def run_analysis():
-    tickers = list(SECTOR_MAP.keys())
-    all_results = []
-    sector_changes = {}
-
-    batch_size = 50
-    for i in range(0, len(tickers), batch_size):
-        batch = tickers[i:i + batch_size]
-        try:
-            data = yf.download(
-                batch, period="30d", group_by="ticker",
-                progress=False, threads=True
-            )
-            if data.empty:
-                continue
-
-            for ticker in batch:
-                try:
-                    name, sector = SECTOR_MAP[ticker]
-
-                    if len(batch) == 1:
-                        df = data.copy()
-                    else:
-                        df = data[ticker].copy()
-
-                    df = df.dropna(subset=["Close"])
-                    if len(df) < 10:
-                        continue
-
-                    close = df["Close"].values
-                    volume = df["Volume"].values
-                    opens = df["Open"].values
-
-                    latest_close = close[-1]
-                    latest_volume = volume[-1]
-
-                    if len(close) >= 2 and close[-2] > 0:
-                        change_pct = ((close[-1] - close[-2]) / close[-2]) * 100
-                    else:
-                        change_pct = 0.0
-
-                    # 시그널 1: 거래량 급증 (20일 평균 대비)
-                    vol_score = 0
-                    vol_ratio = 0.0
-                    if len(volume) >= 21:
-                        avg_vol_20 = np.mean(volume[-21:-1])
-                        if avg_vol_20 > 0:
-                            vol_ratio = latest_volume / avg_vol_20
-                            if vol_ratio >= 5.0: vol_score = 30
-                            elif vol_ratio >= 3.0: vol_score = 25
-                            elif vol_ratio >= 2.0: vol_score = 20
-                            elif vol_ratio >= 1.5: vol_score = 15
-                            elif vol_ratio >= 1.2: vol_score = 10
+@st.cache_resource
+def scheduler():
+    """장 시간에 맞춰 뒤에서 스캔해 결과를 게시하는 워커 (프로세스당 하나, 모든 세션 공유)"""
+    return ScanScheduler(max_age=MAX_AGE).start()
 
-                    # 시그널 2: 연속 N일 거래량 증가
-                    consec_score = 0
-                    consec_days = 0
-                    for j in range(len(volume) - 1, 0, -1):
-                        if volume[j] > volume[j - 1]:
-                            consec_days += 1
-                        else:
-                            break
-                    if consec_days >= 5: consec_score = 20
-                    elif consec_days >= 4: consec_score = 16
-                    elif consec_days >= 3: consec_score = 12
-                    elif consec_days >= 2: consec_score = 8
 
-                    # 시그널 3: 눌림목 후 반등
-                    bounce_score = 0
-                    ma_distance = 0.0
-                    if len(close) >= 20:
-                        ma20 = np.mean(close[-20:])
-                        if ma20 > 0:
-                            ma_distance = ((latest_close - ma20) / ma20) * 100
-                            is_bullish = close[-1] > opens[-1]
-                            is_near_ma = -3.0 <= ma_distance <= 5.0
-                            prev_was_down = len(close) >= 5 and close[-3] > close[-2]
-                            if is_near_ma and is_bullish:
-                                bounce_score = 30 if prev_was_down else 20
-                            elif is_near_ma:
-                                bounce_score = 10
-
-                    if sector not in sector_changes:
-                        sector_changes[sector] = []
-                    sector_changes[sector].append(change_pct)
-
-                    all_results.append({
-                        "종목명": name,
-                        "섹터": sector,
-                        "현재가": int(latest_close),
-                        "등락률": round(change_pct, 2),
-                        "거래량": int(latest_volume),
-                        "거래량비율": round(vol_ratio, 1),
-                        "연속증가일": consec_days,
-                        "MA20괴리": round(ma_distance, 1),
-                        "vol_score": vol_score,
-                        "consec_score": consec_score,
-                        "bounce_score": bounce_score,
-                    })
-                except Exception:
-                    continue
-        except Exception:
-            continue
-
-    if not all_results:
-        return pd.DataFrame()
-
-    result_df = pd.DataFrame(all_results)
-
-    # 시그널 4: 섹터 동반 상승
-    sector_scores = {}
-    for sector, changes in sector_changes.items():
-        up_ratio = sum(1 for c in changes if c > 0) / len(changes) if changes else 0
-        if up_ratio >= 0.8: sector_scores[sector] = 20
-        elif up_ratio >= 0.6: sector_scores[sector] = 15
-        elif up_ratio >= 0.4: sector_scores[sector] = 10
-        else: sector_scores[sector] = 0
+def run_analysis():
+    """게시된 최신 결과 스냅샷만 읽는다 — 페이지 요청이 스캔을 일으키지 않는다"""
+    return scheduler().latest()
 
-    result_df["sector_score"] = result_df["섹터"].map(sector_scores).fillna(0).astype(int)
-    result_df["종합점수"] = (
-        result_df["vol_score"] + result_df["consec_score"]
-        + result_df["bounce_score"] + result_df["sector_score"]
-    )
 
-    return result_df
+@st.cache_data(max_entries=4)
+def market_breadth(created, _snapshot):
+    """스냅샷마다 한 번 — 섹터 · 세부업종 · 시장별 상승 비율 (단순 · 거래량 · 시총 가중)"""
+    table = snapshot_breadth(_snapshot)
+    return pd.concat({LEVEL_NAMES[level]: table.loc[level].sort_values("상승비율", ascending=False)
+                      for level in table.index.unique("level")}, names=["단계", "그룹"])
 
 
 # ===== 실행 =====
@@ -379,26 +165,51 @@ try:
         unsafe_allow_html=True,
     )
 
-    result_df = run_analysis()
+    snapshot = run_analysis()
 
-    if result_df.empty:
+    if not len(snapshot):
         status_placeholder.warning("📭 데이터를 불러올 수 없습니다. 잠시 후 다시 시도해주세요.")
     else:
-        # 필터 적용
-        if selected_sector != "전체":
-            result_df = result_df[result_df["섹터"] == selected_sector]
-
-        if min_score == "50점 이상":
-            result_df = result_df[result_df["종합점수"] >= 50]
-        elif min_score == "70점 이상":
-            result_df = result_df[result_df["종합점수"] >= 70]
-
-        result_df = result_df.sort_values("종합점수", ascending=False).head(20)
+        render_metrics = ScanMetrics("app.render")
+
+        # 필터 적용 (스냅샷 인덱스의 점수순 행 번호 슬라이스 — 전체 표를 다시 훑지 않는다)
+        with render_metrics.stage("filter"):
+            rows = snapshot.select(
+                sector=None if selected_sector == "전체" else selected_sector,
+                min_score=MIN_SCORES[min_score],
+                limit=TOP_N,
+            )
 
         status_placeholder.empty()
 
-        now_kst = datetime.now(KST)
-        st.success(f"✅ {now_kst.strftime('%Y.%m.%d %H:%M')} 분석 완료 | {len(result_df)}종목 감지")
+        now_kst = datetime.fromtimestamp(snapshot.created, KST)
+        st.success(f"✅ {now_kst.strftime('%Y.%m.%d %H:%M')} 분석 완료 | {len(rows)}종목 감지")
+
+        # 이 세션이 지난번에 본 스냅샷 대비 변동 (새 스냅샷일 때만 비교, 첫 방문은 비교 대상 없음)
+        if st.session_state.get("seen_created") != snapshot.created:
+            seen = st.session_state.get("alert_state")
+            diff, st.session_state["alert_state"] = (seen or AlertState()).diff(snapshot)
+            st.session_state["alert_diff"] = diff if seen is not None else None
+            st.session_state["seen_created"] = snapshot.created
+        diff = st.session_state.get("alert_diff")
+        if diff is not None and (len(diff.new) or len(diff.upgraded) or len(diff.dropped)):
+            with st.expander(f"🔔 지난 확인 이후 변동 — 신규 {len(diff.new)} · 승격 {len(diff.upgraded)} · "
+                             f"이탈 {len(diff.dropped)}", expanded=True):
+                if len(diff.new):
+                    st.caption("🆕 신규 진입")
+                    st.markdown(cards_html(snapshot.frame(diff.new)), unsafe_allow_html=True)
+                if len(diff.upgraded):
+                    st.caption("⬆️ 등급 상승")
+                    st.markdown(cards_html(snapshot.frame(diff.upgraded)), unsafe_allow_html=True)
+                if len(diff.dropped):
+                    st.caption("📉 이탈")
+                    st.dataframe(diff.dropped[["종목명", "섹터", "알린점수", "현재점수"]],
+                                 hide_index=True, use_container_width=True)
+
+        with st.expander("🏭 시장 폭 (섹터 · 세부업종 · 시장)"):
+            st.dataframe(market_breadth(snapshot.created, snapshot), use_container_width=True,
+                         column_config={c: st.column_config.NumberColumn(format="%.2f")
+                                        for c in ("상승비율", "거래량가중", "시총가중")})
 
         # 시그널 범례
         st.markdown("""
@@ -410,44 +221,17 @@ try:
         </div>
         """, unsafe_allow_html=True)
 
-        # 카드형 결과 출력
-        for _, row in result_df.iterrows():
-            score = row["종합점수"]
-
-            if score >= 70:
-                card_class = "score-high"
-                grade = "🔥"
-            elif score >= 50:
-                card_class = "score-mid"
-                grade = "⚡"
-            else:
-                card_class = "score-low"
-                grade = "💤"
-
-            tags = ""
-            if row["vol_score"] > 0:
-                tags += f'<span class="signal-tag tag-vol">📊 x{row["거래량비율"]}</span>'
-            if row["consec_score"] > 0:
-                tags += f'<span class="signal-tag tag-consec">📈 {row["연속증가일"]}일연속</span>'
-            if row["bounce_score"] > 0:
-                tags += f'<span class="signal-tag tag-bounce">🔄 MA{row["MA20괴리"]:+.1f}%</span>'
-            if row["sector_score"] > 0:
-                tags += f'<span class="signal-tag tag-sector">🏭 {row["섹터"]}</span>'
-
-            change_color = "#ff4444" if row["등락률"] >= 0 else "#4488ff"
-            change_str = f"{row['등락률']:+.2f}%"
-
-            st.markdown(f"""
-            <div class="score-card {card_class}">
-                <b>{grade} {row['종목명']}</b>
-                <span style="float:right; color:#ffd700; font-weight:bold;">{score}점</span><br>
-                <span style="color:#aaa;">{row['섹터']}</span> ·
-                <span>{row['현재가']:,}원</span> ·
-                <span style="color:{change_color}; font-weight:bold;">{change_str}</span> ·
-                <span style="color:#aaa;">거래량 {row['거래량']:,}</span><br>
-                {tags}
-            </div>
-            """, unsafe_allow_html=True)
+        # 카드형 결과 출력 (한 페이지를 HTML 하나로)
+        n_pages = max(1, -(-len(rows) // PAGE_SIZE))
+        page = 1
+        if n_pages > 1:
+            page = st.selectbox("📄 페이지", range(1, n_pages + 1),
+                                format_func=lambda p: f"{p} / {n_pages}")
+        page_df = snapshot.frame(rows[(page - 1) * PAGE_SIZE: page * PAGE_SIZE])
+        with render_metrics.stage("render"):
+            st.markdown(cards_html(page_df), unsafe_allow_html=True)
+        render_metrics.count("cards", len(page_df))
+        render_metrics.emit(sector=selected_sector, min_score=min_score, page=page)
 
         st.markdown("""
         <div class="disclaimer">
@@ -0,0 +1,41 @@
+"""
+홍익 미래유산 검색기 - 스캐너 코어
+
+    from scanner import run_analysis
+    result_df = run_analysis()
+"""
+
+from scanner.core import load_panel, run_analysis
+from scanner.metrics import ScanMetrics
+from scanner.providers import (
+    CSVStoreProvider,
+    DataProvider,
+    ReplayProvider,
+    YFinanceProvider,
+)
+from scanner.schema import RESULT_COLUMNS, SCORE_COLUMN, grade
+from scanner.scoring import score_frame, score_panel
+from scanner.snapshot import Snapshot
+from scanner.store import OHLCVStore
+from scanner.universe import SECTOR_MAP, Universe, load_universe, sector_names
+
+__all__ = [
+    "load_panel",
+    "run_analysis",
+    "ScanMetrics",
+    "DataProvider",
+    "YFinanceProvider",
+    "CSVStoreProvider",
+    "ReplayProvider",
+    "RESULT_COLUMNS",
+    "SCORE_COLUMN",
+    "grade",
+    "score_frame",
+    "score_panel",
+    "Snapshot",
+    "OHLCVStore",
+    "SECTOR_MAP",
+    "Universe",
+    "load_universe",
+    "sector_names",
+]
@@ -0,0 +1,233 @@
+"""
+알림 상태 저장소 — 스캔 사이의 변동만 알린다
+
+알림을 보낸 종목을 종목코드 키로 기록해 두고(알릴 때의 점수 · 등급 · 시그널 태그 ·
+알린 시각), 새 스냅샷과 비교해 바뀐 것만 돌려준다.
+
+    신규   threshold 이상으로 처음 올라온 종목
+    승격   알린 뒤 등급이 올라간 종목 (⚡ → 🔥)
+    이탈   알린 종목 중 threshold - DROP_MARGIN 아래로 내려갔거나 결과에서 빠진 종목
+
+비교는 이전 상태의 종목코드 인덱스에 현재 종목코드를 해시 조인(get_indexer)
+한 번으로 붙여 배열 연산으로 한다. 경계 점수에서 오르내리는 종목이 신규 · 이탈을
+되풀이하지 않도록 이탈은 DROP_MARGIN 만큼 아래로 내려가야 센다.
+
+상태는 키(구독자 chat_id 등)마다 <key>.npz 하나다. 보내는 쪽은 두 단계로 쓴다 —
+diff() 로 비교만 하고, 전송에 성공한 뒤에 commit() 으로 기록한다. 전송이 실패하면
+기록하지 않으므로 다음 실행에서 같은 변동을 다시 보낸다. commit 은 잠금을 잡고 버전을
+확인해 원자적으로 바꿔 쓴다 — diff 이후 다른 프로세스가 먼저 기록했으면 덮어쓰지 않는다.
+"""
+
+import os
+import time
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from scanner.schema import HIGH_SCORE, MID_SCORE
+from scanner.store import file_lock
+from scanner.universe import as_universe
+
+DEFAULT_ALERT_DIR = os.environ.get("SCANNER_ALERT_DIR", ".scanner_cache/alerts")
+THRESHOLD = 60
+DROP_MARGIN = 5
+GRADES = np.array(["💤", "⚡", "🔥"])
+
+# 시그널 태그 비트 (점수 필드 > 0 이면 켠다)
+TAGS = (
+    ("vol_score", "📊거래량"),
+    ("consec_score", "📈연속증가"),
+    ("bounce_score", "🔄눌림목"),
+    ("sector_score", "🏭섹터"),
+)
+STATE_DTYPE = np.dtype([("score", np.int32), ("grade", np.int8), ("tags", np.uint8), ("alerted", np.float64)])
+
+AlertDiff = namedtuple("AlertDiff", "new upgraded dropped")
+AlertDiff.__doc__ = """
+new · upgraded = 스냅샷 행 번호 (점수 내림차순),
+dropped = 이탈 종목 DataFrame (종목코드 · 종목명 · 섹터 · 알린점수 · 현재점수, 빠졌으면 NaN)
+"""
+
+
+def has_changes(diff):
+    return bool(len(diff.new) or len(diff.upgraded) or len(diff.dropped))
+
+
+def grade_codes(score):
+    """종합점수 → 등급 번호 (0 💤 / 1 ⚡ / 2 🔥)"""
+    score = np.asarray(score)
+    return (score >= MID_SCORE).astype(np.int8) + (score >= HIGH_SCORE)
+
+
+def tag_bits(records):
+    """스냅샷 레코드 → 시그널 태그 비트마스크"""
+    bits = np.zeros(len(records), dtype=np.uint8)
+    for bit, (field, _) in enumerate(TAGS):
+        bits |= (np.asarray(records[field]) > 0).astype(np.uint8) << bit
+    return bits
+
+
+def tag_labels(bits):
+    return [label for bit, (_, label) in enumerate(TAGS) if int(bits) >> bit & 1]
+
+
+def snapshot_keys(snapshot, universe=None):
+    """
+    스냅샷 행마다 상태 키(종목코드). 결과 DataFrame 에서 만든 스냅샷처럼 종목코드가
+    없으면 유니버스의 종목명으로 찾고, 그래도 없으면 종목명을 키로 쓴다.
+    """
+    if snapshot.categories["ticker"]:
+        return np.asarray(snapshot.tickers, dtype=object)
+    universe = as_universe(universe)
+    names = np.asarray(snapshot.column("종목명"), dtype=object)
+    by_name = pd.Series(universe.tickers, index=universe.names)
+    by_name = by_name[~by_name.index.duplicated()]
+    keys = by_name.reindex(names).to_numpy(dtype=object)
+    missing = pd.isna(keys)
+    keys[missing] = names[missing]
+    return keys
+
+
+class AlertState:
+    """알린 종목 표 — 종목코드 · 종목명 · 섹터와 STATE_DTYPE 레코드 (version: 기록 횟수)"""
+
+    def __init__(self, tickers=(), names=(), sectors=(), records=None, version=0):
+        self.tickers = np.asarray(tickers, dtype=object)
+        self.names = np.asarray(names, dtype=object)
+        self.sectors = np.asarray(sectors, dtype=object)
+        self.records = np.zeros(len(self.tickers), dtype=STATE_DTYPE) if records is None else records
+        self.version = version
+
+    def __len__(self):
+        return len(self.tickers)
+
+    def take(self, rows):
+        return AlertState(self.tickers[rows], self.names[rows], self.sectors[rows], self.records[rows])
+
+    def diff(self, snapshot, keys=None, threshold=THRESHOLD, now=None):
+        """
+        스냅샷과 비교 → (AlertDiff, 갱신된 AlertState).
+        keys = 스냅샷 행마다 종목코드 (생략하면 snapshot_keys).
+        """
+        now = time.time() if now is None else now
+        keys = snapshot_keys(snapshot) if keys is None else np.asarray(keys, dtype=object)
+        score = np.asarray(snapshot.records["total"], dtype=np.int64)
+        grade = grade_codes(score)
+        above = (score >= threshold) & ~pd.Index(keys).duplicated()  # 같은 키는 첫 행만
+
+        # 현재 행 → 이전 상태 행 (없으면 -1), 이전 상태 행 → 현재 행 (없으면 -1)
+        prev = pd.Index(self.tickers).get_indexer(keys)
+        seen = prev >= 0
+        cur = np.full(len(self), -1, dtype=np.int64)
+        cur[prev[seen]] = np.flatnonzero(seen)
+
+        new = above & ~seen
+        upgraded = np.zeros(len(keys), dtype=bool)
+        upgraded[seen] = above[seen] & (grade[seen] > self.records["grade"][prev[seen]])
+
+        cur_score = np.where(cur >= 0, score[np.maximum(cur, 0)], -1)
+        dropped = (cur < 0) | (cur_score < threshold - DROP_MARGIN)
+        replaced = np.zeros(len(self), dtype=bool)
+        replaced[prev[upgraded]] = True
+
+        # 남는 종목은 알린 때의 값을 유지하고, 신규 · 승격 종목만 지금 값으로 쓴다
+        keep = self.take(~dropped & ~replaced)
+        alert = np.flatnonzero(new | upgraded)
+        fresh = np.zeros(len(alert), dtype=STATE_DTYPE)
+        fresh["score"] = score[alert]
+        fresh["grade"] = grade[alert]
+        fresh["tags"] = tag_bits(snapshot.records[alert])
+        fresh["alerted"] = now
+        names = np.asarray(snapshot.categories["name"], dtype=object)[snapshot.records["name"][alert]]
+        sectors = np.asarray(snapshot.categories["sector"], dtype=object)[snapshot.records["sector"][alert]]
+        updated = AlertState(
+            np.concatenate([keep.tickers, keys[alert]]),
+            np.concatenate([keep.names, names]),
+            np.concatenate([keep.sectors, sectors]),
+            np.concatenate([keep.records, fresh]),
+            self.version + 1,
+        )
+
+        rank = np.empty(len(score), dtype=np.int64)
+        rank[snapshot.index.order] = np.arange(len(score))
+
+        def by_rank(mask):
+            rows = np.flatnonzero(mask)
+            return rows[np.argsort(rank[rows], kind="stable")]
+
+        gone = self.take(dropped)
+        dropped_frame = pd.DataFrame({
+            "종목코드": gone.tickers,
+            "종목명": gone.names,
+            "섹터": gone.sectors,
+            "알린점수": gone.records["score"],
+            "현재점수": np.where(cur[dropped] >= 0, cur_score[dropped], np.nan),
+        })
+        return AlertDiff(by_rank(new), by_rank(upgraded), dropped_frame), updated
+
+    # ===== 저장 =====
+    def save(self, path):
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as fh:
+            np.savez(fh, tickers=self.tickers.astype(str), names=self.names.astype(str),
+                     sectors=self.sectors.astype(str), records=self.records, version=self.version)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        """없거나 깨진 파일이면 빈 상태"""
+        try:
+            with np.load(path) as npz:
+                version = int(npz["version"]) if "version" in npz.files else 0
+                return cls(npz["tickers"], npz["names"], npz["sectors"], npz["records"], version)
+        except (OSError, ValueError, KeyError):
+            return cls()
+
+
+class AlertStore:
+    """
+    키마다 알림 상태 파일 하나.
+    diff() → 전송 → 성공하면 commit(). 보내지 않고 상태만 맞출 때는 update().
+    """
+
+    def __init__(self, root=DEFAULT_ALERT_DIR, threshold=THRESHOLD):
+        self.root = root
+        self.threshold = threshold
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.root, f"{key}.npz")
+
+    def state(self, key):
+        return AlertState.load(self._path(key))
+
+    def diff(self, key, snapshot, keys=None, threshold=None, now=None):
+        """
+        상태를 바꾸지 않고 비교만 → (AlertDiff, 전송 뒤 commit 할 AlertState).
+        threshold 를 생략하면 저장소 기본값 (구독자마다 자기 최소 점수를 줄 수 있다).
+        """
+        threshold = self.threshold if threshold is None else threshold
+        return self.state(key).diff(snapshot, keys, threshold, now)
+
+    def commit(self, key, state):
+        """
+        diff() 가 돌려준 상태를 기록한다. 그 사이 다른 프로세스가 먼저 기록했으면
+        (버전이 다르면) 덮어쓰지 않고 False.
+        """
+        path = self._path(key)
+        with file_lock(path + ".lock"):
+            if AlertState.load(path).version != state.version - 1:
+                return False
+            state.save(path)
+        return True
+
+    def update(self, key, snapshot, keys=None, now=None, threshold=None):
+        """비교와 기록을 잠금 안에서 한 번에 — AlertDiff 를 돌려준다"""
+        threshold = self.threshold if threshold is None else threshold
+        path = self._path(key)
+        with file_lock(path + ".lock"):
+            diff, state = AlertState.load(path).diff(snapshot, keys, threshold, now)
+            if has_changes(diff):
+                state.save(path)
+        return diff
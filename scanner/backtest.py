@@ -0,0 +1,273 @@
+"""
+4대 시그널 백테스트 (전 구간 롤링 벡터 연산)
+
+스캐너를 날짜마다 다시 돌리지 않고, 여러 해의 일봉 패널 전체에서
+모든 (날짜, 종목)의 종합점수를 누적합 기반 롤링 연산으로 한 번에 구한다.
+규칙은 run_analysis() 와 같다 — 품질 검사 · 분할 수정(scanner.quality) 뒤
+각 날짜 기준 최근 30달력일 창, 종가 결측 봉 제외,
+창 안 봉 수 조건(10/20/21봉), 분석 대상 종목 기준 섹터 상승 비율.
+그 뒤 점수 구간별로 1/5/20거래일 뒤 수익률의 적중률(상승 확률)과 평균을 집계한다.
+
+    python -m scanner.backtest [녹화 파일] [--years 5]
+    python -m scanner.backtest --history [디렉터리]     # 장기 memmap 패널 (scanner.history)
+"""
+
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from scanner.scoring import (
+    BOUNCE_POINTS,
+    CONSEC_TIERS,
+    MA_BAND,
+    MIN_BARS,
+    SECTOR_TIERS,
+    VOL_TIERS,
+    panel_arrays,
+    tier_score,
+)
+from scanner.quality import clean_arrays
+from scanner.store import PERIOD_DAYS
+from scanner.universe import as_universe
+
+HORIZONS = (1, 5, 20)
+BUCKETS = (0, 30, 50, 60, 70, 80, 101)
+
+DEFAULT_RULES = {
+    "vol_tiers": VOL_TIERS,
+    "consec_tiers": CONSEC_TIERS,
+    "ma_band": MA_BAND,
+    "bounce_points": BOUNCE_POINTS,
+    "sector_tiers": SECTOR_TIERS,
+}
+
+
+def rolling_sum(x, window):
+    """축 0 방향 이동합 — out[k] = x[k-window+1 .. k] 의 합 (앞쪽은 NaN)"""
+    cs = np.cumsum(x, axis=0)
+    out = np.full(x.shape, np.nan)
+    out[window - 1:] = cs[window - 1:]
+    out[window:] -= cs[:-window]
+    return out
+
+
+def rising_run(rising):
+    """축 0 방향으로 True 가 연속된 길이 (k 에서 끝나는 구간)"""
+    idx = np.arange(rising.shape[0])[:, None]
+    last_break = np.maximum.accumulate(np.where(rising, -1, idx), axis=0)
+    return idx - last_break
+
+
+def window_counts(valid, dates, period_days=PERIOD_DAYS):
+    """날짜 t 기준 최근 period_days 달력일 창 안의 종목별 유효 봉 수"""
+    cum = np.cumsum(valid, axis=0)
+    first = np.searchsorted(dates, dates - np.timedelta64(period_days - 1, "D"))
+    before = np.where(first[:, None] > 0, cum[np.maximum(first - 1, 0)], 0)
+    return cum - before
+
+
+def compute_features(close, opens, volume, dates, sector_codes, n_sectors=None):
+    """
+    (일자 × 종목) 패널에서 점수 규칙과 무관한 롤링 피처를 한 번만 계산한다.
+    백테스트와 파라미터 스윕이 이 결과를 함께 쓴다.
+    """
+    close = np.asarray(close, dtype=np.float64)
+    n_days, n_tickers = close.shape
+    dates = np.asarray(dates, dtype="datetime64[D]")
+    sector_codes = np.asarray(sector_codes, dtype=np.int64)
+    if n_sectors is None:
+        n_sectors = int(sector_codes.max()) + 1 if n_tickers else 0
+
+    # 종목마다 유효 봉을 위로 모은다 (k 번째 봉)
+    valid = np.isfinite(close)
+    order = np.argsort(~valid, axis=0, kind="stable")
+    c = np.take_along_axis(close, order, axis=0)
+    o = np.take_along_axis(np.asarray(opens, dtype=np.float64), order, axis=0)
+    v = np.take_along_axis(np.asarray(volume, dtype=np.float64), order, axis=0)
+    packed_valid = np.arange(n_days)[:, None] < valid.sum(axis=0)
+    v = np.where(packed_valid, v, np.nan)
+
+    # 봉 단위 롤링 값
+    v_nan = np.isnan(v)
+    vsum = np.full(v.shape, np.nan)
+    vnan = np.ones(v.shape)
+    vsum[1:] = rolling_sum(np.where(v_nan, 0.0, v), 20)[:-1]   # 직전 20봉 합 (오늘 제외)
+    vnan[1:] = rolling_sum(v_nan.astype(np.float64), 20)[:-1]
+    csum = rolling_sum(np.where(packed_valid, c, 0.0), 20)
+    c_prev = np.vstack([np.full((1, n_tickers), np.nan), c[:-1]])
+    c_prev2 = np.vstack([np.full((2, n_tickers), np.nan), c[:-2]])
+    rising = np.zeros(v.shape, dtype=bool)
+    rising[1:] = v[1:] > v[:-1]
+    run = rising_run(rising)
+
+    # 날짜 t 시점의 마지막 봉(k)으로 되돌리고, 창 안 봉 수 조건을 건다
+    k = np.cumsum(valid, axis=0) - 1
+    has_bar = k >= 0
+    kk = np.maximum(k, 0)
+
+    def at(a):
+        return np.take_along_axis(a, kk, axis=0)
+
+    n = window_counts(valid, dates)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        latest = at(c)
+        prev = at(c_prev)
+        change = np.where((n >= 2) & (prev > 0), (latest - prev) / prev * 100, 0.0)
+
+        avg = at(vsum) / 20
+        vol_ok = (n >= 21) & (at(vnan) == 0) & (avg > 0)
+        latest_volume = at(v)
+        vol_ratio = np.where(vol_ok, latest_volume / avg, 0.0)
+
+        ma20 = at(csum) / 20
+        ma_ok = (n >= 20) & (ma20 > 0)
+        ma_distance = np.where(ma_ok, (latest - ma20) / ma20 * 100, np.nan)
+        bullish = latest > at(o)
+        prev_down = (n >= 5) & (at(c_prev2) > prev)
+
+    streak = np.minimum(at(run), np.maximum(n - 1, 0))
+    included = has_bar & (n >= MIN_BARS) & np.isfinite(latest_volume)
+
+    # 날짜별 섹터 상승 비율 (분석 대상 종목 기준)
+    onehot = np.zeros((n_tickers, n_sectors))
+    onehot[np.arange(n_tickers), sector_codes] = 1.0
+    counts = included.astype(np.float64) @ onehot
+    ups = (included & (change > 0)).astype(np.float64) @ onehot
+    with np.errstate(invalid="ignore", divide="ignore"):
+        sector_ratio = np.where(counts > 0, ups / np.maximum(counts, 1), 0.0)
+
+    return {
+        "dates": dates,
+        "traded": valid,
+        "included": included,
+        "vol_ratio": vol_ratio,
+        "streak": streak,
+        "ma_distance": ma_distance,
+        "bullish": bullish,
+        "prev_down": prev_down,
+        "up_ratio": sector_ratio[:, sector_codes],
+        "packed_close": np.where(packed_valid, c, np.nan),
+        "bar_index": k,
+    }
+
+
+def score_features(features, vol_tiers=VOL_TIERS, consec_tiers=CONSEC_TIERS, ma_band=MA_BAND,
+                   bounce_points=BOUNCE_POINTS, sector_tiers=SECTOR_TIERS):
+    """피처에 점수 규칙(구간·가중치)을 적용해 (일자 × 종목) 종합점수를 만든다"""
+    f = features
+    with np.errstate(invalid="ignore"):
+        near = (f["ma_distance"] >= ma_band[0]) & (f["ma_distance"] <= ma_band[1])
+    strong, bullish, near_only = bounce_points
+    bounce = np.select(
+        [near & f["bullish"] & f["prev_down"], near & f["bullish"], near],
+        [strong, bullish, near_only],
+        0,
+    )
+    total = (
+        tier_score(f["vol_ratio"], vol_tiers)
+        + tier_score(f["streak"], consec_tiers)
+        + bounce
+        + tier_score(f["up_ratio"], sector_tiers)
+    )
+    return np.where(f["included"], total, -1).astype(np.int16)
+
+
+def forward_returns(features, horizons=HORIZONS):
+    """각 종목의 h 거래일(유효 봉) 뒤 종가 수익률(%) — 그날 거래된 칸만 값이 있다"""
+    c = features["packed_close"]
+    k = features["bar_index"]
+    out = {}
+    for h in horizons:
+        ahead = np.full(c.shape, np.nan)
+        if h < c.shape[0]:
+            ahead[:-h] = c[h:] / c[:-h] - 1
+        ret = np.take_along_axis(ahead, np.maximum(k, 0), axis=0) * 100
+        out[h] = np.where(features["traded"], ret, np.nan)
+    return out
+
+
+def hit_rates(total, returns, buckets=BUCKETS, mask=None):
+    """점수 구간별 표본 수 · h일 뒤 상승 확률 · 평균 수익률"""
+    buckets = np.asarray(buckets)
+    scored = total >= 0
+    if mask is not None:
+        scored &= mask
+    bucket = np.searchsorted(buckets, total, side="right") - 1
+    rows = []
+    for b in range(len(buckets) - 1):
+        sel = scored & (bucket == b)
+        row = {"구간": f"{buckets[b]}~{buckets[b + 1] - 1}", "표본": int(sel.sum())}
+        for h, ret in returns.items():
+            r = ret[sel]
+            r = r[np.isfinite(r)]
+            row[f"{h}일_적중률"] = float((r > 0).mean()) if r.size else np.nan
+            row[f"{h}일_평균"] = float(r.mean()) if r.size else np.nan
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def panel_features(panel, sector_map=None):
+    universe = as_universe(sector_map).filter(status=None, tickers=panel.columns.get_level_values(0))
+    opens, close, volume, _ = clean_arrays(*panel_arrays(panel, universe.tickers))
+    return universe.tickers, compute_features(close, opens, volume, panel.index.to_numpy(),
+                                              universe.sector_codes)
+
+
+def history_features(history, sector_map=None, years=None):
+    """장기 memmap 패널(HistoryPanel)에서 DataFrame 없이 바로 피처를 만든다"""
+    universe = as_universe(sector_map).filter(status=None, tickers=history.tickers)
+    start = None
+    if years is not None and len(history):
+        start = history.dates[-1] - pd.Timedelta(days=int(years * 365) + PERIOD_DAYS)
+    dates, arrays = history.arrays(universe.tickers, start=start)
+    opens, close, volume, _ = clean_arrays(*arrays)
+    return universe.tickers, compute_features(close, opens, volume, dates.to_numpy(), universe.sector_codes)
+
+
+def run_backtest(panel, sector_map=None, horizons=HORIZONS, buckets=BUCKETS, features=None, **rules):
+    """
+    패널 전체 기간 백테스트 → 점수 구간별 적중률 표
+    (features 를 주면 panel 대신 그 피처로 — history_features() 결과 등)
+    """
+    if features is None:
+        _, features = panel_features(panel, sector_map)
+    total = score_features(features, **rules)
+    return hit_rates(total, forward_returns(features, horizons), buckets, mask=features["traded"])
+
+
+def load_history(path=None, years=5, sector_map=None):
+    """녹화 파일 또는 기본 공급자에서 여러 해 일봉을 읽는다"""
+    from scanner.providers import ReplayProvider, default_provider
+
+    provider = ReplayProvider.load(path) if path else default_provider()
+    period = f"{int(years * 365) + PERIOD_DAYS}d"
+    panel, _ = provider.fetch(as_universe(sector_map).tickers, period=period)
+    return panel
+
+
+if __name__ == "__main__":
+    import time
+
+    parser = argparse.ArgumentParser(description="4대 시그널 점수 구간별 적중률 백테스트")
+    parser.add_argument("path", nargs="?", help="녹화 파일 (.csv/.parquet) — 생략하면 기본 공급자")
+    parser.add_argument("--years", type=float, default=5)
+    parser.add_argument("--history", nargs="?", const=True, help="장기 memmap 패널 디렉터리 (생략하면 기본 위치)")
+    args = parser.parse_args()
+
+    if args.history:
+        from scanner.history import DEFAULT_HISTORY_DIR, HistoryPanel
+
+        history = HistoryPanel(DEFAULT_HISTORY_DIR if args.history is True else args.history)
+        started = time.perf_counter()
+        _, features = history_features(history, years=args.years)
+        report = run_backtest(None, features=features)
+        shape = features["traded"].shape
+    else:
+        panel = load_history(args.path, args.years)
+        started = time.perf_counter()
+        report = run_backtest(panel)
+        shape = panel.shape[0], len(set(panel.columns.get_level_values(0)))
+    elapsed = time.perf_counter() - started
+    print(report.to_string(index=False, float_format=lambda x: f"{x:.3f}"))
+    print(f"\n{shape[0]}일 × {shape[1]}종목 · {elapsed:.2f}초")
@@ -0,0 +1,201 @@
+"""
+스캔 파이프라인 벤치마크 (오프라인)
+
+합성 OHLCV 패널을 유니버스 크기 × 기간별로 만들어, 단계마다 따로
+벽시계 시간(반복 중 최솟값)과 최대 메모리(tracemalloc 최고점)를 잰다.
+
+    수집(로컬 스텁) → 재구성 → 품질 검사 → 시그널 1~3 → 섹터 집계 → 순위 → 메시지
+
+결과는 커밋 해시와 함께 JSON Lines 파일에 덧붙이므로 커밋 간 비교가 쉽다.
+
+    python -m scanner.bench [--sizes 100 1000 10000] [--days 22 250] [--repeat 3]
+    python -m scanner.bench --compare 기준커밋 [비교커밋]
+"""
+
+import argparse
+import json
+import platform
+import subprocess
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from scanner.fetch import fetch_panel
+from scanner.quality import clean_arrays, halted
+from scanner.report import ReportBook, Subscriber
+from scanner.schema import SCORE_COLUMN
+from scanner.scoring import FIELDS, apply_sector, panel_arrays, scan_breadth, score_signals, to_frame
+from scanner.snapshot import Snapshot
+from scanner.universe import Universe
+
+SIZES = (100, 1000, 10000)
+DAYS = (22, 250)
+REPEAT = 3
+N_SECTORS = 40
+RESULTS_FILE = "bench_results.jsonl"
+
+
+def synthetic_universe(n_tickers, n_sectors=N_SECTORS):
+    """합성 유니버스 (종목코드 · 종목명 · 섹터만)"""
+    return Universe([f"{i:06d}.KS" for i in range(n_tickers)],
+                    [f"종목{i}" for i in range(n_tickers)],
+                    [f"섹터{i % n_sectors}" for i in range(n_tickers)])
+
+
+def synthetic_panel(tickers, days, seed=0, nan_frac=0.01):
+    """yf.download(group_by="ticker") 와 같은 (ticker, field) 컬럼 합성 패널"""
+    rng = np.random.default_rng(seed)
+    n = len(tickers)
+    close = rng.uniform(1000, 100000, n) * np.cumprod(1 + rng.normal(0, 0.02, (days, n)), axis=0)
+    opens = close * (1 + rng.normal(0, 0.01, (days, n)))
+    volume = rng.integers(0, 1_000_000, (days, n)).astype(np.float64)
+    close = np.round(close)
+    close[rng.random((days, n)) < nan_frac] = np.nan
+    cube = np.stack([opens, np.fmax(opens, close), np.fmin(opens, close), close, volume], axis=2)
+    columns = pd.MultiIndex.from_product([tickers, FIELDS], names=["Ticker", "Price"])
+    return pd.DataFrame(
+        cube.reshape(days, -1),
+        index=pd.bdate_range("2026-01-02", periods=days, name="Date"),
+        columns=columns,
+    )
+
+
+def stub_download(source):
+    """네트워크 대신 미리 만든 패널에서 배치 종목만 잘라 주는 download 함수"""
+    level = source.columns.get_level_values(0)
+
+    def download(batch, **window):
+        return source.loc[:, level.isin(batch)]
+    return download
+
+
+def pipeline_stages(source, universe):
+    """(단계 이름, 함수) 목록 — 각 함수는 앞 단계 결과를 담은 state dict 를 채운다"""
+    tickers, names, sectors = universe.tickers, universe.names, universe.sectors
+    codes = universe.sector_codes
+    download = stub_download(source)
+
+    def fetch(s):
+        s["panel"], _ = fetch_panel(tickers, download=download, backoff=0)
+
+    def reshape(s):
+        s["arrays"] = panel_arrays(s["panel"], tickers)
+
+    def quality(s):
+        s["cleaned"] = clean_arrays(*s["arrays"])
+
+    def signals(s):
+        opens, close, volume, flags = s["cleaned"]
+        s["scores"] = score_signals(close, opens, volume)
+        s["scores"]["included"] &= ~halted(flags)
+
+    def sector(s):
+        scores = s["scores"]
+        _, _, counts, ups = scan_breadth(scores, universe)
+        s["scored"] = apply_sector(dict(scores), codes, counts, ups)
+
+    def rank(s):
+        s["frame"] = to_frame(s["scored"], names, sectors).sort_values(SCORE_COLUMN, ascending=False)
+
+    def message(s):
+        # 텔레그램 메시지 조립 (notify.build_message 와 같은 기본 구독자)
+        s["message"] = ReportBook(Snapshot.from_frame(s["frame"])).message(Subscriber(None))
+
+    return [("fetch", fetch), ("reshape", reshape), ("quality", quality),
+            ("signals", signals), ("sector", sector), ("rank", rank), ("message", message)]
+
+
+def measure(stages, repeat=REPEAT):
+    """단계별 (최소 시간, 최대 메모리) — 시간은 추적 없이, 메모리는 추적 한 번 더"""
+    seconds = {name: float("inf") for name, _ in stages}
+    for _ in range(repeat):
+        state = {}
+        for name, stage in stages:
+            started = time.perf_counter()
+            stage(state)
+            seconds[name] = min(seconds[name], time.perf_counter() - started)
+
+    peaks = {}
+    state = {}
+    tracemalloc.start()
+    for name, stage in stages:
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        stage(state)
+        peaks[name] = tracemalloc.get_traced_memory()[1] - base
+    tracemalloc.stop()
+    return {name: (seconds[name], peaks[name]) for name, _ in stages}
+
+
+def git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"],
+                             capture_output=True, text=True, check=True)
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run_bench(sizes=SIZES, days=DAYS, repeat=REPEAT, seed=0):
+    """크기 × 기간 × 단계별 측정 레코드 목록"""
+    meta = {
+        "commit": git_commit(),
+        "at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+    }
+    records = []
+    for n_tickers in sizes:
+        universe = synthetic_universe(n_tickers)
+        for n_days in days:
+            source = synthetic_panel(universe.tickers, n_days, seed)
+            results = measure(pipeline_stages(source, universe), repeat)
+            for stage, (seconds, peak) in results.items():
+                records.append({**meta, "tickers": n_tickers, "days": n_days, "stage": stage,
+                                "seconds": round(seconds, 6), "peak_mb": round(peak / 2**20, 3)})
+            total = sum(s for s, _ in results.values())
+            print(f"{n_tickers:>6}종목 × {n_days:>4}일  합계 {total * 1000:9.1f} ms  "
+                  + "  ".join(f"{k} {v[0] * 1000:.1f}" for k, v in results.items()))
+    return records
+
+
+def save(records, path=RESULTS_FILE):
+    with open(path, "a", encoding="utf-8") as fh:
+        for record in records:
+            fh.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+def compare(path=RESULTS_FILE, base=None, head=None):
+    """두 커밋의 단계별 시간 비교표 (head 를 생략하면 마지막으로 기록된 커밋)"""
+    runs = pd.read_json(path, lines=True, dtype={"commit": str})
+    head = head or runs["commit"].iloc[-1]
+    # 같은 커밋을 여러 번 돌렸다면 마지막 실행만 쓴다
+    latest = runs.groupby("commit")["at"].transform("max") == runs["at"]
+    runs = runs[latest & runs["commit"].isin([base, head])]
+    table = runs.pivot_table(index=["tickers", "days", "stage"], columns="commit",
+                             values="seconds", sort=False)
+    table["ratio"] = table[head] / table[base]
+    return table[[base, head, "ratio"]]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="스캔 파이프라인 단계별 벤치마크")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES))
+    parser.add_argument("--days", type=int, nargs="+", default=list(DAYS))
+    parser.add_argument("--repeat", type=int, default=REPEAT)
+    parser.add_argument("--out", default=RESULTS_FILE)
+    parser.add_argument("--compare", nargs="+", metavar="COMMIT",
+                        help="측정 없이 기록된 두 커밋을 비교 (기준 [비교])")
+    args = parser.parse_args()
+
+    if args.compare:
+        table = compare(args.out, *args.compare)
+        print(table.to_string(float_format=lambda x: f"{x:.4f}"))
+    else:
+        records = run_bench(args.sizes, args.days, args.repeat)
+        save(records, args.out)
+        print(f"\n{len(records)}건 기록 → {args.out}")
@@ -0,0 +1,109 @@
+"""
+세션·프로세스 공유 스캔 결과 캐시
+
+st.cache_data 는 프로세스 메모리에만 있어서, 만료되는 순간이나 서버 재시작·복제본
+증설 때 여러 사용자가 동시에 전체 수집을 일으킨다. 이 캐시는 결과를 파일로 공유한다.
+
+- 단일 실행(single-flight): 키마다 파일 잠금을 잡은 한 곳만 스캔하고,
+  나머지는 잠금이 풀리면 그 결과를 읽는다.
+- stale-while-revalidate: ttl 이 지난 결과는 즉시 돌려주고
+  백그라운드 스레드 하나가 갱신한다 (이미 누가 갱신 중이면 건너뛴다).
+
+결과는 열 기반 스냅샷(scanner.snapshot)으로 저장하고 memmap 으로 연다.
+compute() 는 Snapshot 또는 결과 DataFrame 을 돌려주면 되고, 읽을 때는 항상 Snapshot 이다.
+"""
+
+import logging
+import os
+import threading
+import time
+
+from scanner.snapshot import Snapshot
+from scanner.store import file_lock
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = os.environ.get("SCANNER_CACHE_DIR", ".scanner_cache/results")
+TTL = 300
+
+
+class ScanCache:
+    def __init__(self, root=DEFAULT_CACHE_DIR, ttl=TTL):
+        self.root = root
+        self.ttl = ttl
+        self._refreshing = set()  # 이 프로세스에서 백그라운드 갱신 중인 키
+        self._loaded = {}         # 키 → (사이드카 stat, Snapshot) — 바뀌지 않았으면 다시 읽지 않는다
+        self._guard = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.root, key)
+
+    def read(self, key):
+        """
+        (Snapshot, 경과 초) — 없으면 (None, None)
+        게시된 스냅샷이 그대로면 이전에 연 객체(와 그 필터 인덱스)를 재사용한다.
+        """
+        try:
+            stat = os.stat(self._path(key) + ".json")
+            signature = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+            loaded = self._loaded.get(key)
+            if loaded is not None and loaded[0] == signature:
+                snapshot = loaded[1]
+            else:
+                snapshot = Snapshot.load(self._path(key))
+                self._loaded[key] = (signature, snapshot)
+        except (OSError, ValueError, KeyError):
+            return None, None
+        return snapshot, time.time() - snapshot.created
+
+    def write(self, key, result):
+        snapshot = result if isinstance(result, Snapshot) else Snapshot.from_frame(result)
+        snapshot.save(self._path(key))
+        return snapshot
+
+    def get(self, key, compute, ttl=None):
+        """
+        신선한 결과가 있으면 바로, 오래된 결과가 있으면 그것을 돌려주며 뒤에서 갱신,
+        아무것도 없으면 한 곳만 compute() 를 실행하고 나머지는 그 결과를 기다린다.
+        """
+        ttl = self.ttl if ttl is None else ttl
+        snapshot, age = self.read(key)
+        if snapshot is None:
+            return self.refresh(key, compute, ttl)
+        if age >= ttl:
+            self.revalidate(key, compute, ttl)
+        return snapshot
+
+    def refresh(self, key, compute, ttl=None, blocking=True):
+        """
+        잠금을 잡고 결과를 새로 계산해 저장한다.
+        잠금을 기다리는 사이 다른 곳이 ttl 안의 결과를 써 두었다면 계산하지 않고 그것을 쓴다.
+        blocking=False 면 이미 갱신 중일 때 None 을 돌려준다.
+        """
+        ttl = self.ttl if ttl is None else ttl
+        with file_lock(self._path(key) + ".lock", blocking=blocking) as acquired:
+            if not acquired:
+                return None
+            snapshot, age = self.read(key)
+            if snapshot is not None and age < ttl:
+                return snapshot
+            return self.write(key, compute())
+
+    def revalidate(self, key, compute, ttl=None):
+        """백그라운드 스레드로 갱신 (프로세스 안팎에서 하나만)"""
+        with self._guard:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def run():
+            try:
+                self.refresh(key, compute, ttl, blocking=False)
+            except Exception:
+                logger.exception("결과 캐시 갱신 실패 (%s) — 이전 결과를 계속 쓴다", key)
+            finally:
+                with self._guard:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=run, name=f"scan-cache-{key}", daemon=True).start()
@@ -0,0 +1,58 @@
+"""
+스캐너 코어 — app.py(Streamlit)와 notify.py(텔레그램)가 함께 쓰는 단일 진입점
+"""
+
+import pandas as pd
+
+from scanner.fetch import received
+from scanner.metrics import ScanMetrics
+from scanner.providers import default_provider
+from scanner.scoring import score_frame
+from scanner.store import PERIOD_DAYS, OHLCVStore
+from scanner.universe import as_universe
+
+
+def load_panel(tickers, provider=None, store=None, max_age=None, metrics=None):
+    """
+    공급자에서 최근 30일 패널을 가져온다.
+    네트워크 공급자(cacheable)는 로컬 저장소를 거쳐 새 봉만 받고,
+    파일·재생 공급자는 그대로 읽는다.
+    """
+    metrics = metrics or ScanMetrics()
+    provider = provider or default_provider()
+    if provider.cacheable:
+        store = store or OHLCVStore()
+        panel = store.top_up(tickers, provider, max_age=max_age, metrics=metrics)
+    else:
+        with metrics.stage("download"):
+            panel = provider(tickers, period=f"{PERIOD_DAYS}d")
+        metrics.drop(panel.attrs.get("missing", {}))
+    metrics.count("tickers", len(tickers))
+    metrics.count("fetched", len(received(panel)))
+    return panel
+
+
+def run_analysis(sector_map=None, provider=None, store=None, max_age=None, shards=None,
+                 metrics=None):
+    """
+    유니버스 전체를 수집 → 점수화해 결과 DataFrame 을 돌려준다.
+    sector_map 은 Universe 또는 종목코드 → (종목명, 섹터) dict (생략하면 기본 유니버스).
+    max_age(초) 안에 갱신된 저장소라면 네트워크 없이 저장된 봉으로 바로 계산한다.
+    shards > 1 이면 프로세스 풀로 나눠 돌린다 (scanner.shard — 결과는 같다).
+    metrics(ScanMetrics)를 넘기면 단계별 시간 · 수집/제외 종목 · 저장소 적중을 기록한다.
+    """
+    metrics = metrics or ScanMetrics()
+    universe = as_universe(sector_map)
+    if shards and shards > 1:
+        from scanner.shard import run_sharded
+
+        return run_sharded(universe, provider, store, max_age, shards, metrics)
+
+    panel = load_panel(universe.tickers, provider, store, max_age, metrics)
+    if panel.empty:
+        return pd.DataFrame()
+
+    # 전체 패널을 한 번에 점수화 (4대 시그널 벡터 연산)
+    result = score_frame(panel, universe.tickers, universe, metrics)
+    metrics.count("scored", len(result))
+    return result
@@ -0,0 +1,153 @@
+"""
+시세 수집 (yfinance)
+
+50종목 단위 배치를 동시에 최대 MAX_WORKERS 개까지 받고,
+종가가 비어 돌아온 종목만 지수 백오프로 다시 요청한다.
+끝까지 받지 못한 종목은 사유와 함께 보고한다.
+응답 본문 크기는 프로세스 단위로 누적한다 (bytes_received — 계측용).
+집계는 yfinance 내부 함수(yfinance.data.new_session)에 기대므로, 그 함수가 없는 버전이면
+yfinance 기본 세션으로 받고 크기는 세지 않는다.
+
+yfinance 는 무거우므로 실제로 내려받을 때 처음 import 한다.
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 50
+MAX_WORKERS = 4
+RETRIES = 3
+BACKOFF = 1.0  # 첫 재시도 대기(초) — 이후 2배씩 늘어난다
+
+_received = 0
+_received_lock = threading.Lock()
+_session = None
+_session_ready = False
+_session_lock = threading.Lock()
+
+
+def bytes_received():
+    """이 프로세스가 지금까지 받은 응답 본문 바이트 수"""
+    return _received
+
+
+def _count_bytes(n):
+    global _received
+    with _received_lock:
+        _received += n
+
+
+def counting_session():
+    """yfinance 기본 세션에 응답 크기 집계를 붙인 공유 세션 (만들 수 없으면 None — yfinance 기본 세션)"""
+    global _session, _session_ready
+    with _session_lock:
+        if not _session_ready:
+            _session_ready = True
+            try:
+                from yfinance.data import new_session
+            except ImportError:
+                logger.warning("yfinance.data.new_session 이 없어 수신 바이트를 세지 않습니다")
+                return None
+
+            session = new_session()
+            request = session.request
+
+            def counted(*args, **kwargs):
+                response = request(*args, **kwargs)
+                _count_bytes(len(response.content))
+                return response
+
+            session.request = counted
+            _session = session
+    return _session
+
+
+def yf_download(batch, **window):
+    """yf.download 한 번 호출 → (ticker, field) 컬럼 패널"""
+    import yfinance as yf
+
+    data = yf.download(
+        batch, group_by="ticker",
+        progress=False, threads=True, session=counting_session(), **window
+    )
+    if data is None:
+        return pd.DataFrame()
+    if not data.empty and not isinstance(data.columns, pd.MultiIndex):
+        data = pd.concat({batch[0]: data}, axis=1)
+    return data
+
+
+def received(data):
+    """종가가 하나라도 들어온 종목 목록"""
+    if data.empty:
+        return []
+    close = data.xs("Close", axis=1, level=1)
+    return list(close.columns[close.notna().any().to_numpy()])
+
+
+def fetch_batch(batch, download=yf_download, retries=RETRIES, backoff=BACKOFF,
+                sleep=time.sleep, **window):
+    """
+    한 배치를 받되 빠진 종목만 골라 재시도한다.
+    반환: (받은 패널 목록, {못 받은 종목: 사유})
+    """
+    frames = []
+    pending = list(batch)
+    reasons = {}
+    for attempt in range(retries + 1):
+        if attempt:
+            sleep(backoff * 2 ** (attempt - 1))
+        try:
+            data = download(pending, **window)
+        except Exception as e:
+            reasons = {t: f"{type(e).__name__}: {e}" for t in pending}
+            continue
+
+        got = set(received(data))
+        if got:
+            frames.append(data.loc[:, data.columns.get_level_values(0).isin(got)])
+        pending = [t for t in pending if t not in got]
+        reasons = {t: "no data" for t in pending}
+        if not pending:
+            break
+    return frames, reasons
+
+
+def fetch_panel(tickers, batch_size=BATCH_SIZE, max_workers=MAX_WORKERS,
+                retries=RETRIES, backoff=BACKOFF, download=yf_download, **window):
+    """
+    전체 종목을 배치로 나눠 동시에 받는다.
+    반환: (하나로 합친 패널, {못 받은 종목: 사유})
+    """
+    batches = [tickers[i:i + batch_size] for i in range(0, len(tickers), batch_size)]
+    frames = []
+    missing = {}
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(batches) or 1))) as pool:
+        jobs = [
+            pool.submit(fetch_batch, batch, download=download,
+                        retries=retries, backoff=backoff, **window)
+            for batch in batches
+        ]
+        for job in jobs:
+            batch_frames, batch_missing = job.result()
+            frames.extend(batch_frames)
+            missing.update(batch_missing)
+
+    if not frames:
+        return pd.DataFrame(), missing
+    return pd.concat(frames, axis=1).sort_index(), missing
+
+
+def download_batches(tickers, **window):
+    """저장소 갱신용 다운로드 함수 (window: period= 또는 start=)"""
+    panel, missing = fetch_panel(tickers, **window)
+    if missing:
+        logger.warning("%d종목 수신 실패: %s", len(missing), ", ".join(sorted(missing)))
+    panel.attrs["missing"] = missing
+    return panel
@@ -0,0 +1,272 @@
+"""
+장기 일봉 패널 (memory-mapped)
+
+여러 해 × 전 종목 일봉을 pandas 로 메모리에 올리지 않고, 고정 배치의 이진 파일
+두 개로 디스크에 둔다. 읽기는 np.memmap 창(view)이라 복사가 없고, 새 거래일은
+파일 끝에 한 행을 덧붙이기만 한다.
+
+    <root>/meta.json            종목 · 거래일 목록 · 종목 칸 수 · 데이터 세대 — 커밋 지점
+    <root>/prices.<gen>.f32     float32 (거래일, 종목 칸, 4)  Open High Low Close
+    <root>/volume.<gen>.i64     int64   (거래일, 종목 칸)     Volume (없으면 -1)
+
+- 거래일 한 행 = 종목 칸 수(capacity)만큼 고정 크기라 n 번째 거래일 위치를 바로 안다.
+  종목은 빈 칸에 붙이고, 칸이 모자랄 때만 새 세대 파일로 다시 배치한다.
+- 가격은 float32 로 반올림해 저장한다 — 유효숫자 약 7자리(상대 오차 2^-24 ≈ 6e-8)라
+  수정주가(소수)나 2^24(약 1,677만) 원 이상 가격은 원래 값과 정확히 같지 않다.
+  등락률 · 비율 구간의 경계에 딱 걸린 값이 아니면 점수는 같다.
+  거래량은 int64 정수라 2^24 를 넘어도 손실이 없다 (소수 거래량만 반올림).
+- 덧붙인 행은 meta.json 을 원자적으로 바꿔야 보인다. 마지막 거래일(장중 미완성 봉)은
+  같은 날짜로 다시 쓰면 제자리에서 덮어쓴다.
+
+    python -m scanner.history import [--years 5]   # 기본 공급자에서 여러 해 받아 채우기
+    python -m scanner.history append               # 마지막 거래일 이후 봉만 덧붙이기
+    python -m scanner.history info
+
+스캔 · 백테스트는 SCANNER_DATA_SOURCE=history:<디렉터리> 로 이 패널을 공급자로 쓰거나
+(HistoryProvider), arrays() 로 (일자 × 종목) 배열을 바로 받는다.
+"""
+
+import argparse
+import json
+import os
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+from scanner.providers import DataProvider, select
+from scanner.scoring import FIELDS
+from scanner.store import file_lock
+
+DEFAULT_HISTORY_DIR = os.environ.get("SCANNER_HISTORY_DIR", ".scanner_cache/history")
+PRICE_FIELDS = FIELDS[:4]
+NO_VOLUME = -1
+GROWTH = 1.25  # 종목 칸을 다시 배치할 때 여유분
+RELAYOUT_DAYS = 256
+
+
+class HistoryPanel:
+    def __init__(self, root=DEFAULT_HISTORY_DIR):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        self.reload()
+
+    def _path(self, name):
+        return os.path.join(self.root, name)
+
+    def reload(self):
+        """meta.json 을 다시 읽는다 (다른 프로세스가 덧붙인 거래일을 보려면)"""
+        try:
+            with open(self._path("meta.json"), encoding="utf-8") as fh:
+                meta = json.load(fh)
+        except FileNotFoundError:
+            meta = {"tickers": [], "dates": [], "capacity": 0, "generation": 0}
+        self.meta = meta
+        self.tickers = meta["tickers"]
+        self.dates = pd.DatetimeIndex(pd.to_datetime(meta["dates"]), name="Date")
+        self.capacity = meta["capacity"]
+        self.position = {t: i for i, t in enumerate(self.tickers)}
+        return self
+
+    def __len__(self):
+        return len(self.dates)
+
+    def _files(self, generation=None):
+        generation = self.meta["generation"] if generation is None else generation
+        return self._path(f"prices.{generation}.f32"), self._path(f"volume.{generation}.i64")
+
+    # ===== 읽기 =====
+    def memmaps(self, mode="r"):
+        """(prices (거래일, 칸, 4), volume (거래일, 칸)) memmap — 커밋된 거래일만"""
+        n, cap = len(self), self.capacity
+        if not n or not cap:
+            return np.zeros((n, cap, len(PRICE_FIELDS)), np.float32), np.zeros((n, cap), np.int64)
+        prices_path, volume_path = self._files()
+        prices = np.memmap(prices_path, np.float32, mode, shape=(n, cap, len(PRICE_FIELDS)))
+        volume = np.memmap(volume_path, np.int64, mode, shape=(n, cap))
+        return prices, volume
+
+    def span(self, days=None, start=None, end=None):
+        """조건에 맞는 거래일 구간 slice — days 는 end 기준 최근 거래일 수"""
+        dates = self.dates
+        stop = len(dates) if end is None else int(dates.searchsorted(pd.Timestamp(end), side="right"))
+        first = 0 if start is None else int(dates.searchsorted(pd.Timestamp(start)))
+        if days is not None:
+            first = max(first, stop - days)
+        return slice(first, max(first, stop))
+
+    def window(self, days=None, start=None, end=None):
+        """
+        (거래일, prices, volume) — memmap 을 자른 view 라 복사가 없다.
+        종목 축은 저장 순서(self.tickers) 그대로다.
+        """
+        rows = self.span(days, start, end)
+        prices, volume = self.memmaps()
+        n = len(self.tickers)
+        return self.dates[rows], prices[rows, :n], volume[rows, :n]
+
+    def arrays(self, tickers, fields=("Open", "Close", "Volume"), days=None, start=None, end=None):
+        """
+        panel_arrays() 와 같은 필드별 (일자 × 종목) float64 배열 — 요청한 창만 읽어 만든다.
+        저장소에 없는 종목 열은 NaN.
+        """
+        dates, prices, volume = self.window(days, start, end)
+        idx = np.array([self.position.get(t, -1) for t in tickers], dtype=np.int64)
+        hit = idx >= 0
+        out = []
+        for field in fields:
+            arr = np.full((len(dates), len(tickers)), np.nan)
+            if field == "Volume":
+                v = volume[:, idx[hit]]
+                arr[:, hit] = np.where(v == NO_VOLUME, np.nan, v)
+            else:
+                arr[:, hit] = prices[:, idx[hit], PRICE_FIELDS.index(field)]
+            out.append(arr)
+        return dates, out
+
+    def frame(self, tickers, days=None, start=None, end=None):
+        """yf.download(group_by="ticker") 와 같은 (ticker, field) 컬럼 패널"""
+        dates, arrays = self.arrays(tickers, FIELDS, days, start, end)
+        cube = np.stack(arrays, axis=-1).reshape(len(dates), -1)
+        columns = pd.MultiIndex.from_product([list(tickers), FIELDS], names=["Ticker", "Price"])
+        return pd.DataFrame(cube, index=dates, columns=columns)
+
+    # ===== 쓰기 =====
+    def _commit(self, tickers, dates, capacity, generation):
+        meta = {"tickers": list(tickers), "dates": list(dates), "capacity": capacity, "generation": generation}
+        tmp = self._path(f"meta.json.{os.getpid()}.tmp")
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(meta, fh, ensure_ascii=False)
+        os.replace(tmp, self._path("meta.json"))
+        self.reload()
+
+    def _relayout(self, tickers, capacity):
+        """종목 칸 수를 늘려 새 세대 파일로 옮긴다 (읽는 쪽은 meta 가 바뀌기 전까지 이전 세대를 본다)"""
+        generation = self.meta["generation"] + 1
+        prices_path, volume_path = self._files(generation)
+        old_prices, old_volume = self.memmaps()
+        n, old = len(self), self.capacity
+        with open(prices_path, "wb") as prices_fh, open(volume_path, "wb") as volume_fh:
+            for first in range(0, n, RELAYOUT_DAYS):  # 거래일 묶음 단위로 옮겨 메모리를 묶음 크기로 제한
+                rows = slice(first, min(first + RELAYOUT_DAYS, n))
+                prices = np.full((rows.stop - first, capacity, len(PRICE_FIELDS)), np.nan, dtype=np.float32)
+                volume = np.full((rows.stop - first, capacity), NO_VOLUME, dtype=np.int64)
+                prices[:, :old] = old_prices[rows]
+                volume[:, :old] = old_volume[rows]
+                prices.tofile(prices_fh)
+                volume.tofile(volume_fh)
+        self._commit(tickers, self.meta["dates"], capacity, generation)
+        for path in self._files(generation - 2):  # 직전 세대는 막 meta 를 읽은 쪽을 위해 남긴다
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _write_row(self, row, prices, volume):
+        """거래일 row 번째 행을 파일 위치에 바로 쓴다 (row == 거래일 수면 끝에 덧붙임)"""
+        prices_path, volume_path = self._files()
+        for path, values in ((prices_path, prices), (volume_path, volume)):
+            with open(path, "r+b" if os.path.exists(path) else "w+b") as fh:
+                fh.seek(row * values.nbytes)
+                fh.write(np.ascontiguousarray(values).tobytes())
+
+    def write_day(self, day, tickers, values):
+        """
+        거래일 하나를 쓴다 — values (종목 수 × FIELDS). 종가가 없는 종목은 기존 값 유지.
+        마지막 거래일 이후면 덧붙이고, 이미 있는 거래일이면 그 행을 덮어쓴다.
+        """
+        day = pd.Timestamp(day).strftime("%Y-%m-%d")
+        values = np.asarray(values, dtype=np.float64)
+        ok = np.isfinite(values[:, FIELDS.index("Close")])
+        tickers = [str(t) for t in np.asarray(tickers)[ok]]
+        values = values[ok]
+        if not len(tickers):
+            return
+
+        known = self.tickers + [t for t in dict.fromkeys(tickers) if t not in self.position]
+        if len(known) > self.capacity:
+            self._relayout(known, max(len(known), int(len(known) * GROWTH)))
+        elif len(known) > len(self.tickers):
+            self._commit(known, self.meta["dates"], self.capacity, self.meta["generation"])
+
+        dates = self.meta["dates"]
+        if dates and day < dates[-1]:
+            if day not in dates:
+                raise ValueError(f"마지막 거래일({dates[-1]}) 이전의 새 거래일은 끼워 넣을 수 없다: {day}")
+            row = dates.index(day)
+        else:
+            row = len(dates) - 1 if dates and day == dates[-1] else len(dates)
+
+        if row < len(dates):
+            prices, volume = self.memmaps()
+            prices, volume = np.array(prices[row]), np.array(volume[row])
+        else:
+            prices = np.full((self.capacity, len(PRICE_FIELDS)), np.nan, dtype=np.float32)
+            volume = np.full(self.capacity, NO_VOLUME, dtype=np.int64)
+        idx = np.array([self.position[t] for t in tickers], dtype=np.int64)
+        prices[idx] = values[:, :len(PRICE_FIELDS)]
+        vol = values[:, FIELDS.index("Volume")]
+        volume[idx] = np.where(np.isfinite(vol), np.round(vol), NO_VOLUME).astype(np.int64)
+        self._write_row(row, prices, volume)
+        if row == len(dates):
+            self._commit(self.tickers, dates + [day], self.capacity, self.meta["generation"])
+
+    def write_panel(self, data):
+        """yf.download(group_by="ticker") 형태의 패널을 거래일 순서로 쓴다 (잠금 안에서)"""
+        if data is None or data.empty:
+            return
+        tickers = list(dict.fromkeys(data.columns.get_level_values(0)))
+        columns = pd.MultiIndex.from_product([tickers, FIELDS])
+        cube = data.sort_index().reindex(columns=columns).to_numpy(dtype=np.float64)
+        cube = cube.reshape(len(data), len(tickers), len(FIELDS))
+        with file_lock(self._path(".lock")):
+            self.reload()
+            for ts, values in zip(data.sort_index().index, cube):
+                self.write_day(ts, tickers, values)
+
+    def top_up(self, tickers, provider, years=5):
+        """마지막 거래일부터 다시 받아 덧붙인다 (비어 있으면 years 년치)"""
+        if len(self):
+            panel, _ = provider.fetch(tickers, start=self.meta["dates"][-1])
+        else:
+            panel, _ = provider.fetch(tickers, period=f"{int(years * 365)}d")
+        self.write_panel(panel)
+        return self
+
+
+class HistoryProvider(DataProvider):
+    """장기 패널을 공급자로 — period(달력일) · start 창을 memmap 에서 잘라 준다"""
+
+    name = "history"
+
+    def __init__(self, root=DEFAULT_HISTORY_DIR):
+        self.history = HistoryPanel(root)
+
+    def fetch(self, tickers, period=None, start=None):
+        history = self.history.reload()
+        if not len(history):
+            return pd.DataFrame(), {t: "no history" for t in tickers}
+        if start is None and period is not None:
+            start = history.dates[-1] - timedelta(days=int(period.rstrip("d")) - 1)
+        return select(history.frame(tickers, start=start), tickers)
+
+
+if __name__ == "__main__":
+    from scanner.providers import default_provider
+    from scanner.universe import as_universe
+
+    parser = argparse.ArgumentParser(description="장기 일봉 패널 (memmap)")
+    parser.add_argument("command", choices=("import", "append", "info"))
+    parser.add_argument("--root", default=DEFAULT_HISTORY_DIR)
+    parser.add_argument("--years", type=float, default=5)
+    args = parser.parse_args()
+
+    history = HistoryPanel(args.root)
+    if args.command == "import" and len(history):
+        raise SystemExit(f"{args.root} 에 이미 {len(history)}거래일이 있습니다 (append 로 이어 받기)")
+    if args.command != "info":
+        history.top_up(as_universe().tickers, default_provider(), args.years)
+    prices, volume = history.memmaps()
+    size = (prices.nbytes + volume.nbytes) / 2**20
+    span = f"{history.dates[0]:%Y-%m-%d} ~ {history.dates[-1]:%Y-%m-%d}" if len(history) else "비어 있음"
+    print(f"{len(history)}거래일 × {len(history.tickers)}종목 (칸 {history.capacity}) · {span} · {size:.1f} MB")
@@ -0,0 +1,342 @@
+"""
+증분(스트리밍) 점수 엔진
+
+종목마다 최근 21봉 링 버퍼와 누적 상태(직전 20일 거래량 합, 20일 종가 합,
+연속 증가 일수, 섹터별 분석/상승 종목 수)를 들고 있다가
+새 봉이 오거나 마지막 봉이 정정되면 해당 종목만 O(1)로 갱신한다.
+순위는 점수(0~100)별 버킷으로 관리해 바뀐 종목만 옮긴다.
+
+창은 '최근 N봉' 기준이다. 같은 패널로 초기화하면 score_frame 과 같은 결과를 낸다.
+품질 검사(scanner.quality)도 봉 단위로 같은 규칙을 적용한다 — 거래량 0 봉은 넣지 않고
+거래정지로 표시, 직전 봉과 똑같은 봉은 건너뜀, 분할 비율에 맞는 갭이면 그 종목의 버퍼 · 누적합을
+비율대로 고친다 (맞지 않는 큰 갭은 표시만).
+다음 봉이 갭을 그대로 되돌리면 튄 봉으로 보고 버퍼를 원래대로 돌린 뒤 그 봉 가격만 고친다.
+"""
+
+import threading
+
+import numpy as np
+import pandas as pd
+
+from scanner.core import load_panel
+from scanner.metrics import ScanMetrics
+from scanner.providers import to_long
+from scanner.quality import (
+    HALTED,
+    OUTLIER,
+    SNAP,
+    SPLIT,
+    STALE,
+    ZERO_VOLUME,
+    is_placeholder,
+    split_factors,
+)
+from scanner.snapshot import Snapshot
+from scanner.scoring import (
+    BOUNCE_POINTS,
+    CONSEC_TIERS,
+    MA_BAND,
+    MIN_BARS,
+    SECTOR_TIERS,
+    VOL_TIERS,
+    sector_points,
+    tier_score,
+    to_frame,
+)
+from scanner.universe import as_universe
+
+WINDOW = 21  # 거래량 급증: 오늘 + 직전 20봉
+MAX_SCORE = VOL_TIERS[0][1] + CONSEC_TIERS[0][1] + BOUNCE_POINTS[0] + SECTOR_TIERS[0][1]
+
+SIGNAL_KEYS = (
+    "latest_close", "latest_volume", "change_pct", "vol_ratio", "consec_days",
+    "ma_distance", "vol_score", "consec_score", "bounce_score", "sector_score", "total",
+)
+
+
+class IncrementalScanner:
+    def __init__(self, sector_map=None):
+        universe = as_universe(sector_map)
+        self.tickers = universe.tickers
+        self.position = universe.position
+        self.names = universe.names
+        self.sectors = universe.sectors
+        self.codes = universe.sector_codes
+        self.members = [universe.members(s) for s in range(len(universe.sector_labels))]
+
+        n, s = len(self.tickers), len(universe.sector_labels)
+        # 봉 상태
+        self.cbuf = np.full((n, WINDOW), np.nan)
+        self.vbuf = np.full((n, WINDOW), np.nan)
+        self.head = np.full(n, -1, dtype=np.int64)
+        self.count = np.zeros(n, dtype=np.int64)
+        self.last_date = np.full(n, np.datetime64("NaT"), dtype="datetime64[D]")
+        self.opens = np.full(n, np.nan)
+        self.vsum = np.zeros(n)                  # 직전 20봉 거래량 합 (오늘 제외)
+        self.vnan = np.zeros(n, dtype=np.int64)  # 그중 결측 개수
+        self.csum = np.zeros(n)                  # 최근 20봉 종가 합 (오늘 포함)
+        self.streak = np.zeros(n, dtype=np.int64)
+        self.streak_prev = np.zeros(n, dtype=np.int64)
+        self.flags = np.zeros(n, dtype=np.uint8)  # 품질 플래그 (scanner.quality)
+        self.last_factor = np.ones(n)             # 마지막 봉을 넣을 때 적용한 분할 계수
+
+        # 시그널 결과 (score_panel 과 같은 키)
+        self.scores = {key: np.zeros(n) for key in SIGNAL_KEYS}
+        for key in ("consec_days", "vol_score", "consec_score", "bounce_score", "sector_score", "total"):
+            self.scores[key] = np.zeros(n, dtype=np.int64)
+        self.scores["included"] = np.zeros(n, dtype=bool)
+
+        # 섹터 집계 · 순위 버킷
+        self.sector_n = np.zeros(s, dtype=np.int64)
+        self.sector_up = np.zeros(s, dtype=np.int64)
+        self.sector_pts = np.zeros(s, dtype=np.int64)
+        self.buckets = [set() for _ in range(MAX_SCORE + 1)]
+        self.ranked = np.full(n, -1, dtype=np.int64)  # 버킷에 들어 있는 점수 (-1: 제외)
+        self.lock = threading.Lock()
+
+    @classmethod
+    def from_panel(cls, panel, sector_map):
+        scanner = cls(sector_map)
+        if not panel.empty:
+            scanner.update(to_long(panel))
+        return scanner
+
+    # ===== 입력 =====
+    def update(self, bars, placeholder=None):
+        """
+        bars: Ticker, Date, Open, Close, Volume 행 테이블 (to_long 형태)
+        placeholder: 마지막 날이 장 시작 전 자리 봉인지 (None 이면 bars 전체로 판단)
+        반환: 점수가 다시 계산된 종목 행 번호 배열
+        """
+        bars = bars.dropna(subset=["Close"])
+        rows = bars["Ticker"].map(self.position)
+        bars = bars[rows.notna().to_numpy()].assign(row=rows.dropna().astype(np.int64))
+        if bars.empty:
+            return np.zeros(0, dtype=np.int64)
+
+        # 같은 종목의 여러 봉은 날짜순으로 한 라운드에 하나씩 반영 (이미 지난 날짜의 봉은 버린다)
+        bars = bars.assign(day=pd.to_datetime(bars["Date"]).to_numpy().astype("datetime64[D]"))
+        bars = bars[~(bars["day"].to_numpy() < self.last_date[bars["row"].to_numpy()])]
+        bars = bars.sort_values("day", kind="stable").drop_duplicates(["row", "day"], keep="last")
+        if bars.empty:
+            return np.zeros(0, dtype=np.int64)
+        # 마지막 날 대부분이 거래량 0 이면 장 시작 전 자리 봉 — 배치 전체로 한 번 정해 _apply 에 넘긴다
+        last_day = bars["day"].to_numpy().max()
+        if placeholder is None:
+            latest = bars["day"].to_numpy() == last_day
+            placeholder = is_placeholder(int((latest & (bars["Volume"] == 0).to_numpy()).sum()), int(latest.sum()))
+        skip_day = last_day if placeholder else np.datetime64("NaT")
+        rounds = bars.groupby("row").cumcount().to_numpy()
+
+        touched = []
+        with self.lock:
+            for r in range(rounds.max() + 1):
+                part = bars[rounds == r]
+                touched.append(self._apply(
+                    part["row"].to_numpy(), part["day"].to_numpy(),
+                    part["Open"].to_numpy(dtype=np.float64),
+                    part["Close"].to_numpy(dtype=np.float64),
+                    part["Volume"].to_numpy(dtype=np.float64),
+                    skip_day,
+                ))
+        return np.unique(np.concatenate(touched))
+
+    def refresh(self, provider=None, store=None, max_age=None, metrics=None):
+        """
+        최근 30일 패널을 load_panel(네트워크 공급자는 저장소 top_up — 종목마다
+        저장된 마지막 봉 이후만 받는다)로 가져와 반영한다.
+        이미 반영한 날짜보다 오래된 봉은 update() 가 건너뛴다.
+        """
+        metrics = metrics or ScanMetrics()
+        panel = load_panel(self.tickers, provider, store, max_age, metrics)
+        if panel.empty:
+            return np.zeros(0, dtype=np.int64)
+        with metrics.stage("update"):
+            touched = self.update(to_long(panel))
+        metrics.count("rescored", len(touched))
+        return touched
+
+    def _slot(self, rows, lag):
+        """lag 번째 최근 봉(1 = 마지막 봉)의 버퍼 위치"""
+        return (self.head[rows] - lag + 1) % WINDOW
+
+    def _apply(self, rows, days, o, c, v, placeholder=np.datetime64("NaT")):
+        """placeholder = 장 시작 전 자리 봉으로 정한 거래일 — 그 날의 거래량 0 봉은 무시한다"""
+        last = self.last_date[rows]
+        fresh = np.isnat(last) | (days > last)
+        revise = ~fresh & (days == last)
+
+        # 품질 검사 — 거래량 0 봉은 거래정지, 직전 봉과 같은 봉은 반복 봉, 가격제한폭 밖 갭은 분할
+        has_last = self.count[rows] > 0
+        head = np.maximum(self.head[rows], 0)
+        last_c = self.cbuf[rows, head]
+        zero = (fresh | revise) & (v == 0)
+        skip = zero & (days == placeholder)
+        fresh &= ~skip
+        revise &= ~skip
+        zero &= ~skip
+        stale = fresh & has_last & (c == last_c) & (v == self.vbuf[rows, head]) & (o == self.opens[rows])
+        self.flags[rows[zero]] |= HALTED | ZERO_VOLUME
+        self.flags[rows[stale]] |= STALE
+        fresh &= ~zero & ~stale
+        revise &= ~zero
+        self.flags[rows[fresh | revise]] &= ~np.uint8(HALTED)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            factor, gap = split_factors(np.where(fresh & has_last, c / last_c, np.nan))
+        split = factor != 1
+        self.flags[rows[gap & ~split]] |= OUTLIER  # 분할 비율이 아닌 큰 갭 — 실제 등락으로 둔다
+        if split.any():
+            g, f = rows[split], factor[split]
+            # 직전 봉의 갭을 되돌리는 봉이면 직전 봉이 튄 것 — 버퍼를 되돌리고 그 봉 가격만 고친다
+            back = np.abs(np.log(f * self.last_factor[g])) < np.log1p(SNAP)
+            self.cbuf[g] *= f[:, None]
+            self.csum[g] *= f
+            self.vbuf[g] /= f[:, None]
+            self.vsum[g] /= f
+            self.vbuf[g[back], self.head[g[back]]] *= f[back]
+            self.flags[g[~back]] |= SPLIT
+            self.flags[g[back]] &= ~np.uint8(SPLIT)  # 직전 봉에서 단 분할 표시는 틀렸다
+            self.flags[g[back]] |= OUTLIER
+            factor[np.flatnonzero(split)[back]] = 1
+        self.last_factor[rows[fresh]] = factor[fresh]
+
+        # 새 봉: 창이 한 칸 밀린다
+        a = rows[fresh]
+        if a.size:
+            n_old = self.count[a]
+            old_v1 = self.vbuf[a, self._slot(a, 1)]
+            old_v21 = self.vbuf[a, self._slot(a, 21)]
+            old_c20 = self.cbuf[a, self._slot(a, 20)]
+            self._shift_vol(a, old_v1, n_old >= 1, +1)
+            self._shift_vol(a, old_v21, n_old >= 21, -1)
+            self.csum[a] += c[fresh] - np.where(n_old >= 20, old_c20, 0.0)
+
+            self.head[a] = (self.head[a] + 1) % WINDOW
+            self.cbuf[a, self.head[a]] = c[fresh]
+            self.vbuf[a, self.head[a]] = v[fresh]
+            self.count[a] += 1
+            self.streak_prev[a] = self.streak[a]
+            self.streak[a] = np.where(v[fresh] > old_v1, self.streak_prev[a] + 1, 0)
+
+        # 마지막 봉 정정: 오늘 값만 바뀐다
+        b = rows[revise]
+        if b.size:
+            self.csum[b] += c[revise] - self.cbuf[b, self.head[b]]
+            self.cbuf[b, self.head[b]] = c[revise]
+            self.vbuf[b, self.head[b]] = v[revise]
+            prev_v = self.vbuf[b, self._slot(b, 2)]
+            self.streak[b] = np.where(v[revise] > prev_v, self.streak_prev[b] + 1, 0)
+
+        changed = fresh | revise
+        self.last_date[rows[changed]] = days[changed]
+        self.opens[rows[changed]] = o[changed]
+        return self._rescore(rows[changed | zero])
+
+    def _shift_vol(self, rows, values, present, sign):
+        missing = present & np.isnan(values)
+        self.vnan[rows] += sign * missing
+        self.vsum[rows] += sign * np.where(present & ~missing, values, 0.0)
+
+    # ===== 점수 =====
+    def _rescore(self, rows):
+        if rows.size == 0:
+            return rows
+        sc = self.scores
+        n = self.count[rows]
+        c1 = self.cbuf[rows, self._slot(rows, 1)]
+        c2 = self.cbuf[rows, self._slot(rows, 2)]
+        c3 = self.cbuf[rows, self._slot(rows, 3)]
+        v1 = self.vbuf[rows, self._slot(rows, 1)]
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            change = np.where((n >= 2) & (c2 > 0), (c1 - c2) / c2 * 100, 0.0)
+
+            avg_vol_20 = self.vsum[rows] / 20
+            ok = (n >= 21) & (self.vnan[rows] == 0) & (avg_vol_20 > 0)
+            vol_ratio = np.where(ok, v1 / avg_vol_20, 0.0)
+
+            ma20 = self.csum[rows] / 20
+            ok = (n >= 20) & (ma20 > 0)
+            ma_distance = np.where(ok, (c1 - ma20) / ma20 * 100, 0.0)
+            is_near_ma = ok & (ma_distance >= MA_BAND[0]) & (ma_distance <= MA_BAND[1])
+            is_bullish = c1 > self.opens[rows]
+            prev_was_down = (n >= 5) & (c3 > c2)
+
+        strong, bullish, near = BOUNCE_POINTS
+        sc["bounce_score"][rows] = np.select(
+            [is_near_ma & is_bullish & prev_was_down, is_near_ma & is_bullish, is_near_ma],
+            [strong, bullish, near],
+            0,
+        )
+        sc["latest_close"][rows] = c1
+        sc["latest_volume"][rows] = v1
+        sc["vol_ratio"][rows] = vol_ratio
+        sc["vol_score"][rows] = tier_score(vol_ratio, VOL_TIERS)
+        sc["consec_days"][rows] = self.streak[rows]
+        sc["consec_score"][rows] = tier_score(self.streak[rows], CONSEC_TIERS)
+        sc["ma_distance"][rows] = ma_distance
+
+        # 섹터 집계는 (분석 대상, 상승) 여부가 바뀐 만큼만 고친다
+        codes = self.codes[rows]
+        was_in = sc["included"][rows]
+        was_up = was_in & (sc["change_pct"][rows] > 0)
+        now_in = (n >= MIN_BARS) & np.isfinite(v1) & ((self.flags[rows] & HALTED) == 0)
+        now_up = now_in & (change > 0)
+        np.add.at(self.sector_n, codes, now_in.astype(np.int64) - was_in)
+        np.add.at(self.sector_up, codes, now_up.astype(np.int64) - was_up)
+        sc["change_pct"][rows] = change
+        sc["included"][rows] = now_in
+
+        points = sector_points(self.sector_n, self.sector_up)
+        moved = np.flatnonzero(points != self.sector_pts)
+        self.sector_pts = points
+        if moved.size:
+            rows = np.union1d(rows, np.concatenate([self.members[s] for s in moved]))
+        sc["sector_score"][rows] = points[self.codes[rows]]
+
+        sc["total"][rows] = (
+            sc["vol_score"][rows] + sc["consec_score"][rows]
+            + sc["bounce_score"][rows] + sc["sector_score"][rows]
+        )
+        self._rerank(rows)
+        return rows
+
+    def _rerank(self, rows):
+        new = np.where(self.scores["included"][rows], self.scores["total"][rows], -1)
+        old = self.ranked[rows]
+        for row, before, after in zip(rows[new != old], old[new != old], new[new != old]):
+            if before >= 0:
+                self.buckets[before].discard(row)
+            if after >= 0:
+                self.buckets[after].add(row)
+        self.ranked[rows] = new
+
+    # ===== 출력 =====
+    def frame(self):
+        """전체 결과 (run_analysis 와 같은 스키마)"""
+        return to_frame(self.scores, self.names, self.sectors)
+
+    def snapshot(self):
+        """전체 결과 열 기반 스냅샷"""
+        with self.lock:
+            return Snapshot.from_scores(self.scores, self.tickers, self.names, self.sectors)
+
+    def top_rows(self, n=20, min_score=0):
+        out = []
+        for score in range(MAX_SCORE, min_score - 1, -1):
+            bucket = self.buckets[score]
+            if bucket:
+                out.extend(sorted(bucket)[: n - len(out)])
+                if len(out) >= n:
+                    break
+        return np.array(out, dtype=np.int64)
+
+    def top(self, n=20, min_score=0):
+        """점수 상위 n 종목 (버킷 순회 — 전체 정렬 없음)"""
+        rows = self.top_rows(n, min_score)
+        mask = np.zeros(len(self.tickers), dtype=bool)
+        mask[rows] = True
+        subset = {key: value[rows] for key, value in self.scores.items()}
+        subset["included"] = mask[rows]
+        return to_frame(subset, np.asarray(self.names, dtype=object)[rows],
+                        np.asarray(self.sectors, dtype=object)[rows])
@@ -0,0 +1,232 @@
+"""
+장중 라이브 모드 (분봉)
+
+장중에는 오늘 거래량이 아직 다 쌓이지 않았으므로 20일 평균과 그대로 비교하면
+오전 내내 거래량 급증이 과소평가된다. 과거 분봉으로 '장 시작 후 m분까지 하루 거래량의
+몇 %가 쌓이는가'(시간대별 누적 거래량 프로필)를 구해 두고,
+지금까지의 거래량 ÷ 프로필 = 예상 일 거래량 으로 환산해 오늘 봉을 매 분 정정한다.
+점수 계산과 순위는 IncrementalScanner 가 바뀐 종목만 다시 한다.
+
+    python -m scanner.intraday            # 시뮬레이션 분봉으로 장 하루 재생
+"""
+
+import time
+import warnings
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from scanner.incremental import IncrementalScanner
+from scanner.market import KST, SESSION_MINUTES, SESSION_OPEN
+
+MIN_FRACTION = 0.01    # 장 초반 예상 거래량이 폭주하지 않도록 하는 하한
+
+
+def session_minute(ts):
+    """장 시작 후 경과 분 (1 ~ 390)"""
+    ts = pd.Timestamp(ts)
+    if ts.tzinfo is not None:
+        ts = ts.tz_convert(KST)
+    elapsed = (ts.hour - SESSION_OPEN[0]) * 60 + ts.minute - SESSION_OPEN[1] + 1
+    return int(min(max(elapsed, 1), SESSION_MINUTES))
+
+
+class VolumeProfile:
+    """장 시작 후 m분까지의 누적 거래량 비율 — (390,) 공통 또는 (390, 종목) 종목별"""
+
+    def __init__(self, fractions):
+        self.fractions = np.clip(np.asarray(fractions, dtype=np.float32), MIN_FRACTION, 1.0)
+
+    @classmethod
+    def uniform(cls):
+        return cls(np.arange(1, SESSION_MINUTES + 1) / SESSION_MINUTES)
+
+    @classmethod
+    def u_shape(cls):
+        """장 초반·막판에 거래가 몰리는 일반적인 모양 (분봉 이력이 없을 때 기본값)"""
+        x = np.linspace(0, 1, SESSION_MINUTES)
+        per_minute = 1 + 4 * (1 - x) ** 8 + 2 * x ** 12
+        return cls(np.cumsum(per_minute) / per_minute.sum())
+
+    @classmethod
+    def from_minute_bars(cls, bars, tickers):
+        """
+        과거 분봉(Ticker, Datetime, Volume 행 테이블)으로 종목별 프로필을 만든다.
+        이력이 없는 종목은 전체 평균 프로필을 쓴다.
+        """
+        position = {t: i for i, t in enumerate(tickers)}
+        rows = bars["Ticker"].map(position)
+        bars = bars[rows.notna().to_numpy()]
+        stamps = pd.DatetimeIndex(pd.to_datetime(bars["Datetime"]))
+        if stamps.tz is not None:
+            stamps = stamps.tz_convert(KST)
+        days, day_idx = np.unique(stamps.normalize(), return_inverse=True)
+        minute = np.clip(
+            (stamps.hour - SESSION_OPEN[0]) * 60 + stamps.minute - SESSION_OPEN[1], 0, SESSION_MINUTES - 1
+        )
+
+        cube = np.zeros((len(days), SESSION_MINUTES, len(tickers)), dtype=np.float32)
+        np.add.at(cube, (day_idx, np.asarray(minute), rows.dropna().to_numpy(dtype=np.int64)),
+                  bars["Volume"].fillna(0).to_numpy(dtype=np.float32))
+        cum = np.cumsum(cube, axis=1)
+        total = cum[:, -1:, :]
+        with np.errstate(invalid="ignore", divide="ignore"), warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)
+            share = np.where(total > 0, cum / total, np.nan)
+            per_ticker = np.nanmean(share, axis=0)
+            market = np.nanmean(share.transpose(1, 0, 2).reshape(SESSION_MINUTES, -1), axis=1)
+        if np.isnan(market).all():
+            market = cls.u_shape().fractions
+        per_ticker = np.where(np.isnan(per_ticker), market[:, None], per_ticker)
+        return cls(per_ticker)
+
+    def at(self, minute, rows=None):
+        frac = self.fractions[minute - 1]
+        if frac.ndim and rows is not None:
+            return frac[rows]
+        return frac
+
+
+class IntradayScanner:
+    """
+    어제까지의 일봉으로 초기화한 IncrementalScanner 위에 오늘 분봉을 쌓는다.
+    매 분 오늘 봉(시가·현재가·예상 일 거래량)을 정정하고 바뀐 종목만 재순위한다.
+    """
+
+    def __init__(self, daily, profile=None, session_date=None):
+        self.daily = daily
+        self.profile = profile or VolumeProfile.u_shape()
+        self.session_date = pd.Timestamp(session_date or datetime.now(KST).date()).normalize()
+        n = len(daily.tickers)
+        self.day_open = np.full(n, np.nan)
+        self.day_close = np.full(n, np.nan)
+        self.day_volume = np.zeros(n)
+        self.seen = np.zeros(n, dtype=bool)
+        self.minute = 1
+
+    @classmethod
+    def from_panel(cls, panel, sector_map, profile=None, session_date=None):
+        """일봉 패널(오늘 봉 제외)로 시작"""
+        return cls(IncrementalScanner.from_panel(panel, sector_map), profile, session_date)
+
+    def on_minute(self, bars, now=None):
+        """
+        분봉 묶음(Ticker, Datetime, Open, Close, Volume)을 반영하고 재계산된 종목 행 번호를 돌려준다.
+        시간이 흐르면 예상 비율도 바뀌므로 오늘 거래된 종목은 모두 다시 환산한다.
+        """
+        bars = bars.sort_values("Datetime", kind="stable")
+        rows = bars["Ticker"].map(self.daily.position)
+        ok = rows.notna().to_numpy()
+        bars = bars[ok]
+        rows = rows[ok].to_numpy(dtype=np.int64)
+        if rows.size:
+            # 한 묶음에 같은 종목 봉이 여럿이면 (밀린 분봉) 시가는 가장 이른 봉, 현재가는 가장 늦은 봉
+            unique, first = np.unique(rows, return_index=True)
+            first = first[~self.seen[unique]]
+            self.day_open[rows[first]] = bars["Open"].to_numpy(dtype=np.float64)[first]
+            self.day_close[rows] = bars["Close"].to_numpy(dtype=np.float64)
+            np.add.at(self.day_volume, rows, bars["Volume"].fillna(0).to_numpy(dtype=np.float64))
+            self.seen[rows] = True
+        if now is None:
+            now = bars["Datetime"].max() if len(bars) else None
+        if now is not None:
+            self.minute = session_minute(now)
+
+        active = np.flatnonzero(self.seen)
+        if not active.size:
+            return active
+        expected = self.day_volume[active] / self.profile.at(self.minute, active)
+        today = pd.DataFrame({
+            "Ticker": np.asarray(self.daily.tickers, dtype=object)[active],
+            "Date": self.session_date,
+            "Open": self.day_open[active],
+            "Close": self.day_close[active],
+            "Volume": expected,
+        })
+        return self.daily.update(today)
+
+    def top(self, n=20, min_score=0):
+        """상위 n 종목 — 거래량 컬럼은 예상치가 아닌 실제 누적 거래량"""
+        rows = self.daily.top_rows(n, min_score)
+        frame = self.daily.top(n, min_score)
+        if len(frame):
+            frame["거래량"] = self.day_volume[rows].astype(np.int64)
+        return frame
+
+
+class SimulatedTickFeed:
+    """
+    로컬 분봉 시뮬레이터 — 실시간 시세 대신 쓴다. seed 가 같으면 항상 같은 장을 재생한다.
+    각 분마다 일부 종목이 체결되며 거래량은 프로필 모양을 따르고, 몇몇 종목은 거래량이 몰린다.
+    """
+
+    def __init__(self, tickers, last_close, avg_volume, session_date,
+                 profile=None, seed=0, active=0.5, hot=0.05):
+        self.tickers = np.asarray(tickers, dtype=object)
+        self.last_close = np.asarray(last_close, dtype=np.float64)
+        self.avg_volume = np.nan_to_num(np.asarray(avg_volume, dtype=np.float64))
+        self.session_date = pd.Timestamp(session_date).normalize()
+        self.profile = profile or VolumeProfile.u_shape()
+        self.rng = np.random.default_rng(seed)
+        self.active = active
+        self.boost = np.where(self.rng.random(len(self.tickers)) < hot, self.rng.uniform(2, 6, len(self.tickers)), 1.0)
+
+    @classmethod
+    def from_panel(cls, panel, session_date=None, **kwargs):
+        """일봉 패널의 마지막 종가·20일 평균 거래량에서 출발"""
+        tickers = list(dict.fromkeys(panel.columns.get_level_values(0)))
+        close = panel.xs("Close", axis=1, level=1).reindex(columns=tickers).ffill().iloc[-1]
+        volume = panel.xs("Volume", axis=1, level=1).reindex(columns=tickers).tail(20).mean()
+        if session_date is None:
+            session_date = panel.index[-1] + pd.offsets.BDay(1)
+        return cls(tickers, close.to_numpy(), volume.to_numpy(), session_date, **kwargs)
+
+    def __iter__(self):
+        n = len(self.tickers)
+        price = self.last_close.copy()
+        curve = self.profile.fractions
+        if curve.ndim == 2:
+            curve = curve.mean(axis=1)
+        share = np.diff(np.concatenate([[0.0], curve]))
+        start = self.session_date.tz_localize(KST) + timedelta(hours=SESSION_OPEN[0], minutes=SESSION_OPEN[1])
+        for m in range(SESSION_MINUTES):
+            trade = self.rng.random(n) < self.active
+            k = int(trade.sum())
+            opens = price[trade]
+            price[trade] = np.round(opens * (1 + self.rng.normal(0, 0.002, k)))
+            volume = self.avg_volume[trade] * self.boost[trade] * share[m] / self.active
+            volume = np.round(volume * self.rng.lognormal(0, 0.5, k))
+            yield start + timedelta(minutes=m + 1), pd.DataFrame({
+                "Ticker": self.tickers[trade],
+                "Datetime": start + timedelta(minutes=m),
+                "Open": opens,
+                "Close": price[trade],
+                "Volume": volume,
+            })
+
+
+def replay_session(live, feed, top_n=20, every=30):
+    """시뮬레이션 분봉을 흘려보내며 틱당 재순위 시간을 잰다"""
+    timings = []
+    for now, bars in feed:
+        started = time.perf_counter()
+        live.on_minute(bars, now)
+        top = live.top(top_n)
+        timings.append(time.perf_counter() - started)
+        if len(timings) % every == 0:
+            head = ", ".join(f"{r.종목명}({r.종합점수})" for r in top.head(5).itertuples())
+            print(f"{now.strftime('%H:%M')} | {timings[-1] * 1000:6.1f}ms | {head}")
+    return np.array(timings)
+
+
+if __name__ == "__main__":
+    from scanner import load_panel
+    from scanner.universe import default_universe
+
+    universe = default_universe()
+    panel = load_panel(universe.tickers)
+    feed = SimulatedTickFeed.from_panel(panel, seed=0)
+    live = IntradayScanner.from_panel(panel, universe, session_date=feed.session_date)
+    timings = replay_session(live, feed)
+    print(f"틱 {len(timings)}개 · 평균 {timings.mean() * 1000:.1f}ms · 최대 {timings.max() * 1000:.1f}ms")
@@ -0,0 +1,40 @@
+"""
+한국 거래소(KRX) 시간 기준
+"""
+
+from datetime import datetime, timedelta, timezone
+
+KST = timezone(timedelta(hours=9))
+
+SESSION_OPEN = (9, 0)
+SESSION_CLOSE = (15, 30)
+SESSION_MINUTES = (SESSION_CLOSE[0] - SESSION_OPEN[0]) * 60 + SESSION_CLOSE[1] - SESSION_OPEN[1]
+
+
+def session_bounds(day):
+    """해당 날짜의 정규장 (시작, 마감) 시각 (KST)"""
+    base = datetime(day.year, day.month, day.day, tzinfo=KST)
+    return (base + timedelta(hours=SESSION_OPEN[0], minutes=SESSION_OPEN[1]),
+            base + timedelta(hours=SESSION_CLOSE[0], minutes=SESSION_CLOSE[1]))
+
+
+def market_phase(now=None):
+    """"open"(정규장) / "closed"(평일 장 외) / "weekend" — 공휴일은 구분하지 않는다"""
+    now = (now or datetime.now(KST)).astimezone(KST)
+    if now.weekday() >= 5:
+        return "weekend"
+    open_, close = session_bounds(now)
+    return "open" if open_ <= now < close else "closed"
+
+
+def next_session_event(now=None, after_close=timedelta(0)):
+    """now 이후 처음 오는 평일 장 시작 또는 (마감 + after_close) 시각"""
+    now = (now or datetime.now(KST)).astimezone(KST)
+    for offset in range(8):  # 8일 안에는 반드시 평일이 있다
+        day = now + timedelta(days=offset)
+        if day.weekday() >= 5:
+            continue
+        open_, close = session_bounds(day)
+        for event in (open_, close + after_close):
+            if event > now:
+                return event
@@ -0,0 +1,112 @@
+"""
+스캔 계측
+
+스캔마다 ScanMetrics 를 하나 만들어 run_analysis(metrics=...) 등에 넘기면
+각 단계가 소요 시간, 수집·제외 종목(사유), 저장소 적중 여부를 채운다.
+emit() 은 이를 JSON 한 줄로 로그(scanner.metrics)에 남기고,
+SCANNER_METRICS_FILE 이 지정돼 있으면 같은 줄을 그 파일에도 덧붙인다.
+
+SCANNER_PROFILE=<경로> 이면 profiled() 로 감싼 스캔 한 번의 cProfile 결과를 저장한다.
+    python -m pstats <경로>
+"""
+
+import cProfile
+import json
+import logging
+import os
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+from scanner import fetch
+
+logger = logging.getLogger(__name__)
+
+METRICS_FILE_ENV = "SCANNER_METRICS_FILE"
+PROFILE_ENV = "SCANNER_PROFILE"
+
+
+class ScanMetrics:
+    def __init__(self, source="scan"):
+        self.source = source
+        self.at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        self.stages = {}          # 단계 → 초 (같은 단계를 여러 번 지나면 누적)
+        self.counters = Counter()
+        self.dropped = {}         # 종목 → 제외 사유
+        self._started = time.perf_counter()
+        self._bytes = fetch.bytes_received()
+        self.wall = None
+
+    @contextmanager
+    def stage(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - started
+
+    def count(self, key, n=1):
+        self.counters[key] += int(n)
+
+    def drop(self, reasons):
+        """제외 종목 기록 — 먼저 기록된 사유(수집 실패 등)를 덮어쓰지 않는다"""
+        for ticker, reason in reasons.items():
+            self.dropped.setdefault(ticker, reason)
+
+    def finish(self):
+        """전체 경과 시간과 이 프로세스에서 받은 바이트 수를 확정한다"""
+        if self.wall is None:
+            self.wall = time.perf_counter() - self._started
+            self.count("bytes_downloaded", fetch.bytes_received() - self._bytes)
+        return self
+
+    def merge(self, other):
+        """샤드 프로세스의 계측을 합친다 (샤드는 동시에 돌므로 단계 시간은 최댓값)"""
+        other.finish()
+        for name, seconds in other.stages.items():
+            self.stages[name] = max(self.stages.get(name, 0.0), seconds)
+        self.counters.update(other.counters)
+        self.drop(other.dropped)
+
+    def as_dict(self):
+        self.finish()
+        return {
+            "event": "scan_metrics",
+            "source": self.source,
+            "at": self.at,
+            "wall_ms": round(self.wall * 1000, 1),
+            "stages_ms": {k: round(v * 1000, 1) for k, v in self.stages.items()},
+            **self.counters,
+            "dropped": len(self.dropped),
+            "drop_reasons": dict(Counter(self.dropped.values())),
+            "dropped_tickers": self.dropped,
+        }
+
+    def emit(self, **extra):
+        """JSON 한 줄로 로그 + (설정 시) 파일에 기록하고 dict 를 돌려준다"""
+        record = {**self.as_dict(), **extra}
+        line = json.dumps(record, ensure_ascii=False, default=str)
+        logger.info(line)
+        path = os.environ.get(METRICS_FILE_ENV)
+        if path:
+            with open(path, "a", encoding="utf-8") as fh:
+                fh.write(line + "\n")
+        return record
+
+
+@contextmanager
+def profiled(path=None):
+    """path(또는 SCANNER_PROFILE)가 있으면 블록 실행을 cProfile 로 기록한다"""
+    path = path or os.environ.get(PROFILE_ENV)
+    if not path:
+        yield None
+        return
+    profile = cProfile.Profile()
+    profile.enable()
+    try:
+        yield profile
+    finally:
+        profile.disable()
+        profile.dump_stats(path)
+        logger.info("프로파일 저장: %s", path)
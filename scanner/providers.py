@@ -0,0 +1,214 @@
+"""
+시세 공급자 (data source)
+
+모든 공급자는 같은 방식으로 호출된다.
+    panel, missing = provider.fetch(tickers, period="30d")   # 또는 start="2026-01-05"
+    panel = provider(tickers, period="30d")                  # OHLCVStore.top_up 용
+
+- YFinanceProvider : yfinance 실시간 수집 (기본값)
+- CSVStoreProvider : 종목별 CSV/Parquet 파일 디렉터리
+- ReplayProvider   : 녹화된 OHLCV 패널을 기준일(as_of)까지 잘라 재생 — 항상 같은 결과
+- HistoryProvider  : 장기 memmap 패널 (scanner.history)
+
+SCANNER_DATA_SOURCE 환경변수로 기본 공급자를 바꿀 수 있다.
+    yfinance | csv:<디렉터리> | replay:<파일> | history[:<디렉터리>]
+"""
+
+import logging
+import os
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+from scanner import fetch
+from scanner.scoring import FIELDS
+
+logger = logging.getLogger(__name__)
+
+DATA_SOURCE_ENV = "SCANNER_DATA_SOURCE"
+
+
+def read_table(path):
+    if path.endswith(".parquet"):
+        return pd.read_parquet(path)
+    return pd.read_csv(path)
+
+
+def write_table(frame, path):
+    if path.endswith(".parquet"):
+        frame.to_parquet(path, index=False)
+    else:
+        frame.to_csv(path, index=False)
+
+
+def to_long(panel):
+    """(ticker, field) 컬럼 패널 → Date, Ticker, Open … Volume 행 테이블"""
+    long = panel.stack(level=0, future_stack=True).reset_index()
+    long.columns = ["Date", "Ticker"] + list(long.columns[2:])
+    long = long.dropna(subset=["Close"])
+    return long[["Date", "Ticker"] + [f for f in FIELDS if f in long.columns]]
+
+
+def from_long(long):
+    """Date, Ticker, Open … Volume 행 테이블 → (ticker, field) 컬럼 패널"""
+    long = long.assign(Date=pd.to_datetime(long["Date"]))
+    panel = long.pivot_table(index="Date", columns="Ticker", values=list(FIELDS), aggfunc="last")
+    panel = panel.swaplevel(axis=1).sort_index(axis=1)
+    tickers = list(dict.fromkeys(long["Ticker"]))
+    columns = pd.MultiIndex.from_product([tickers, FIELDS], names=["Ticker", "Price"])
+    return panel.reindex(columns=columns).sort_index()
+
+
+def window_slice(panel, as_of=None, period=None, start=None):
+    """as_of 기준으로 period(달력일, 예: "30d") 또는 start 이후 봉만 남긴다"""
+    if panel.empty:
+        return panel
+    if as_of is not None:
+        panel = panel[panel.index <= pd.Timestamp(as_of)]
+    if panel.empty:
+        return panel
+    if start is not None:
+        panel = panel[panel.index >= pd.Timestamp(start)]
+    elif period is not None:
+        first = panel.index[-1] - timedelta(days=int(period.rstrip("d")) - 1)
+        panel = panel[panel.index >= first]
+    return panel
+
+
+def select(panel, tickers):
+    """요청 종목만 골라내고, 종가가 없는 종목은 누락으로 보고한다"""
+    have = set(fetch.received(panel)) if not panel.empty else set()
+    keep = [t for t in tickers if t in have]
+    missing = {t: "no data" for t in tickers if t not in have}
+    if not keep:
+        return pd.DataFrame(), missing
+    return panel.loc[:, panel.columns.get_level_values(0).isin(keep)], missing
+
+
+class DataProvider:
+    """공급자 인터페이스 — fetch() 만 구현하면 된다"""
+
+    name = "base"
+    cacheable = False  # True 면 OHLCVStore 에 쌓아 두고 새 봉만 받는다
+
+    def fetch(self, tickers, period=None, start=None):
+        raise NotImplementedError
+
+    def __call__(self, tickers, **window):
+        panel, missing = self.fetch(tickers, **window)
+        if missing:
+            logger.warning("[%s] %d종목 수신 실패: %s", self.name, len(missing), ", ".join(sorted(missing)))
+        panel.attrs["missing"] = missing
+        return panel
+
+
+class YFinanceProvider(DataProvider):
+    name = "yfinance"
+    cacheable = True
+
+    def __init__(self, batch_size=fetch.BATCH_SIZE, max_workers=fetch.MAX_WORKERS,
+                 retries=fetch.RETRIES, backoff=fetch.BACKOFF):
+        self.options = dict(batch_size=batch_size, max_workers=max_workers,
+                            retries=retries, backoff=backoff)
+
+    def fetch(self, tickers, period=None, start=None):
+        window = {"start": start} if start is not None else {"period": period or "30d"}
+        return fetch.fetch_panel(list(tickers), **self.options, **window)
+
+
+class CSVStoreProvider(DataProvider):
+    """
+    종목별 파일 디렉터리 (<root>/<ticker>.csv 또는 .parquet)
+    컬럼: Date, Open, High, Low, Close, Volume
+    """
+
+    name = "csv"
+
+    def __init__(self, root, as_of=None):
+        self.root = root
+        self.as_of = as_of
+
+    def _path(self, ticker):
+        for ext in (".parquet", ".csv"):
+            path = os.path.join(self.root, ticker + ext)
+            if os.path.exists(path):
+                return path
+        return None
+
+    def fetch(self, tickers, period=None, start=None):
+        frames = {}
+        for ticker in tickers:
+            path = self._path(ticker)
+            if path is None:
+                continue
+            frame = read_table(path)
+            frame.index = pd.to_datetime(frame.pop("Date"))
+            frames[ticker] = frame.reindex(columns=list(FIELDS))
+        if not frames:
+            return pd.DataFrame(), {t: "no file" for t in tickers}
+        panel = pd.concat(frames, axis=1).sort_index()
+        panel = window_slice(panel, self.as_of, period, start)
+        return select(panel, tickers)
+
+    @staticmethod
+    def export(panel, root):
+        """패널을 종목별 파일로 저장 (이 공급자가 읽을 수 있는 형태)"""
+        os.makedirs(root, exist_ok=True)
+        for ticker in dict.fromkeys(panel.columns.get_level_values(0)):
+            frame = panel[ticker].dropna(subset=["Close"]).rename_axis("Date").reset_index()
+            write_table(frame, os.path.join(root, f"{ticker}.csv"))
+
+
+class ReplayProvider(DataProvider):
+    """
+    녹화된 패널 재생기. 기간 계산을 현재 시각이 아니라 as_of(기본: 녹화 마지막 날) 기준으로
+    하므로 같은 녹화·같은 as_of 는 언제 실행해도 같은 결과를 낸다.
+    """
+
+    name = "replay"
+
+    def __init__(self, panel, as_of=None):
+        self.panel = panel.sort_index()
+        self.as_of = pd.Timestamp(as_of) if as_of is not None else None
+
+    @classmethod
+    def load(cls, path, as_of=None):
+        return cls(from_long(read_table(path)), as_of=as_of)
+
+    @staticmethod
+    def record(panel, path):
+        """패널을 재생용 파일로 녹화 (.csv 또는 .parquet)"""
+        write_table(to_long(panel), path)
+
+    @property
+    def dates(self):
+        return self.panel.index
+
+    def advance(self, days=1):
+        """as_of 를 다음 거래일로 옮긴다 (하루씩 재생) — 더 갈 곳이 없으면 False"""
+        index = self.panel.index
+        pos = len(index) - 1 if self.as_of is None else int(np.searchsorted(index, self.as_of, side="right")) - 1
+        if pos + days >= len(index):
+            return False
+        self.as_of = index[pos + days]
+        return True
+
+    def fetch(self, tickers, period=None, start=None):
+        panel = window_slice(self.panel, self.as_of, period, start)
+        return select(panel, tickers)
+
+
+def default_provider():
+    """SCANNER_DATA_SOURCE 환경변수로 공급자를 고른다 (기본 yfinance)"""
+    spec = os.environ.get(DATA_SOURCE_ENV, "yfinance")
+    kind, _, arg = spec.partition(":")
+    if kind == "csv":
+        return CSVStoreProvider(arg)
+    if kind == "replay":
+        return ReplayProvider.load(arg)
+    if kind == "history":
+        from scanner.history import DEFAULT_HISTORY_DIR, HistoryProvider
+
+        return HistoryProvider(arg or DEFAULT_HISTORY_DIR)
+    return YFinanceProvider()
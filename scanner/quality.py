@@ -0,0 +1,153 @@
+"""
+데이터 품질 검사 · 액면분할 수정 (점수 계산 전 단계)
+
+yfinance 패널에는 거래정지(거래량 0 · 가격 고정) 봉, 장 시작 전 자리만 잡힌 봉,
+같은 봉이 날짜만 바뀌어 한 번 더 오는 경우, 수정주가에 아직 반영되지 않은
+액면분할 · 병합 갭이 섞여 온다. 그대로 두면 거래량 비율 · 연속 증가 · MA20 괴리가
+가짜 시그널을 만들거나 0 으로 가려진다. (일자 × 종목) 배열 전체를 한 번에 훑어
+봉을 고치고 종목마다 품질 플래그를 단다.
+
+    거래량 0 봉      거래가 없던 봉 — 지운다 (ZERO_VOLUME)
+                     마지막 봉이 거래량 0 이면 거래정지로 보고 분석에서 뺀다 (HALTED).
+                     단, 마지막 날 대부분 종목이 거래량 0 이면 장 시작 전 자리 봉이라 그 날만 지운다
+                     (is_placeholder — 유니버스 전체로 한 번 판단한다. 샤드 스캔은 부모가
+                     샤드별 placeholder_counts 를 더해 정하고 clean_arrays(placeholder=) 로 넘긴다).
+    반복 봉          직전 유효 봉과 시가 · 종가 · 거래량이 모두 같은 봉 — 지운다 (STALE)
+    분할 · 병합 갭   전일 대비 종가가 가격제한폭(±30%)을 넘게 움직였고 그 비율이 흔한 분할
+                     비율에 맞는 봉 — 그 비율을 이전 봉 가격에 곱하고 거래량은 나눈다 (SPLIT).
+    큰 갭            분할 비율에 맞지 않는 갭(거래 재개 · 긴 결측 뒤 · 가격제한폭이 없는 해외 종목)은
+                     실제 등락으로 두고 표시만 한다 (OUTLIER)
+    튄 봉           분할 비율 갭이 다음 봉에서 그대로 되돌아가면 분할이 아니라 가격만 잘못 온 봉 —
+                     되돌린 비율로 그 봉 가격만 고친다 (OUTLIER)
+
+지운 봉은 종가를 NaN 으로 두므로 이후 단계(align_valid)가 결측 봉과 똑같이 건너뛴다.
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+HALTED, ZERO_VOLUME, STALE, SPLIT, OUTLIER = 1, 2, 4, 8, 16
+FLAG_NAMES = {HALTED: "halted", ZERO_VOLUME: "zero_volume", STALE: "stale_bar", SPLIT: "split_adjusted",
+              OUTLIER: "outlier_bar"}
+
+PRICE_LIMIT = 0.30   # KRX 일일 가격제한폭
+GAP_SLACK = 0.05     # 호가 단위 반올림 여유
+SPLIT_RATIOS = (1.5, 2, 2.5, 3, 4, 5, 10, 20, 25, 50, 100)  # 흔한 분할 · 무상증자 · 병합 비율
+SNAP = 0.10          # 이 범위 안이면 분할 비율로 맞춘다 (나머지는 그날의 실제 등락)
+PLACEHOLDER_SHARE = 0.5  # 마지막 날 유효 봉 중 이 비율 이상이 거래량 0 이면 자리 봉
+PLACEHOLDER_MIN = 20     # 그리고 최소 이만큼 (유니버스가 더 작으면 전부)
+
+Cleaned = namedtuple("Cleaned", "opens close volume flags")
+_RATIOS = np.array(sorted(SPLIT_RATIOS + tuple(1 / r for r in SPLIT_RATIOS)))
+
+
+def split_factors(ratio):
+    """
+    전일 대비 종가 비율 → (그 봉 이전 가격에 곱할 계수, 가격제한폭 밖 갭 여부).
+    계수는 분할 비율(SPLIT_RATIOS 또는 역수)에 SNAP 이내로 맞을 때만 그 비율이고, 나머지는 1 —
+    맞지 않는 갭은 실제 등락으로 남긴다.
+    """
+    ratio = np.asarray(ratio, dtype=np.float64)
+    gap = np.isfinite(ratio) & (ratio > 0) & (np.abs(ratio - 1) > PRICE_LIMIT + GAP_SLACK)
+    factors = np.ones(ratio.shape)
+    r = ratio[gap]
+    nearest = _RATIOS[np.abs(np.log(r[:, None] / _RATIOS)).argmin(axis=1)]
+    factors[gap] = np.where(np.abs(np.log(r / nearest)) < np.log1p(SNAP), nearest, 1.0)
+    return factors, gap
+
+
+def placeholder_counts(close, volume):
+    """마지막 날의 (거래량 0 봉 수, 유효 봉 수) — 샤드별 값을 더해 is_placeholder 에 넘긴다"""
+    if not len(close):
+        return 0, 0
+    valid = np.isfinite(close[-1])
+    return int((valid & (volume[-1] == 0)).sum()), int(valid.sum())
+
+
+def is_placeholder(zeros, valid):
+    """마지막 날이 장 시작 전 자리 봉인가 (유니버스 전체의 placeholder_counts 로 판단)"""
+    return zeros > 0 and zeros >= max(min(PLACEHOLDER_MIN, valid), PLACEHOLDER_SHARE * valid)
+
+
+def clean_arrays(opens, close, volume, placeholder=None):
+    """
+    (일자 × 종목) 시가 · 종가 · 거래량 → Cleaned(opens, close, volume, flags).
+    입력은 건드리지 않는다. flags 는 종목별 품질 비트 (HALTED | ZERO_VOLUME | STALE | SPLIT | OUTLIER).
+    placeholder = 마지막 날이 자리 봉인지 (None 이면 이 배열만으로 판단 — 유니버스 일부만
+    넘길 때는 전체로 정한 값을 넘긴다).
+    """
+    close = np.array(close, dtype=np.float64)
+    opens = np.array(opens, dtype=np.float64)
+    volume = np.array(volume, dtype=np.float64)
+    n_days, n_tickers = close.shape
+    flags = np.zeros(n_tickers, dtype=np.uint8)
+    if not n_days:
+        return Cleaned(opens, close, volume, flags)
+    valid = np.isfinite(close)
+
+    # 거래량 0 봉 — 마지막 유효 봉이면 거래정지
+    zero = valid & (volume == 0)
+    if placeholder is None:
+        placeholder = is_placeholder(*placeholder_counts(close, volume))
+    if placeholder:
+        valid[-1] &= ~zero[-1]  # 장 시작 전 자리 봉 — 플래그 없이 그 날만 지운다
+        zero[-1] = False
+    last = n_days - 1 - np.argmax(valid[::-1], axis=0)
+    flags[valid.any(axis=0) & zero[last, np.arange(n_tickers)]] |= HALTED
+    flags[zero.any(axis=0)] |= ZERO_VOLUME
+    valid &= ~zero
+
+    # 직전 유효 봉 (종목마다 앞으로 채운 행 번호)
+    rows = np.where(valid, np.arange(n_days)[:, None], -1)
+    prev = np.vstack([np.full((1, n_tickers), -1), np.maximum.accumulate(rows, axis=0)[:-1]])
+    has_prev = valid & (prev >= 0)
+    p = np.maximum(prev, 0)
+    prev_close = np.take_along_axis(close, p, axis=0)
+
+    # 반복 봉 — 지워도 다음 봉의 직전 값은 같으므로 prev 를 다시 구하지 않는다
+    stale = has_prev & (close == prev_close) & (opens == np.take_along_axis(opens, p, axis=0)) \
+        & (volume == np.take_along_axis(volume, p, axis=0))
+    flags[stale.any(axis=0)] |= STALE
+    valid &= ~stale
+
+    # 분할 · 병합 갭 — t 봉의 계수를 t 이전 봉 전체에 곱한다 (뒤에서부터 누적곱)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        factor, gap = split_factors(np.where(has_prev & valid, close / prev_close, np.nan))
+    snapped = factor != 1
+    flags[(gap & ~snapped).any(axis=0)] |= OUTLIER  # 분할 비율이 아닌 큰 갭 — 고치지 않는다
+
+    # 바로 다음 봉이 분할 갭을 되돌리면 (두 계수의 곱 ≈ 1) 그 봉 하나가 튄 것이다
+    outlier = np.zeros_like(snapped)
+    outlier[:-1] = snapped[:-1] & snapped[1:] & (np.abs(np.log(factor[:-1] * factor[1:])) < np.log1p(SNAP))
+    flags[outlier.any(axis=0)] |= OUTLIER
+    fix = np.where(outlier[:-1], factor[1:], 1.0)
+    close[:-1] *= fix
+    opens[:-1] *= fix
+    factor[outlier] = 1
+    factor[1:][outlier[:-1]] = 1
+    adjusted = factor != 1
+    if adjusted.any():
+        flags[adjusted.any(axis=0)] |= SPLIT
+        after = np.ones((n_days, n_tickers))
+        after[:-1] = np.cumprod(factor[::-1], axis=0)[::-1][1:]
+        close *= after
+        opens *= after
+        volume /= after
+
+    close[~valid] = np.nan
+    opens[~valid] = np.nan
+    volume[~valid] = np.nan
+    return Cleaned(opens, close, volume, flags)
+
+
+def halted(flags):
+    return (np.asarray(flags) & HALTED) > 0
+
+
+def record_quality(metrics, tickers, flags):
+    """품질 플래그별 종목 수를 세고, 거래정지 종목을 제외 사유와 함께 기록한다"""
+    flags = np.asarray(flags)
+    for bit, name in FLAG_NAMES.items():
+        metrics.count(f"quality_{name}", int(((flags & bit) > 0).sum()))
+    metrics.drop({tickers[i]: "halted" for i in np.flatnonzero(halted(flags))})
@@ -0,0 +1,64 @@
+"""
+결과 카드 HTML
+
+카드마다 st.markdown 을 부르고 iterrows 로 행을 꺼내는 대신, 컬럼 배열에서
+등급·색상·시그널 태그를 한 번에 만들고 카드 목록 전체를 HTML 문자열 하나로 합친다.
+(Streamlit 에는 델타 하나로 보낸다)
+"""
+
+from html import escape
+
+import numpy as np
+
+from scanner.schema import HIGH_SCORE, MID_SCORE, SCORE_COLUMN
+
+CARD = (
+    '<div class="score-card {card_class}">'
+    "<b>{grade} {name}</b>"
+    '<span style="float:right; color:#ffd700; font-weight:bold;">{score}점</span><br>'
+    '<span style="color:#aaa;">{sector}</span> · '
+    "<span>{price:,}원</span> · "
+    '<span style="color:{change_color}; font-weight:bold;">{change:+.2f}%</span> · '
+    '<span style="color:#aaa;">거래량 {volume:,}</span><br>'
+    "{tags}</div>"
+)
+
+
+def tag(mask, css, labels):
+    """mask 인 행에만 시그널 태그 <span> (나머지는 빈 문자열)"""
+    spans = f'<span class="signal-tag {css}">' + np.asarray(labels, dtype=object) + "</span>"
+    return np.where(mask, spans, "")
+
+
+def cards_html(frame):
+    """결과 DataFrame(RESULT_COLUMNS) → 카드 목록 HTML 하나"""
+    if frame.empty:
+        return ""
+    score = frame[SCORE_COLUMN].to_numpy()
+    change = frame["등락률"].to_numpy(dtype=np.float64)
+    names = np.array([escape(str(v)) for v in frame["종목명"]], dtype=object)
+    sectors = np.array([escape(str(v)) for v in frame["섹터"]], dtype=object)
+
+    card_class = np.select([score >= HIGH_SCORE, score >= MID_SCORE], ["score-high", "score-mid"], "score-low")
+    grade = np.select([score >= HIGH_SCORE, score >= MID_SCORE], ["🔥", "⚡"], "💤")
+    change_color = np.where(change >= 0, "#ff4444", "#4488ff")
+
+    tags = (
+        tag(frame["vol_score"].to_numpy() > 0, "tag-vol",
+            [f"📊 x{v}" for v in frame["거래량비율"].to_numpy(dtype=np.float64)])
+        + tag(frame["consec_score"].to_numpy() > 0, "tag-consec",
+              [f"📈 {v}일연속" for v in frame["연속증가일"].to_numpy()])
+        + tag(frame["bounce_score"].to_numpy() > 0, "tag-bounce",
+              [f"🔄 MA{v:+.1f}%" for v in frame["MA20괴리"].to_numpy(dtype=np.float64)])
+        + tag(frame["sector_score"].to_numpy() > 0, "tag-sector", "🏭 " + sectors)
+    )
+
+    return "\n".join(
+        CARD.format(card_class=c, grade=g, name=n, score=s, sector=sec, price=p,
+                    change_color=cc, change=ch, volume=v, tags=t)
+        for c, g, n, s, sec, p, cc, ch, v, t in zip(
+            card_class, grade, names, score.tolist(), sectors,
+            frame["현재가"].to_numpy().tolist(), change_color, change,
+            frame["거래량"].to_numpy().tolist(), tags,
+        )
+    )
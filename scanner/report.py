@@ -0,0 +1,216 @@
+"""
+텔레그램 리포트 — 구독자별 맞춤 리포트를 한 번의 스캔 결과로 만든다
+
+구독자 프로필마다 섹터 필터 · 최소 점수 · 관심 종목 · 상위 N 을 따로 두고,
+스캔 결과 스냅샷 하나에서 모든 구독자의 메시지를 만든다.
+
+- 종목 블록(한 종목의 2~3줄 텍스트)은 어느 구독자에게든 처음 필요할 때 한 번만 만든다.
+- 구독자별 종목 선택은 스냅샷 인덱스(SnapshotIndex)의 섹터 · 점수 슬라이스와
+  종목 위치 사전으로 한다 — 구독자마다 DataFrame 을 거르지 않는다.
+- 구독자별 알림 상태(scanner.alerts)의 변동(AlertDiff)을 주면 전체 순위 대신 신규 · 승격 ·
+  이탈 종목만 담은 변동 알림을 만든다 (구독자 조건에 맞는 변동이 없으면 보내지 않는다).
+- 관심 종목은 종목코드로 적는다. 스냅샷에 종목코드가 없으면(결과 DataFrame 에서
+  만든 경우) 유니버스의 종목명으로 찾는다.
+
+구독자 파일 (JSON 배열 또는 한 줄에 하나씩):
+
+    {"chat_id": "123", "sectors": ["반도체"], "min_score": 70, "watchlist": ["005930.KS"], "top_n": 10}
+"""
+
+import json
+from collections import Counter, namedtuple
+from datetime import datetime
+
+import numpy as np
+
+from scanner.alerts import GRADES, grade_codes
+from scanner.market import KST
+from scanner.schema import HIGH_SCORE, MID_SCORE
+from scanner.universe import as_universe
+
+MIN_SCORE = 60
+WEEKDAYS = ["월", "화", "수", "목", "금", "토", "일"]
+RULE = "━━━━━━━━━━━━━━━\n"
+FOOTER = RULE + "⚠️ 투자 참고용이며 매수 추천이 아닙니다.\n🔔 홍익 미래유산 검색기 v2.0"
+
+Subscriber = namedtuple("Subscriber", "chat_id sectors min_score watchlist top_n",
+                        defaults=(None, MIN_SCORE, (), None))
+Subscriber.__doc__ = "구독자 프로필 — sectors=None 이면 전체 섹터, top_n=None 이면 제한 없음"
+
+
+def load_subscribers(path):
+    """
+    구독자 파일(JSON 배열 또는 JSON Lines) → Subscriber 목록.
+    메시지는 chat_id 마다 하나이므로 같은 chat_id 가 두 번 나오면 ValueError.
+    """
+    with open(path, encoding="utf-8") as fh:
+        text = fh.read().strip()
+    if text.startswith("["):
+        entries = json.loads(text)
+    else:
+        entries = [json.loads(line) for line in text.splitlines() if line.strip()]
+    subscribers = [
+        Subscriber(
+            chat_id=str(e["chat_id"]),
+            sectors=tuple(e["sectors"]) if e.get("sectors") else None,
+            min_score=int(e.get("min_score", MIN_SCORE)),
+            watchlist=tuple(e.get("watchlist") or ()),
+            top_n=e.get("top_n"),
+        )
+        for e in entries
+    ]
+    counts = Counter(s.chat_id for s in subscribers)
+    duplicated = [chat_id for chat_id, n in counts.items() if n > 1]
+    if duplicated:
+        raise ValueError(f"{path}: chat_id 중복 — {', '.join(duplicated)} (채팅방마다 프로필 하나)")
+    return subscribers
+
+
+def report_header(now=None):
+    now = now or datetime.now(KST)
+    weekday = WEEKDAYS[now.weekday()]
+    return (f"🔔 홍익 미래유산 리포트\n"
+            f"📅 {now.strftime('%Y.%m.%d')} ({weekday}) {now.strftime('%H:%M')}\n"
+            + RULE + "\n")
+
+
+def stock_blocks(frame):
+    """결과 DataFrame(RESULT_COLUMNS) → 행마다 종목 블록 문자열 (빈 줄 포함)"""
+    if frame.empty:
+        return []
+    score = frame["종합점수"].to_numpy()
+    grades = np.select([score >= HIGH_SCORE, score >= MID_SCORE], ["🔥", "⚡"], "💤")
+    blocks = []
+    for g, name, sector, s, price, change, vol, ratio, consec, days, bounce, sec in zip(
+            grades, frame["종목명"], frame["섹터"], score.tolist(), frame["현재가"].tolist(),
+            frame["등락률"].tolist(), frame["vol_score"].to_numpy(), frame["거래량비율"].tolist(),
+            frame["consec_score"].to_numpy(), frame["연속증가일"].tolist(),
+            frame["bounce_score"].to_numpy(), frame["sector_score"].to_numpy()):
+        signals = []
+        if vol > 0:
+            signals.append(f"📊거래량 x{ratio}")
+        if consec > 0:
+            signals.append(f"📈{days}일연속")
+        if bounce > 0:
+            signals.append("🔄눌림목반등")
+        if sec > 0:
+            signals.append("🏭섹터동반")
+        block = f"{g} {name} [{sector}] — {s}점\n   {price:,}원 ({change:+.2f}%)\n"
+        if signals:
+            block += f"   {' | '.join(signals)}\n"
+        blocks.append(block + "\n")
+    return blocks
+
+
+class ReportBook:
+    """
+    스냅샷 하나로 구독자별 메시지를 만든다.
+    점수순 순위 · 종목코드 위치는 처음에, 종목 블록은 처음 쓰일 때 한 번만 만든다.
+    """
+
+    def __init__(self, snapshot, universe=None, now=None):
+        self.snapshot = snapshot
+        self.header = report_header(now)
+        self.blocks = np.empty(len(snapshot), dtype=object)
+        self.built = np.zeros(len(snapshot), dtype=bool)
+        self.rank = np.empty(len(snapshot), dtype=np.int64)
+        self.rank[snapshot.index.order] = np.arange(len(snapshot))
+        if snapshot.categories["ticker"]:
+            self.position = {t: i for i, t in enumerate(snapshot.tickers)}
+        else:
+            universe = as_universe(universe)
+            rows = {name: i for i, name in enumerate(snapshot.column("종목명"))}
+            self.position = {t: rows[name] for t, name in zip(universe.tickers, universe.names) if name in rows}
+
+    def rows(self, subscriber):
+        """구독자 조건의 행 번호 (점수 내림차순)"""
+        select = self.snapshot.select
+        if not subscriber.sectors:
+            return select(None, subscriber.min_score, subscriber.top_n)
+        # 섹터별 상위 top_n 슬라이스를 모아 전체 순위로 합친다
+        parts = [select(sector, subscriber.min_score, subscriber.top_n) for sector in subscriber.sectors]
+        rows = np.concatenate(parts) if parts else np.zeros(0, dtype=np.int64)
+        rows = rows[np.argsort(self.rank[rows], kind="stable")]
+        return rows if subscriber.top_n is None else rows[:subscriber.top_n]
+
+    def build(self, rows):
+        """rows 중 아직 없는 종목 블록만 한 번에 만든다"""
+        rows = np.asarray(rows, dtype=np.int64)
+        missing = np.unique(rows[~self.built[rows]])
+        if len(missing):
+            self.blocks[missing] = stock_blocks(self.snapshot.frame(missing))
+            self.built[missing] = True
+        return rows
+
+    def text(self, rows):
+        return "".join(self.blocks[self.build(rows)])
+
+    def watch_rows(self, subscriber):
+        return [self.position[t] for t in subscriber.watchlist if t in self.position]
+
+    def message(self, subscriber, rows=None):
+        rows = self.rows(subscriber) if rows is None else rows
+        text = self.header
+        if subscriber.sectors or subscriber.top_n:
+            scope = ", ".join(subscriber.sectors) if subscriber.sectors else "전체 섹터"
+            limit = f" · 상위 {subscriber.top_n}" if subscriber.top_n else ""
+            text += f"🎯 {scope} · {subscriber.min_score}점 이상{limit}\n\n"
+        if len(rows):
+            text += self.text(rows)
+        else:
+            text += f"📭 오늘은 {subscriber.min_score}점 이상 시그널 종목이 없습니다.\n"
+            text += "시장 상황을 지켜봐주세요.\n"
+        watch = self.watch_rows(subscriber)
+        if watch:
+            text += "⭐ 관심 종목\n\n" + self.text(watch)
+        return text + FOOTER
+
+    def scope(self, subscriber, rows):
+        """rows 중 구독자 조건(섹터 · 최소 점수)에 맞거나 관심 종목인 행"""
+        rows = np.asarray(rows, dtype=np.int64)
+        ok = self.snapshot.records["total"][rows] >= subscriber.min_score
+        if subscriber.sectors:
+            labels = self.snapshot.categories["sector"]
+            codes = [labels.index(s) for s in subscriber.sectors if s in labels]
+            ok &= np.isin(self.snapshot.records["sector"][rows], codes)
+        return rows[ok | np.isin(rows, self.watch_rows(subscriber))]
+
+    def change_message(self, subscriber, diff):
+        """AlertDiff → 변동 알림 (구독자에게 해당하는 변동이 없으면 None)"""
+        new = self.scope(subscriber, diff.new)
+        upgraded = self.scope(subscriber, diff.upgraded)
+        dropped = diff.dropped[diff.dropped["알린점수"] >= subscriber.min_score]
+        if subscriber.sectors:
+            dropped = dropped[dropped["섹터"].isin(subscriber.sectors) | dropped["종목코드"].isin(subscriber.watchlist)]
+        if not (len(new) or len(upgraded) or len(dropped)):
+            return None
+        text = self.header
+        if len(new):
+            text += f"🆕 신규 진입 ({len(new)})\n\n" + self.text(new)
+        if len(upgraded):
+            text += f"⬆️ 등급 상승 ({len(upgraded)})\n\n" + self.text(upgraded)
+        if len(dropped):
+            text += f"📉 이탈 ({len(dropped)})\n"
+            for name, sector, was, now in zip(dropped["종목명"], dropped["섹터"],
+                                               dropped["알린점수"], dropped["현재점수"]):
+                now = "결과 제외" if np.isnan(now) else f"{GRADES[grade_codes(now)]} {now:.0f}점"
+                text += f"   {name} [{sector}] {was}점 → {now}\n"
+            text += "\n"
+        return text + FOOTER
+
+    def messages(self, subscribers, diffs=None):
+        """
+        {chat_id: 메시지} — 모든 구독자에게 필요한 종목 블록을 먼저 한 번에 만든다.
+        diffs({chat_id: AlertDiff})를 주면 구독자마다 자기 변동 알림만, 해당 변동이 없는 구독자는 뺀다.
+        """
+        if diffs is not None:
+            parts = [np.concatenate([d.new, d.upgraded]) for d in diffs.values()]
+            if parts:
+                self.build(np.concatenate(parts))
+            changes = ((s.chat_id, self.change_message(s, diffs[s.chat_id])) for s in subscribers)
+            return {chat_id: text for chat_id, text in changes if text is not None}
+        selected = [self.rows(s) for s in subscribers]
+        needed = selected + [np.asarray(self.watch_rows(s), dtype=np.int64) for s in subscribers]
+        if needed:
+            self.build(np.concatenate(needed))
+        return {s.chat_id: self.message(s, rows) for s, rows in zip(subscribers, selected)}
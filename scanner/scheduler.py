@@ -0,0 +1,114 @@
+"""
+백그라운드 스캔 스케줄러
+
+페이지 요청과 무관하게 장 시간에 맞춰 스캔을 미리 돌리고, 결과를 공유 결과 캐시
+(ScanCache)에 게시한다. app.py 는 게시된 결과를 읽기만 한다.
+
+    정규장       INTERVALS["open"]    (1분)
+    평일 장 외   INTERVALS["closed"]  (30분)
+    주말         INTERVALS["weekend"] (6시간)
+
+장 시작 시각과 마감 후 SETTLE 시점(당일 종가 확정 봉)에는 주기와 상관없이 한 번 돈다.
+여러 프로세스가 같은 캐시 디렉터리를 쓰면 한 곳만 스캔한다 (나머지는 그 주기를 건너뜀).
+on_scan(snapshot) 을 주면 게시한 뒤 매번 부른다 — 변동 알림(scanner.alerts)을 붙이는 자리.
+
+    python -m scanner.scheduler        # 독립 워커로 실행
+"""
+
+import logging
+import threading
+from datetime import datetime, timedelta
+
+from scanner.cache import ScanCache
+from scanner.incremental import IncrementalScanner
+from scanner.market import KST, market_phase, next_session_event
+from scanner.metrics import ScanMetrics, profiled
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_KEY = "latest"
+INTERVALS = {"open": 60, "closed": 30 * 60, "weekend": 6 * 60 * 60}
+SETTLE = timedelta(minutes=10)  # 마감 후 종가 확정까지 기다림
+
+
+def next_run(now=None):
+    """장 상태별 주기와 다음 장 시작/마감 시점 중 빠른 쪽"""
+    now = (now or datetime.now(KST)).astimezone(KST)
+    periodic = now + timedelta(seconds=INTERVALS[market_phase(now)])
+    return min(periodic, next_session_event(now, after_close=SETTLE))
+
+
+class ScanScheduler:
+    def __init__(self, cache=None, key=SNAPSHOT_KEY, sector_map=None,
+                 provider=None, store=None, max_age=None, on_scan=None):
+        self.cache = cache or ScanCache()
+        self.key = key
+        self.live = IncrementalScanner(sector_map)
+        self.provider = provider
+        self.store = store
+        self.max_age = max_age
+        self.on_scan = on_scan
+        self.next_at = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def scan(self):
+        """증분 갱신 한 번 → 전체 결과 스냅샷"""
+        metrics = ScanMetrics("scheduler")
+        with profiled():
+            self.live.refresh(self.provider, self.store, self.max_age, metrics)
+            with metrics.stage("snapshot"):
+                result = self.live.snapshot()
+        metrics.count("scored", len(result))
+        metrics.emit(phase=market_phase())
+        return result
+
+    def run_once(self, now=None):
+        """
+        스캔해서 게시한다. 다른 프로세스가 스캔 중이거나
+        주기의 절반 안에 게시해 두었다면 건너뛴다 (None 또는 그 결과를 돌려줌).
+        """
+        fresh = INTERVALS[market_phase(now)] / 2
+        result = self.cache.refresh(self.key, self.scan, ttl=fresh, blocking=False)
+        if result is not None and self.on_scan is not None:
+            self.on_scan(result)
+        return result
+
+    def run_forever(self):
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception:
+                logger.exception("예약 스캔 실패 — 다음 주기에 다시 시도한다")
+            now = datetime.now(KST)
+            self.next_at = next_run(now)
+            self._stop.wait((self.next_at - now).total_seconds())
+
+    def start(self):
+        """데몬 스레드로 시작 (이미 돌고 있으면 그대로)"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self.run_forever, name="scan-scheduler", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def latest(self):
+        """게시된 최신 스냅샷 — 첫 게시 전이면 진행 중인 첫 스캔이 끝나길 기다린다"""
+        result, _ = self.cache.read(self.key)
+        if result is None:
+            result = self.cache.refresh(self.key, self.scan)
+        return result
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    worker = ScanScheduler()
+    try:
+        worker.run_forever()
+    except KeyboardInterrupt:
+        pass
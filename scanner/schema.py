@@ -0,0 +1,25 @@
+"""
+스캔 결과 스키마
+
+run_analysis() 가 돌려주는 DataFrame 의 컬럼과 등급 기준.
+"""
+
+RESULT_COLUMNS = [
+    "종목명", "섹터", "현재가", "등락률", "거래량", "거래량비율", "연속증가일",
+    "MA20괴리", "vol_score", "consec_score", "bounce_score",
+    "sector_score", "종합점수",
+]
+SCORE_COLUMN = "종합점수"
+
+HIGH_SCORE = 70
+MID_SCORE = 50
+
+
+def grade(score):
+    """종합점수 등급 이모지 (🔥 70점 이상 / ⚡ 50점 이상 / 💤)"""
+    if score >= HIGH_SCORE:
+        return "🔥"
+    if score >= MID_SCORE:
+        return "⚡"
+    return "💤"
+
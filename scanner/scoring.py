@@ -0,0 +1,202 @@
+"""
+4대 시그널 점수 엔진 (패널 단위 벡터 연산)
+
+종목별 for 루프 대신 (일자 × 종목) 2차원 배열 전체에 대해
+거래량 급증 · 연속 증가 · 눌림목 반등 · 섹터 동반상승을 한 번에 계산한다.
+"""
+
+import numpy as np
+import pandas as pd
+
+from scanner.breadth import breadth_table, group_sums, level_counts, level_sums, universe_levels
+from scanner.metrics import ScanMetrics
+from scanner.quality import clean_arrays, halted, record_quality
+from scanner.schema import RESULT_COLUMNS
+from scanner.universe import as_universe
+
+# ===== 점수 구간 (높은 구간부터) =====
+VOL_TIERS = ((5.0, 30), (3.0, 25), (2.0, 20), (1.5, 15), (1.2, 10))
+CONSEC_TIERS = ((5, 20), (4, 16), (3, 12), (2, 8))
+SECTOR_TIERS = ((0.8, 20), (0.6, 15), (0.4, 10))
+MA_BAND = (-3.0, 5.0)
+BOUNCE_POINTS = (30, 20, 10)  # 양봉+직전하락 / 양봉 / MA20 근접만
+
+MIN_BARS = 10
+FIELDS = ("Open", "High", "Low", "Close", "Volume")
+
+
+def tier_score(values, tiers):
+    """구간표 ((기준값, 점수), ...)에 따라 배열 전체를 점수로 변환"""
+    values = np.asarray(values)
+    return np.select(
+        [values >= threshold for threshold, _ in tiers],
+        [points for _, points in tiers],
+        0,
+    ).astype(np.int64)
+
+
+def panel_arrays(data, tickers, fields=("Open", "Close", "Volume")):
+    """yf.download(group_by="ticker") 결과를 필드별 (일자 × 종목) 배열로 변환"""
+    if not isinstance(data.columns, pd.MultiIndex):
+        data = pd.concat({tickers[0]: data}, axis=1)
+    out = []
+    for field in fields:
+        frame = data.xs(field, axis=1, level=1).reindex(columns=tickers)
+        out.append(frame.to_numpy(dtype=np.float64))
+    return out
+
+
+def align_valid(close, *others):
+    """
+    종가 결측 행을 종목마다 제거한 것과 같도록 유효한 행을 아래(최근)로 모은다.
+    반환: (종목별 유효 행 수, [정렬된 close, *others]) — 빈 자리는 NaN
+    """
+    valid = ~np.isnan(close)
+    n_valid = valid.sum(axis=0)
+    arrays = (close,) + others
+    if valid.all():
+        return n_valid, [np.asarray(a, dtype=np.float64) for a in arrays]
+
+    order = np.argsort(valid, axis=0, kind="stable")
+    keep = np.arange(close.shape[0])[:, None] >= close.shape[0] - n_valid
+    out = []
+    for arr in arrays:
+        packed = np.take_along_axis(np.asarray(arr, dtype=np.float64), order, axis=0)
+        out.append(np.where(keep, packed, np.nan))
+    return n_valid, out
+
+
+def trailing_streak(volume):
+    """마지막 봉부터 거꾸로 '전일 대비 거래량 증가'가 이어진 일수"""
+    if volume.shape[0] < 2:
+        return np.zeros(volume.shape[1], dtype=np.int64)
+    rising = volume[1:] > volume[:-1]
+    return np.cumprod(rising[::-1], axis=0).sum(axis=0).astype(np.int64)
+
+
+def score_panel(close, opens, volume, sector_codes, n_sectors=None):
+    """
+    (일자 × 종목) 종가·시가·거래량 배열과 종목별 섹터 코드로 4대 시그널 점수를 계산한다.
+    결과는 종목 축 1차원 배열 dict 이며 "included" 가 False 인 종목은 분석 제외 대상이다.
+    """
+    sector_codes = np.asarray(sector_codes, dtype=np.int64)
+    if n_sectors is None:
+        n_sectors = int(sector_codes.max()) + 1 if sector_codes.size else 0
+    scores = score_signals(close, opens, volume)
+    counts, ups = sector_counts(scores["change_pct"], sector_codes, scores["included"], n_sectors)
+    return apply_sector(scores, sector_codes, counts, ups)
+
+
+def score_signals(close, opens, volume, signals=None):
+    """
+    시그널 1~3 과 등락률 · 분석 대상 여부 (섹터와 무관한 종목별 계산).
+    시그널 레지스트리(scanner.signals)로 계산한다 — signals 로 추가 시그널을 고를 수 있다.
+    """
+    from scanner.signals import DEFAULT_SIGNALS, evaluate
+
+    return evaluate(close, opens, volume, DEFAULT_SIGNALS if signals is None else signals)
+
+
+def apply_sector(scores, sector_codes, counts, ups):
+    """
+    시그널 4: 섹터 동반 상승 (분석 대상 종목 기준 상승 비율)
+    섹터 집계(counts, ups)는 전체 유니버스 기준이어야 한다 — 샤드별 부분합을 더해 넘겨도 된다.
+    """
+    sector_score = sector_points(counts, ups)[sector_codes]
+    return dict(
+        scores,
+        sector_score=sector_score,
+        total=scores["vol_score"] + scores["consec_score"] + scores["bounce_score"] + sector_score,
+    )
+
+
+def sector_counts(change_pct, sector_codes, included, n_sectors):
+    """
+    섹터별 (분석 종목 수, 상승 종목 수) — 섹터 한 단계만의 group_sums (scanner.breadth).
+    유니버스가 있으면 scan_breadth 로 시장 폭 표와 한 번에 집계한다.
+    """
+    zeros = np.zeros(len(sector_codes))
+    sums = group_sums(change_pct, zeros, zeros, np.asarray(sector_codes)[None], n_sectors, included)
+    return sums[:, 0].astype(np.int64), sums[:, 1].astype(np.int64)
+
+
+def scan_breadth(scores, universe):
+    """
+    섹터 · 세부업종 · 시장별 합을 한 번에 — (그룹별 합, 인덱스, 섹터 종목 수, 섹터 상승 수).
+    그룹별 합은 샤드별로 더할 수 있고, 섹터 단계가 시그널 4 의 집계다.
+    """
+    sums, index = level_sums(scores["change_pct"], scores["latest_volume"], universe,
+                             scores["included"], universe_levels(universe))
+    return (sums, index) + level_counts(sums, index)
+
+
+def sector_points(counts, ups):
+    """섹터별 집계로부터 섹터 동반상승 점수 배열을 만든다"""
+    with np.errstate(invalid="ignore", divide="ignore"):
+        up_ratio = np.where(counts > 0, ups / np.maximum(counts, 1), 0.0)
+    return tier_score(up_ratio, SECTOR_TIERS)
+
+
+def to_frame(scores, names, sectors):
+    """점수 dict 를 기존 결과 스키마(한글 컬럼) DataFrame 으로 변환"""
+    mask = scores["included"]
+    if not mask.any():
+        return pd.DataFrame()
+    names = np.asarray(names, dtype=object)[mask]
+    sectors = np.asarray(sectors, dtype=object)[mask]
+    return pd.DataFrame({
+        "종목명": names,
+        "섹터": sectors,
+        "현재가": scores["latest_close"][mask].astype(np.int64),
+        "등락률": np.round(scores["change_pct"][mask], 2),
+        "거래량": scores["latest_volume"][mask].astype(np.int64),
+        "거래량비율": np.round(scores["vol_ratio"][mask], 1),
+        "연속증가일": scores["consec_days"][mask],
+        "MA20괴리": np.round(scores["ma_distance"][mask], 1),
+        "vol_score": scores["vol_score"][mask],
+        "consec_score": scores["consec_score"][mask],
+        "bounce_score": scores["bounce_score"][mask],
+        "sector_score": scores["sector_score"][mask],
+        "종합점수": scores["total"][mask],
+    }, columns=RESULT_COLUMNS)
+
+
+def exclusion_reasons(tickers, close, included):
+    """분석 대상에서 빠진 종목별 사유"""
+    n = np.isfinite(close).sum(axis=0)
+    reasons = {}
+    for i in np.flatnonzero(~np.asarray(included)):
+        if n[i] == 0:
+            reasons[tickers[i]] = "no data"
+        elif n[i] < MIN_BARS:
+            reasons[tickers[i]] = f"{n[i]} bars < {MIN_BARS}"
+        else:
+            reasons[tickers[i]] = "no volume"
+    return reasons
+
+
+def score_frame(data, tickers, sector_map, metrics=None):
+    """
+    다운로드된 OHLCV 패널 → 결과 DataFrame (기존 run_analysis 와 동일한 스키마)
+    점수 전에 품질 검사 · 분할 수정(scanner.quality)을 거친다 — 거래정지 종목은 제외.
+    시그널 4 와 같은 집계로 만든 시장 폭 표를 attrs["breadth"] 에 붙인다.
+    """
+    metrics = metrics or ScanMetrics()
+    with metrics.stage("reshape"):
+        opens, close, volume = panel_arrays(data, tickers)
+    with metrics.stage("quality"):
+        opens, close, volume, flags = clean_arrays(opens, close, volume)
+    universe = as_universe(sector_map).subset(tickers)
+    codes = universe.sector_codes
+    with metrics.stage("signals"):
+        scores = score_signals(close, opens, volume)
+        scores["included"] &= ~halted(flags)
+    record_quality(metrics, tickers, flags)
+    with metrics.stage("sector"):
+        sums, index, counts, ups = scan_breadth(scores, universe)
+        scores = apply_sector(scores, codes, counts, ups)
+    metrics.drop(exclusion_reasons(tickers, close, scores["included"]))
+    with metrics.stage("frame"):
+        frame = to_frame(scores, universe.names, universe.sectors)
+        frame.attrs["breadth"] = breadth_table(sums, index)
+        return frame
@@ -0,0 +1,152 @@
+"""
+멀티 프로세스 샤드 스캔
+
+유니버스를 샤드로 나눠 프로세스 풀에서 각자 수집·시그널 1~3 계산을 하고,
+단계별 그룹 합(scanner.breadth.group_sums — 섹터 · 세부업종 · 시장) 부분합만 돌려받아
+부모에서 더한 뒤 섹터 단계로 시그널 4를 매기고 같은 합으로 시장 폭 표를 만든다.
+섹터 집계를 전체 기준으로 다시 하므로 단일 프로세스 run_analysis() 와 결과가 같다.
+
+풀은 두 라운드로 돈다. 1 라운드(fetch_shard)는 수집만 하고 마지막 거래일의 거래량 0 봉 수를
+돌려준다 — 장 시작 전 자리 봉인지(scanner.quality.is_placeholder)는 부모가 전체 합으로
+한 번 정한다 (샤드마다 정하면 작은 샤드가 자리 봉을 거래정지로 본다).
+2 라운드(scan_shard)는 받아 둔 패널을 네트워크 없이 다시 읽어 그 판단대로 점수를 낸다.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from scanner.breadth import breadth_table, group_ids, group_sums, level_counts, universe_levels
+from scanner.core import load_panel
+from scanner.metrics import ScanMetrics
+from scanner.providers import default_provider
+from scanner.quality import clean_arrays, halted, is_placeholder, placeholder_counts, record_quality
+from scanner.scoring import (
+    apply_sector,
+    exclusion_reasons,
+    panel_arrays,
+    score_signals,
+    to_frame,
+)
+from scanner.store import PERIOD_DAYS, OHLCVStore
+from scanner.universe import as_universe
+
+
+def shard_arrays(panel, tickers):
+    if panel.empty:
+        empty = np.full((0, len(tickers)), np.nan)
+        return empty, empty, empty
+    return panel_arrays(panel, tickers)
+
+
+def fetch_shard(tickers, provider=None, store_root=None, max_age=None):
+    """
+    1 라운드 (프로세스 풀): 샤드 하나를 수집해 저장소를 채운다.
+    반환: (마지막 거래일, (거래량 0 봉 수, 유효 봉 수), 계측) — 빈 패널이면 거래일은 None
+    """
+    metrics = ScanMetrics("shard")
+    store = OHLCVStore(store_root) if store_root else None
+    panel = load_panel(tickers, provider, store, max_age, metrics)
+    if panel.empty:
+        return None, (0, 0), metrics.finish()
+    _, close, volume = shard_arrays(panel, tickers)
+    return panel.index[-1], placeholder_counts(close, volume), metrics.finish()
+
+
+def scan_shard(tickers, gid, caps, n_groups, provider=None, store_root=None, placeholder_day=None):
+    """
+    2 라운드 (프로세스 풀): 1 라운드가 받아 둔 패널 → 시그널 1~3 → 그룹별 부분합.
+    gid · n_groups 는 부모가 전체 유니버스로 매긴 그룹 번호 (breadth.group_ids),
+    placeholder_day 는 부모가 자리 봉으로 정한 거래일 (없으면 None).
+    """
+    metrics = ScanMetrics("shard")
+    with metrics.stage("reload"):
+        if store_root:
+            panel = OHLCVStore(store_root).load_panel(tickers)
+        else:
+            panel = provider(tickers, period=f"{PERIOD_DAYS}d")
+    with metrics.stage("reshape"):
+        opens, close, volume = shard_arrays(panel, tickers)
+    placeholder = not panel.empty and panel.index[-1] == placeholder_day
+    with metrics.stage("quality"):
+        opens, close, volume, flags = clean_arrays(opens, close, volume, placeholder)
+    with metrics.stage("signals"):
+        scores = score_signals(close, opens, volume)
+        scores["included"] &= ~halted(flags)
+    record_quality(metrics, tickers, flags)
+    with metrics.stage("sector"):
+        sums = group_sums(scores["change_pct"], scores["latest_volume"], caps, gid, n_groups, scores["included"])
+    metrics.drop(exclusion_reasons(tickers, close, scores["included"]))
+    return scores, sums, metrics.finish()
+
+
+def placeholder_day(probes):
+    """1 라운드 결과 → 유니버스 전체 마지막 거래일이 자리 봉이면 그 날, 아니면 None"""
+    days = [day for day, _, _ in probes if day is not None]
+    if not days:
+        return None
+    last = max(days)
+    zeros = sum(counts[0] for day, counts, _ in probes if day == last)
+    valid = sum(counts[1] for day, counts, _ in probes if day == last)
+    return last if is_placeholder(zeros, valid) else None
+
+
+def merge_shards(parts, codes, index):
+    """
+    샤드 결과를 유니버스 순서대로 잇고, 그룹 부분합을 더해 시그널 4를 매긴다.
+    반환: (점수 dict, 전체 그룹별 합)
+    """
+    scores = {key: np.concatenate([p[0][key] for p in parts]) for key in parts[0][0]}
+    sums = sum(p[1] for p in parts)
+    counts, ups = level_counts(sums, index)
+    return apply_sector(scores, codes, counts, ups), sums
+
+
+def run_sharded(sector_map=None, provider=None, store=None, max_age=None, shards=None,
+                metrics=None):
+    """
+    run_analysis() 의 멀티 프로세스 버전 — 같은 인자, 같은 결과.
+    shards 를 생략하면 CPU 코어 수만큼 나눈다.
+    """
+    metrics = metrics or ScanMetrics()
+    universe = as_universe(sector_map)
+    tickers, codes = universe.tickers, universe.sector_codes
+    gid, index = group_ids(universe, universe_levels(universe))
+    shards = max(1, min(shards or os.cpu_count() or 1, len(tickers)))
+
+    provider = provider or default_provider()
+    store_root = None
+    if provider.cacheable:
+        store = store or OHLCVStore()
+        store_root = store.root
+        # 신선도는 부모가 한 번만 판단한다 — 먼저 끝난 샤드의 갱신 시각 때문에
+        # 뒤 샤드가 수집을 건너뛰지 않도록
+        age = store.age()
+        fresh = max_age is not None and age is not None and age < max_age
+        max_age = float("inf") if fresh else None
+
+    bounds = [idx for idx in np.array_split(np.arange(len(tickers)), shards) if idx.size]
+    names = [[tickers[i] for i in idx] for idx in bounds]
+    with ProcessPoolExecutor(max_workers=shards) as pool:
+        jobs = [pool.submit(fetch_shard, batch, provider, store_root, max_age) for batch in names]
+        probes = [job.result() for job in jobs]
+        day = placeholder_day(probes)
+        jobs = [
+            pool.submit(scan_shard, batch, gid[:, idx], universe.caps[idx], len(index), provider, store_root, day)
+            for batch, idx in zip(names, bounds)
+        ]
+        parts = [job.result() for job in jobs]
+
+    for probe in probes:
+        metrics.merge(probe[2])
+    for part in parts:
+        metrics.merge(part[2])
+    metrics.count("shards", len(parts))
+    with metrics.stage("merge"):
+        scores, sums = merge_shards(parts, codes, index)
+    with metrics.stage("frame"):
+        result = to_frame(scores, universe.names, universe.sectors)
+        result.attrs["breadth"] = breadth_table(sums, index)
+    metrics.count("scored", len(result))
+    return result
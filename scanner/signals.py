@@ -0,0 +1,228 @@
+"""
+시그널 플러그인 레지스트리와 공유 특성 캐시
+
+시그널은 필요한 롤링 특성(20일 평균 거래량, MA20, 연속 증가 일수 …)을 이름으로
+선언하고, 엔진은 스캔 한 번에 각 특성을 패널 전체에 대해 한 번만 계산해 모든
+시그널이 나눠 쓴다. 시그널을 하나 더 붙이는 비용은 그 시그널이 새로 요구하는
+특성만큼만 늘어난다.
+
+    @feature("rsi14")
+    def rsi14(f):                       # f = FeatureCache — f["이름"] 으로 다른 특성을 읽는다
+        ...
+
+    @signal("rsi", needs=("rsi14",))
+    def rsi(f):
+        return {"rsi": f["rsi14"]}      # 종목 축 1차원 배열 dict
+
+    evaluate(close, opens, volume, signals=DEFAULT_SIGNALS + ("rsi",))
+
+기본 시그널 1~3 도 여기 등록돼 있으며 score_signals() 가 그대로 쓴다.
+시그널 점수를 종합점수에 더하는 것은 apply_sector() 의 4대 시그널뿐이다
+(백테스트 · 스윕으로 맞춘 구간표를 흔들지 않기 위해).
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+from scanner.scoring import (
+    BOUNCE_POINTS,
+    CONSEC_TIERS,
+    MA_BAND,
+    MIN_BARS,
+    VOL_TIERS,
+    align_valid,
+    tier_score,
+    trailing_streak,
+)
+
+Signal = namedtuple("Signal", "name needs compute")
+
+FEATURES = {}
+SIGNALS = {}
+BASE_FEATURES = ("included", "latest_close", "latest_volume", "change_pct")
+DEFAULT_SIGNALS = ("volume_surge", "volume_streak", "pullback_bounce")
+RSI_PERIOD = 14
+
+
+def feature(name):
+    """특성 등록 — fn(f) 는 종목 축 배열을 돌려준다"""
+    def register(fn):
+        FEATURES[name] = fn
+        return fn
+    return register
+
+
+def signal(name, needs=()):
+    """시그널 등록 — fn(f) 는 출력 이름 → 종목 축 배열 dict 를 돌려준다"""
+    def register(fn):
+        SIGNALS[name] = Signal(name, tuple(needs), fn)
+        return fn
+    return register
+
+
+class FeatureCache:
+    """
+    패널 한 번분의 특성 메모. 종가 결측을 종목마다 아래로 모은 배열
+    (close · open · volume, 유효 봉 수 n_bars)에서 출발하고, f["이름"] 을
+    처음 읽을 때만 계산한다.
+    """
+
+    def __init__(self, close, opens, volume):
+        close = np.asarray(close, dtype=np.float64)
+        self.n_days, self.n_tickers = close.shape
+        self.n_bars, (self.close, self.open, self.volume) = align_valid(close, opens, volume)
+        self.values = {}
+
+    def __getitem__(self, name):
+        if name not in self.values:
+            if name not in FEATURES:
+                raise KeyError(f"등록되지 않은 특성: {name}")
+            with np.errstate(invalid="ignore", divide="ignore"):
+                self.values[name] = FEATURES[name](self)
+        return self.values[name]
+
+    def zeros(self, dtype=np.float64):
+        return np.zeros(self.n_tickers, dtype=dtype)
+
+
+def evaluate(close, opens, volume, signals=DEFAULT_SIGNALS):
+    """
+    (일자 × 종목) 배열 → 기본 특성(BASE_FEATURES)과 시그널 출력을 합친 dict.
+    선언된 특성을 먼저 한 번씩 계산해 두고 시그널을 차례로 돌린다.
+    """
+    chosen = [SIGNALS[name] for name in signals]
+    missing = {n for s in chosen for n in s.needs} - set(FEATURES)
+    if missing:
+        raise KeyError(f"등록되지 않은 특성: {sorted(missing)}")
+
+    f = FeatureCache(close, opens, volume)
+    for name in dict.fromkeys(BASE_FEATURES + tuple(n for s in chosen for n in s.needs)):
+        f[name]
+    out = {name: f[name] for name in BASE_FEATURES}
+    with np.errstate(invalid="ignore", divide="ignore"):
+        for s in chosen:
+            out.update(s.compute(f))
+    return out
+
+
+# ===== 기본 특성 =====
+@feature("latest_close")
+def latest_close(f):
+    return f.close[-1] if f.n_days else f.zeros()
+
+
+@feature("latest_volume")
+def latest_volume(f):
+    return f.volume[-1] if f.n_days else f.zeros()
+
+
+@feature("included")
+def included(f):
+    return (f.n_bars >= MIN_BARS) & np.isfinite(f["latest_volume"])
+
+
+@feature("change_pct")
+def change_pct(f):
+    if f.n_days < 2:
+        return f.zeros()
+    prev = f.close[-2]
+    return np.where((f.n_bars >= 2) & (prev > 0), (f["latest_close"] - prev) / prev * 100, 0.0)
+
+
+@feature("avg_volume_20")
+def avg_volume_20(f):
+    """직전 20봉 평균 거래량 (오늘 제외)"""
+    if f.n_days < 21:
+        return np.full(f.n_tickers, np.nan)
+    return f.volume[-21:-1].mean(axis=0)
+
+
+@feature("vol_ratio")
+def vol_ratio(f):
+    if f.n_days < 21:
+        return f.zeros()
+    avg = f["avg_volume_20"]
+    return np.where((f.n_bars >= 21) & (avg > 0), f["latest_volume"] / avg, 0.0)
+
+
+@feature("volume_streak")
+def volume_streak(f):
+    return trailing_streak(f.volume)
+
+
+@feature("ma20")
+def ma20(f):
+    if f.n_days < 20:
+        return np.full(f.n_tickers, np.nan)
+    return f.close[-20:].mean(axis=0)
+
+
+@feature("ma20_ok")
+def ma20_ok(f):
+    return (f.n_bars >= 20) & (f["ma20"] > 0)
+
+
+@feature("ma_distance")
+def ma_distance(f):
+    """MA20 대비 괴리율 (%) — MA20 을 못 구하면 0"""
+    if f.n_days < 20:
+        return f.zeros()
+    ma = f["ma20"]
+    return np.where(f["ma20_ok"], (f["latest_close"] - ma) / ma * 100, 0.0)
+
+
+@feature("bullish")
+def bullish(f):
+    return f["latest_close"] > f.open[-1] if f.n_days else f.zeros(bool)
+
+
+@feature("prev_down")
+def prev_down(f):
+    """전일 하락 (전전일 종가 > 전일 종가)"""
+    if f.n_days < 3:
+        return f.zeros(bool)
+    return (f.n_bars >= 5) & (f.close[-3] > f.close[-2])
+
+
+@feature("rsi14")
+def rsi14(f):
+    """최근 RSI_PERIOD 봉 단순 평균 RSI (봉이 모자라면 NaN)"""
+    if f.n_days < RSI_PERIOD + 1:
+        return np.full(f.n_tickers, np.nan)
+    diff = np.diff(f.close[-(RSI_PERIOD + 1):], axis=0)
+    gain = np.clip(diff, 0, None).mean(axis=0)
+    loss = np.clip(-diff, 0, None).mean(axis=0)
+    rsi = np.where(loss > 0, 100 - 100 / (1 + gain / np.where(loss > 0, loss, 1)), 100.0)
+    return np.where(f.n_bars >= RSI_PERIOD + 1, rsi, np.nan)
+
+
+# ===== 기본 시그널 =====
+@signal("volume_surge", needs=("vol_ratio",))
+def volume_surge(f):
+    """시그널 1: 거래량 급증 (20일 평균 대비)"""
+    return {"vol_ratio": f["vol_ratio"], "vol_score": tier_score(f["vol_ratio"], VOL_TIERS)}
+
+
+@signal("volume_streak", needs=("volume_streak",))
+def volume_streak_signal(f):
+    """시그널 2: 연속 N일 거래량 증가"""
+    return {"consec_days": f["volume_streak"], "consec_score": tier_score(f["volume_streak"], CONSEC_TIERS)}
+
+
+@signal("pullback_bounce", needs=("ma_distance", "ma20_ok", "bullish", "prev_down"))
+def pullback_bounce(f):
+    """시그널 3: 눌림목 후 반등 (MA20 근접 + 양봉, 전일 하락이면 가산)"""
+    distance = f["ma_distance"]
+    near = f["ma20_ok"] & (distance >= MA_BAND[0]) & (distance <= MA_BAND[1])
+    bullish_near = near & f["bullish"]
+    strong, bull, touch = BOUNCE_POINTS
+    bounce = np.select([bullish_near & f["prev_down"], bullish_near, near], [strong, bull, touch], 0)
+    return {"ma_distance": distance, "bounce_score": bounce.astype(np.int64)}
+
+
+# ===== 추가 시그널 (기본 목록 밖 — signals 인자로 고른다) =====
+@signal("rsi", needs=("rsi14",))
+def rsi(f):
+    """RSI(14) 값만 — 점수화하지 않는다"""
+    return {"rsi": f["rsi14"]}
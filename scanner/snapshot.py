@@ -0,0 +1,231 @@
+"""
+열 기반 결과 스냅샷
+
+결과 한 행 = 고정 dtype 레코드 하나 (점수 int32, 비율 float32, 종목명·섹터·종목코드는
+범주 코드 int32). 레코드 배열은 .npy 로, 범주 사전과 메타는 JSON 사이드카로 저장한다.
+
+    <key>.json            사이드카 (범주 · 행 수 · 생성 시각 · 데이터 파일 이름) — 커밋 지점
+    <key>.<stamp>.npy     레코드 배열 — np.load(mmap_mode="r") 로 복사 없이 연다
+
+새 스냅샷은 데이터 파일을 먼저 다 쓴 뒤 사이드카를 원자적으로 바꿔 게시하므로,
+읽는 쪽은 항상 완전한 한 벌을 본다.
+
+필터·정렬은 스냅샷마다 한 번 만드는 SnapshotIndex 로 한다 — 섹터 · 최소 점수 · 상위 N
+조합이 전부 미리 정렬된 행 번호 배열의 O(k) 슬라이스다.
+"""
+
+import glob
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from scanner.schema import RESULT_COLUMNS
+
+KEEP_FILES = 3  # 사이드카를 막 읽은 쪽이 열 수 있도록 이전 데이터 파일을 남겨 둔다
+
+# 결과 컬럼 → (레코드 필드, dtype, 표시 반올림 자릿수)
+COLUMNS = (
+    ("종목명", "name", np.int32, None),
+    ("섹터", "sector", np.int32, None),
+    ("현재가", "price", np.int32, None),
+    ("등락률", "change_pct", np.float32, 2),
+    ("거래량", "volume", np.int64, None),
+    ("거래량비율", "vol_ratio", np.float32, 1),
+    ("연속증가일", "consec_days", np.int32, None),
+    ("MA20괴리", "ma_distance", np.float32, 1),
+    ("vol_score", "vol_score", np.int32, None),
+    ("consec_score", "consec_score", np.int32, None),
+    ("bounce_score", "bounce_score", np.int32, None),
+    ("sector_score", "sector_score", np.int32, None),
+    ("종합점수", "total", np.int32, None),
+)
+CATEGORIES = ("ticker", "name", "sector")
+RECORD_DTYPE = np.dtype([("ticker", np.int32)] + [(field, dtype) for _, field, dtype, _ in COLUMNS])
+
+# 점수 dict(score_panel 결과) 키 → 레코드 필드
+SCORE_FIELDS = {
+    "latest_close": "price",
+    "change_pct": "change_pct",
+    "latest_volume": "volume",
+    "vol_ratio": "vol_ratio",
+    "consec_days": "consec_days",
+    "ma_distance": "ma_distance",
+    "vol_score": "vol_score",
+    "consec_score": "consec_score",
+    "bounce_score": "bounce_score",
+    "sector_score": "sector_score",
+    "total": "total",
+}
+
+
+class SnapshotIndex:
+    """
+    종합점수 내림차순 행 순서(전체 · 섹터별)와 그룹별 'N점 이상 행 수' 표.
+    같은 점수는 원래 행 순서(유니버스 순서)를 따른다.
+    """
+
+    def __init__(self, records, n_sectors):
+        total = np.asarray(records["total"], dtype=np.int64)
+        sector = np.asarray(records["sector"], dtype=np.int64)
+        n = len(total)
+        self.order = np.lexsort((np.arange(n), -total))
+        by_sector = np.argsort(sector[self.order], kind="stable")
+        self.sector_order = self.order[by_sector]
+        self.sector_offsets = np.searchsorted(sector[self.sector_order], np.arange(n_sectors + 1))
+
+        # at_least[g, s] = 그룹 g 에서 s 점 이상인 행 수 (마지막 그룹 = 전체)
+        self.top = int(total.max()) if n else 0
+        width = self.top + 1
+        counts = np.bincount(sector * width + total, minlength=n_sectors * width)
+        counts = counts.reshape(n_sectors, width)
+        counts = np.vstack([counts, counts.sum(axis=0)])
+        self.at_least = counts[:, ::-1].cumsum(axis=1)[:, ::-1]
+
+    def count(self, sector=None, min_score=0):
+        if min_score > self.top:
+            return 0
+        group = -1 if sector is None else sector
+        return int(self.at_least[group, max(min_score, 0)])
+
+    def rows(self, sector=None, min_score=0, limit=None):
+        """조건에 맞는 행 번호 (점수 내림차순, 최대 limit 개)"""
+        k = self.count(sector, min_score)
+        if limit is not None:
+            k = min(k, limit)
+        if sector is None:
+            return self.order[:k]
+        start = self.sector_offsets[sector]
+        return self.sector_order[start:start + k]
+
+
+class Snapshot:
+    def __init__(self, records, categories, created=None, breadth=None):
+        self.records = records          # RECORD_DTYPE 배열 (memmap 일 수 있다)
+        self.categories = categories    # {"ticker" | "name" | "sector": [값, ...]}
+        self.created = time.time() if created is None else created
+        self.breadth = breadth          # 스캔 때 집계한 시장 폭 표 (scanner.breadth) — 없으면 None
+        self._index = None
+
+    def __len__(self):
+        return len(self.records)
+
+    # ===== 만들기 =====
+    @classmethod
+    def from_scores(cls, scores, tickers, names, sectors):
+        """점수 dict(score_panel · IncrementalScanner.scores) → 분석 대상 종목만 담은 스냅샷"""
+        mask = np.asarray(scores["included"])
+        records = np.zeros(int(mask.sum()), dtype=RECORD_DTYPE)
+        categories = {}
+        for key, values in zip(CATEGORIES, (tickers, names, sectors)):
+            codes, labels = pd.factorize(pd.Index(values))
+            records[key] = codes[mask]
+            categories[key] = list(labels)
+        digits = {field: d for _, field, _, d in COLUMNS}
+        for key, field in SCORE_FIELDS.items():
+            values = np.asarray(scores[key])[mask]
+            # 기존 결과와 같은 표시 자릿수로 (float64 에서) 반올림해 둔다
+            records[field] = values if digits[field] is None else np.round(values, digits[field])
+        return cls(records, categories)
+
+    @classmethod
+    def from_frame(cls, frame, tickers=None):
+        """
+        결과 DataFrame(RESULT_COLUMNS) → 스냅샷 (종목코드를 모르면 비워 둔다).
+        frame.attrs["breadth"] 가 있으면 시장 폭 표로 함께 담는다.
+        """
+        records = np.zeros(len(frame), dtype=RECORD_DTYPE)
+        categories = {"ticker": []}
+        if tickers is not None:
+            records["ticker"], labels = pd.factorize(pd.Index(tickers))
+            categories["ticker"] = list(labels)
+        else:
+            records["ticker"] = -1
+        for column, field, _, _ in COLUMNS:
+            if field in CATEGORIES:
+                records[field], labels = pd.factorize(frame[column])
+                categories[field] = list(labels)
+            else:
+                records[field] = frame[column].to_numpy()
+        return cls(records, categories, breadth=frame.attrs.get("breadth"))
+
+    # ===== 읽기 =====
+    @property
+    def tickers(self):
+        labels = np.asarray(self.categories["ticker"], dtype=object)
+        codes = self.records["ticker"]
+        return labels[codes] if labels.size else np.full(len(codes), None, dtype=object)
+
+    @property
+    def index(self):
+        if self._index is None:
+            self._index = SnapshotIndex(self.records, len(self.categories["sector"]))
+        return self._index
+
+    def select(self, sector=None, min_score=0, limit=None):
+        """섹터(이름) · 최소 점수 · 상위 limit 조건의 행 번호 — frame(rows) 로 꺼낸다"""
+        code = None
+        if sector is not None:
+            if sector not in self.categories["sector"]:
+                return np.zeros(0, dtype=np.int64)
+            code = self.categories["sector"].index(sector)
+        return self.index.rows(code, min_score, limit)
+
+    def column(self, column):
+        """결과 컬럼 하나 (범주는 pd.Categorical, 비율은 표시 자릿수로 반올림한 float64)"""
+        for name, field, _, digits in COLUMNS:
+            if name == column:
+                values = self.records[field]
+                if field in CATEGORIES:
+                    return pd.Categorical.from_codes(values, self.categories[field])
+                if digits is not None:
+                    return np.round(values.astype(np.float64), digits)
+                return np.asarray(values)
+        raise KeyError(column)
+
+    def frame(self, rows=None):
+        """기존 결과 스키마(RESULT_COLUMNS) DataFrame — rows 로 일부 행만 꺼낼 수 있다"""
+        if rows is not None:
+            return Snapshot(self.records[rows], self.categories, self.created).frame()
+        if not len(self.records):
+            return pd.DataFrame()
+        return pd.DataFrame({column: self.column(column) for column in RESULT_COLUMNS},
+                            columns=RESULT_COLUMNS)
+
+    # ===== 저장 =====
+    def save(self, base):
+        """base.json 사이드카 + base.<stamp>.npy 로 게시한다"""
+        stamp = f"{time.time_ns()}-{os.getpid()}"
+        data = f"{base}.{stamp}.npy"
+        np.save(data, np.ascontiguousarray(self.records))
+        sidecar = {
+            "rows": len(self.records),
+            "created": self.created,
+            "data": os.path.basename(data),
+            "categories": self.categories,
+        }
+        if self.breadth is not None:
+            sidecar["breadth"] = self.breadth.reset_index().to_dict(orient="list")
+        tmp = f"{base}.json.{stamp}.tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(sidecar, fh, ensure_ascii=False)
+        os.replace(tmp, f"{base}.json")
+
+        for old in sorted(glob.glob(f"{glob.escape(base)}.*.npy"), key=os.path.getmtime)[:-KEEP_FILES]:
+            try:
+                os.remove(old)
+            except OSError:
+                pass
+
+    @classmethod
+    def load(cls, base, mmap=True):
+        with open(f"{base}.json", encoding="utf-8") as fh:
+            sidecar = json.load(fh)
+        path = os.path.join(os.path.dirname(base), sidecar["data"])
+        records = np.load(path, mmap_mode="r" if mmap else None)
+        breadth = sidecar.get("breadth")
+        if breadth is not None:
+            breadth = pd.DataFrame(breadth).set_index(["level", "group"])
+        return cls(records, sidecar["categories"], sidecar["created"], breadth)
@@ -0,0 +1,212 @@
+"""
+로컬 OHLCV 저장소
+
+한 번 받은 일봉을 거래일별 파일(YYYY-MM-DD.npz)로 보관하고,
+실행할 때마다 종목별 마지막 저장일 이후 봉만 추가로 받아 덧붙인다.
+마지막 저장일 봉은 장중 미완성일 수 있으므로 항상 다시 받아 덮어쓴다.
+갱신할 때마다 마지막 저장일 기준 RETAIN_DAYS 달력일보다 오래된 파일은 지운다
+(가장 긴 조회 창 PERIOD_DAYS + 여유 — 저장소 · CI 캐시가 끝없이 커지지 않도록).
+"""
+
+import os
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+from scanner.metrics import ScanMetrics
+from scanner.scoring import FIELDS
+
+try:
+    import fcntl
+except ImportError:  # Windows — 프로세스 간 잠금 없이 동작
+    fcntl = None
+
+DEFAULT_STORE_DIR = os.environ.get("SCANNER_STORE_DIR", ".scanner_cache/ohlcv")
+PERIOD_DAYS = 30
+RETAIN_DAYS = PERIOD_DAYS + 15  # 보관 창 (달력일) — 휴장 · 늦은 실행 여유 포함
+_CLOSE = FIELDS.index("Close")
+
+
+@contextmanager
+def file_lock(path, blocking=True):
+    """
+    여러 프로세스가 같은 파일을 고칠 때 쓰는 배타 잠금.
+    blocking=False 면 기다리지 않고, 잠금을 잡았는지 여부(bool)를 넘긴다.
+    """
+    with open(path, "a") as fh:
+        acquired = True
+        if fcntl:
+            try:
+                fcntl.flock(fh, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                acquired = False
+        try:
+            yield acquired
+        finally:
+            if fcntl and acquired:
+                fcntl.flock(fh, fcntl.LOCK_UN)
+
+
+class OHLCVStore:
+    def __init__(self, root=DEFAULT_STORE_DIR, retain_days=RETAIN_DAYS):
+        self.root = root
+        self.retain_days = retain_days  # None 이면 지우지 않는다
+        os.makedirs(root, exist_ok=True)
+
+    # ===== 파일 단위 =====
+    def _path(self, day):
+        return os.path.join(self.root, f"{day}.npz")
+
+    def dates(self):
+        return sorted(f[:-4] for f in os.listdir(self.root) if f.endswith(".npz"))
+
+    def read_day(self, day):
+        with np.load(self._path(day)) as npz:
+            return list(npz["tickers"]), npz["values"]
+
+    def write_day(self, day, tickers, values):
+        """해당 거래일 파일에 종목 행을 병합 저장 (종가가 없는 행은 기존 값 유지)"""
+        values = np.asarray(values, dtype=np.float64)
+        ok = np.isfinite(values[:, _CLOSE])
+        rows = {}
+        if os.path.exists(self._path(day)):
+            old_tickers, old_values = self.read_day(day)
+            rows = dict(zip(old_tickers, old_values))
+        for ticker, row in zip(np.asarray(tickers)[ok], values[ok]):
+            rows[str(ticker)] = row
+        if not rows:
+            return
+        path = self._path(day)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as fh:
+            np.savez(fh, tickers=np.array(list(rows), dtype=str), values=np.stack(list(rows.values())))
+        os.replace(tmp, path)
+
+    def write_panel(self, data):
+        """
+        yf.download(group_by="ticker") 형태의 패널을 거래일별로 저장
+        (샤드 프로세스들이 동시에 써도 행이 사라지지 않도록 저장소 잠금을 잡는다)
+        """
+        if data is None or data.empty:
+            return
+        tickers = list(dict.fromkeys(data.columns.get_level_values(0)))
+        columns = pd.MultiIndex.from_product([tickers, FIELDS])
+        cube = data.reindex(columns=columns).to_numpy(dtype=np.float64)
+        cube = cube.reshape(len(data), len(tickers), len(FIELDS))
+        with file_lock(os.path.join(self.root, ".lock")):
+            for ts, values in zip(data.index, cube):
+                self.write_day(pd.Timestamp(ts).strftime("%Y-%m-%d"), tickers, values)
+
+    def prune(self, keep_days=None):
+        """
+        마지막 저장일 기준 keep_days 달력일보다 오래된 거래일 파일을 지운다.
+        반환: 지운 거래일 목록
+        """
+        keep_days = self.retain_days if keep_days is None else keep_days
+        days = self.dates()
+        if keep_days is None or not days:
+            return []
+        first = (pd.Timestamp(days[-1]) - timedelta(days=keep_days - 1)).strftime("%Y-%m-%d")
+        old = [d for d in days if d < first]
+        with file_lock(os.path.join(self.root, ".lock")):
+            for day in old:
+                try:
+                    os.remove(self._path(day))
+                except FileNotFoundError:  # 다른 프로세스가 먼저 지웠다
+                    pass
+        return old
+
+    # ===== 조회 =====
+    def window(self, period_days=PERIOD_DAYS):
+        """마지막 저장일 기준 최근 period_days 달력일에 해당하는 거래일 목록"""
+        days = self.dates()
+        if not days:
+            return []
+        first = (pd.Timestamp(days[-1]) - timedelta(days=period_days - 1)).strftime("%Y-%m-%d")
+        return [d for d in days if d >= first]
+
+    def last_dates(self, tickers):
+        """종목별 종가가 저장된 마지막 거래일 (없으면 None)"""
+        pending = set(tickers)
+        found = {}
+        for day in reversed(self.dates()):
+            if not pending:
+                break
+            day_tickers, values = self.read_day(day)
+            for ticker, close in zip(day_tickers, values[:, _CLOSE]):
+                if ticker in pending and np.isfinite(close):
+                    found[ticker] = day
+                    pending.discard(ticker)
+        return {t: found.get(t) for t in tickers}
+
+    def load_panel(self, tickers, period_days=PERIOD_DAYS):
+        """저장된 봉으로 yf.download 와 같은 (ticker, field) 컬럼 패널을 만든다"""
+        days = self.window(period_days)
+        position = {t: i for i, t in enumerate(tickers)}
+        cube = np.full((len(days), len(tickers), len(FIELDS)), np.nan)
+        for d, day in enumerate(days):
+            day_tickers, values = self.read_day(day)
+            idx = np.array([position.get(t, -1) for t in day_tickers], dtype=np.int64)
+            hit = idx >= 0
+            cube[d, idx[hit]] = values[hit]
+        columns = pd.MultiIndex.from_product([tickers, FIELDS], names=["Ticker", "Price"])
+        return pd.DataFrame(
+            cube.reshape(len(days), -1),
+            index=pd.DatetimeIndex(days, name="Date"),
+            columns=columns,
+        )
+
+    # ===== 갱신 =====
+    def age(self):
+        """마지막 갱신 후 경과 초 (갱신 이력이 없으면 None)"""
+        stamp = os.path.join(self.root, ".updated")
+        if not os.path.exists(stamp):
+            return None
+        return time.time() - os.path.getmtime(stamp)
+
+    def touch(self):
+        with open(os.path.join(self.root, ".updated"), "w") as fh:
+            fh.write(str(time.time()))
+
+    def top_up(self, tickers, download, period_days=PERIOD_DAYS, max_age=None, metrics=None):
+        """
+        마지막 저장일 이후 봉만 받아 저장소를 갱신하고 최근 패널을 돌려준다.
+        download(batch, **kwargs) 는 yf.download 와 같은 형태의 패널을 반환해야 한다.
+        max_age(초) 안에 갱신된 저장소라면 네트워크 없이 바로 읽는다.
+        metrics 에는 저장소 적중(cache_hit: 네트워크 없음, cache_topup: 새 봉만,
+        cache_miss: 전체 창) 종목 수와 수신 실패 종목을 기록한다.
+        """
+        metrics = metrics or ScanMetrics()
+        age = self.age()
+        if max_age is not None and age is not None and age < max_age:
+            metrics.count("cache_hit", len(tickers))
+            with metrics.stage("store_read"):
+                return self.load_panel(tickers, period_days)
+
+        with metrics.stage("store_read"):
+            groups = {}
+            for ticker, last in self.last_dates(tickers).items():
+                groups.setdefault(last, []).append(ticker)
+
+        for start, batch in groups.items():
+            with metrics.stage("download"):
+                if start is None:
+                    metrics.count("cache_miss", len(batch))
+                    data = download(batch, period=f"{period_days}d")
+                else:
+                    metrics.count("cache_topup", len(batch))
+                    data = download(batch, start=start)
+            metrics.drop(data.attrs.get("missing", {}))
+            with metrics.stage("store_write"):
+                self.write_panel(data)
+
+        if self.retain_days is not None:
+            with metrics.stage("store_write"):
+                pruned = self.prune(max(self.retain_days, period_days))
+            metrics.count("store_pruned", len(pruned))
+        self.touch()
+        with metrics.stage("store_read"):
+            return self.load_panel(tickers, period_days)
@@ -0,0 +1,153 @@
+"""
+시그널 구간·가중치 파라미터 스윕 (그리드 서치)
+
+백테스트 피처(compute_features)를 한 번만 계산하고, 시그널별 점수 배열도
+후보 규칙마다 한 번씩만 만들어 둔다. 조합별 종합점수는 네 시그널 점수 배열의
+합이므로, 조합 평가는 덧셈 + 집계뿐이며 모든 CPU 코어에 나눠 돌린다.
+결과는 기준 점수(min_score) 이상 종목의 h일 뒤 적중률·평균 수익률 순위표.
+
+    python -m scanner.sweep [녹화 파일] [--years 5] [--min-score 60] [--top 30] [--out sweep.csv]
+"""
+
+import argparse
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from scanner.backtest import DEFAULT_RULES, HORIZONS, forward_returns, load_history, panel_features
+from scanner.scoring import tier_score
+
+MIN_SCORE = 60
+MIN_SAMPLES = 30
+OBJECTIVE = "5일_적중률"
+
+
+def scaled(tiers, threshold=1.0, weight=1.0):
+    """구간표의 기준값·점수를 일괄 배율 조정"""
+    return tuple((round(t * threshold, 4), int(round(p * weight))) for t, p in tiers)
+
+
+def default_grid(rules=DEFAULT_RULES):
+    """현재 규칙 주변의 후보 (약 5천 조합)"""
+    vol = [scaled(rules["vol_tiers"], t, w) for t in (0.8, 1.0, 1.2, 1.5) for w in (0.5, 1.0, 1.5)]
+    consec = [
+        tuple((d + shift, int(round(p * w))) for d, p in rules["consec_tiers"])
+        for shift in (-1, 0, 1) for w in (0.5, 1.0)
+    ]
+    ma_band = [(-3.0, 5.0), (-2.0, 3.0), (-5.0, 5.0), (-3.0, 8.0)]
+    bounce = [tuple(int(round(p * w)) for p in rules["bounce_points"]) for w in (0.5, 1.0, 1.5)]
+    sector = [scaled(rules["sector_tiers"], t, w) for t in (0.9, 1.0, 1.1) for w in (0.5, 1.0)]
+    return {
+        "vol_tiers": vol,
+        "consec_tiers": consec,
+        "ma_band": ma_band,
+        "bounce_points": bounce,
+        "sector_tiers": sector,
+    }
+
+
+def signal_components(features, grid):
+    """시그널별 후보 규칙 → 점수 배열 (int8) — 조합 수가 아니라 후보 수만큼만 계산"""
+    f = features
+    vol = [tier_score(f["vol_ratio"], t).astype(np.int8) for t in grid["vol_tiers"]]
+    consec = [tier_score(f["streak"], t).astype(np.int8) for t in grid["consec_tiers"]]
+    sector = [tier_score(f["up_ratio"], t).astype(np.int8) for t in grid["sector_tiers"]]
+    bounce = []
+    with np.errstate(invalid="ignore"):
+        for low, high in grid["ma_band"]:
+            near = (f["ma_distance"] >= low) & (f["ma_distance"] <= high)
+            for strong, bullish, near_only in grid["bounce_points"]:
+                bounce.append(np.select(
+                    [near & f["bullish"] & f["prev_down"], near & f["bullish"], near],
+                    [strong, bullish, near_only],
+                    0,
+                ).astype(np.int8))
+    return vol, consec, bounce, sector
+
+
+# ===== 워커 =====
+_shared = {}
+
+
+def _init_worker(components, returns, mask, min_score):
+    _shared.update(components=components, returns=returns, mask=mask, min_score=min_score)
+
+
+def _evaluate(combos):
+    vol, consec, bounce, sector = _shared["components"]
+    returns, mask, min_score = _shared["returns"], _shared["mask"], _shared["min_score"]
+    rows = []
+    for iv, ic, ib, isec in combos:
+        total = vol[iv].astype(np.int16) + consec[ic] + bounce[ib] + sector[isec]
+        picked = mask & (total >= min_score)
+        row = {"표본": int(picked.sum())}
+        for h, ret in returns.items():
+            r = ret[picked]
+            r = r[np.isfinite(r)]
+            row[f"{h}일_적중률"] = float((r > 0).mean()) if r.size else np.nan
+            row[f"{h}일_평균"] = float(r.mean()) if r.size else np.nan
+        rows.append(row)
+    return rows
+
+
+def run_sweep(panel, sector_map=None, grid=None, min_score=MIN_SCORE, horizons=HORIZONS,
+              objective=OBJECTIVE, min_samples=MIN_SAMPLES, workers=None):
+    """모든 조합을 평가해 objective 기준 내림차순 표를 돌려준다"""
+    _, features = panel_features(panel, sector_map)
+    grid = grid or default_grid()
+    components = signal_components(features, grid)
+    returns = forward_returns(features, horizons)
+    mask = features["traded"] & features["included"]
+
+    n_bounce = len(grid["bounce_points"])
+    combos = list(itertools.product(
+        range(len(grid["vol_tiers"])), range(len(grid["consec_tiers"])),
+        range(len(components[2])), range(len(grid["sector_tiers"])),
+    ))
+    workers = workers or os.cpu_count() or 1
+    chunks = [combos[i::workers * 4] for i in range(workers * 4)]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(components, returns, mask, min_score)) as pool:
+        results = list(pool.map(_evaluate, chunks))
+
+    rows = []
+    for chunk, chunk_rows in zip(chunks, results):
+        for (iv, ic, ib, isec), metrics in zip(chunk, chunk_rows):
+            rows.append({
+                "vol_tiers": grid["vol_tiers"][iv],
+                "consec_tiers": grid["consec_tiers"][ic],
+                "ma_band": grid["ma_band"][ib // n_bounce],
+                "bounce_points": grid["bounce_points"][ib % n_bounce],
+                "sector_tiers": grid["sector_tiers"][isec],
+                **metrics,
+            })
+    table = pd.DataFrame(rows)
+    table = table[table["표본"] >= min_samples]
+    return table.sort_values([objective, "표본"], ascending=False).reset_index(drop=True)
+
+
+if __name__ == "__main__":
+    import time
+
+    parser = argparse.ArgumentParser(description="시그널 구간·가중치 그리드 서치")
+    parser.add_argument("path", nargs="?", help="녹화 파일 (.csv/.parquet) — 생략하면 기본 공급자")
+    parser.add_argument("--years", type=float, default=5)
+    parser.add_argument("--min-score", type=int, default=MIN_SCORE)
+    parser.add_argument("--objective", default=OBJECTIVE)
+    parser.add_argument("--top", type=int, default=30)
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--out", help="전체 결과 CSV 저장 경로")
+    args = parser.parse_args()
+
+    panel = load_history(args.path, args.years)
+    started = time.perf_counter()
+    table = run_sweep(panel, min_score=args.min_score, objective=args.objective, workers=args.workers)
+    elapsed = time.perf_counter() - started
+    if args.out:
+        table.to_csv(args.out, index=False)
+    with pd.option_context("display.width", 200, "display.max_colwidth", 60):
+        print(table.head(args.top).to_string(float_format=lambda x: f"{x:.3f}"))
+    print(f"\n조합 {len(table)}개 (표본 {MIN_SAMPLES}개 이상) · {elapsed:.1f}초")
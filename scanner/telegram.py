@@ -0,0 +1,316 @@
+"""
+텔레그램 전송 엔진
+
+- 연결 풀을 쓰는 requests.Session 하나를 모든 전송이 공유한다.
+- 여러 채팅방에 스레드 풀로 동시에 보내되 (채팅방 안 조각 순서는 유지)
+  전체 초당 GLOBAL_RATE 건 · 채팅방마다 CHAT_INTERVAL 초 간격을 지킨다.
+- 긴 리포트는 MAX_LENGTH 안쪽 조각으로 나눠 순서대로 보낸다 (종목 블록 단위로 자름).
+- 429 는 retry_after 만큼, 5xx · 연결 오류는 지수 백오프로 다시 보낸다.
+  그 밖의 4xx(차단 · 잘못된 chat_id)는 곧바로 실패로 남긴다.
+
+    with TelegramSender(token) as sender:
+        deliveries = sender.broadcast({chat_id: text, ...})
+
+    python -m scanner.telegram --chats 50     # 로컬 가짜 Bot API(StubTelegram)로 시험 전송
+"""
+
+import argparse
+import json
+import os
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from scanner.metrics import ScanMetrics
+
+API_BASE = os.environ.get("TELEGRAM_API", "https://api.telegram.org")  # 시험 때 StubTelegram 주소
+MAX_LENGTH = 4096     # sendMessage 본문 상한 (문자)
+GLOBAL_RATE = 30      # 봇 전체 초당 전송 수
+CHAT_INTERVAL = 1.0   # 같은 채팅방 전송 간격(초)
+WORKERS = 16
+RETRIES = 4
+BACKOFF = 1.0         # 첫 재시도 대기(초) — 이후 2배씩 늘어난다
+TIMEOUT = (5, 15)     # (연결, 응답) 초
+
+Delivery = namedtuple("Delivery", "chat_id ok sent chunks error")
+
+
+def chunk_message(text, limit=MAX_LENGTH):
+    """
+    limit 글자 안쪽 조각 목록 (순서 유지). 빈 줄로 나뉜 블록(종목 하나)을 되도록
+    한 조각에 두고, 블록이 너무 길면 줄 단위로, 줄도 너무 길면 글자 단위로 자른다.
+    """
+    if len(text) <= limit:
+        return [text]
+    pieces = []  # (원문에서 앞 조각과의 구분자, 조각)
+    for block in text.split("\n\n"):
+        if len(block) <= limit:
+            pieces.append(("\n\n", block))
+            continue
+        for j, line in enumerate(block.split("\n")):
+            for i in range(0, max(len(line), 1), limit):
+                sep = "" if i else ("\n\n" if j == 0 else "\n")
+                pieces.append((sep, line[i:i + limit]))
+
+    chunks, current = [], None
+    for sep, piece in pieces:
+        if current is None:
+            current = piece
+        elif len(current) + len(sep) + len(piece) <= limit:
+            current += sep + piece
+        else:
+            chunks.append(current)
+            current = piece
+    chunks.append(current)
+    return chunks
+
+
+class RateLimiter:
+    """
+    채팅방마다 interval 초 간격 + 봇 전체 초당 rate 건 (스레드 안전).
+    채팅방 간격을 먼저 기다린 뒤 전체 슬롯을 잡으므로, 한 채팅방이 기다리는 동안
+    다른 채팅방의 전송이 막히지 않는다.
+    """
+
+    def __init__(self, rate=GLOBAL_RATE, interval=CHAT_INTERVAL, sleep=time.sleep, clock=time.monotonic):
+        self.spacing = 1.0 / rate if rate else 0.0
+        self.interval = interval
+        self.sleep = sleep
+        self.clock = clock
+        self._next_global = 0.0
+        self._next_chat = {}
+        self._lock = threading.Lock()
+
+    def wait(self, chat_id):
+        with self._lock:
+            delay = self._next_chat.get(chat_id, 0.0) - self.clock()
+        if delay > 0:
+            self.sleep(delay)
+        with self._lock:
+            now = self.clock()
+            at = max(now, self._next_global)
+            self._next_global = at + self.spacing
+            self._next_chat[chat_id] = at + self.interval
+        if at > now:
+            self.sleep(at - now)
+
+    def defer(self, chat_id, seconds):
+        """429 응답 — 해당 채팅방의 다음 전송을 seconds 초 뒤로 미룬다"""
+        with self._lock:
+            self._next_chat[chat_id] = max(self._next_chat.get(chat_id, 0.0), self.clock() + seconds)
+
+
+def retry_after(response, default):
+    """429 응답의 대기 초 (본문 parameters.retry_after → Retry-After 헤더 → default)"""
+    try:
+        return float(response.json()["parameters"]["retry_after"])
+    except (ValueError, KeyError, TypeError):
+        pass
+    try:
+        return float(response.headers["Retry-After"])
+    except (KeyError, ValueError):
+        return default
+
+
+class TelegramSender:
+    def __init__(self, token, api_base=API_BASE, workers=WORKERS, limiter=None, retries=RETRIES,
+                 backoff=BACKOFF, timeout=TIMEOUT, parse_mode="HTML", sleep=time.sleep):
+        self.url = f"{api_base}/bot{token}/sendMessage"
+        self.workers = workers
+        self.limiter = limiter or RateLimiter(sleep=sleep)
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.parse_mode = parse_mode
+        self.sleep = sleep
+        self.retried = 0
+        self._retried_lock = threading.Lock()
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=workers)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.session.close()
+
+    def _retry(self):
+        with self._retried_lock:
+            self.retried += 1
+
+    def post(self, chat_id, text):
+        """메시지 하나 — 성공하면 None, 실패하면 마지막 오류 문자열"""
+        payload = {"chat_id": chat_id, "text": text}
+        if self.parse_mode:
+            payload["parse_mode"] = self.parse_mode
+        error = None
+        for attempt in range(self.retries + 1):
+            if attempt:
+                self._retry()
+            final = attempt == self.retries  # 마지막 시도 뒤에는 기다리지 않는다
+            self.limiter.wait(chat_id)
+            try:
+                response = self.session.post(self.url, json=payload, timeout=self.timeout)
+            except requests.RequestException as exc:
+                error = f"{type(exc).__name__}: {exc}"
+                if not final:
+                    self.sleep(self.backoff * 2 ** attempt)
+                continue
+            if response.status_code == 200:
+                return None
+            error = f"{response.status_code} {response.text[:200]}"
+            if response.status_code == 429:
+                # 채팅방 간격은 마지막 시도여도 늦춘다 — 다음 메시지도 같은 제한을 받는다
+                self.limiter.defer(chat_id, retry_after(response, self.backoff * 2 ** attempt))
+            elif response.status_code >= 500:
+                if not final:
+                    self.sleep(self.backoff * 2 ** attempt)
+            else:
+                return error
+        return error
+
+    def send(self, chat_id, text):
+        """한 채팅방에 리포트 하나 (조각을 순서대로, 한 조각이라도 실패하면 거기서 멈춘다)"""
+        chunks = chunk_message(text)
+        for i, chunk in enumerate(chunks):
+            error = self.post(chat_id, chunk)
+            if error is not None:
+                return Delivery(chat_id, False, i, len(chunks), error)
+        return Delivery(chat_id, True, len(chunks), len(chunks), None)
+
+    def broadcast(self, messages, metrics=None):
+        """
+        {chat_id: text} 또는 (chat_id, text) 목록을 동시에 보낸다 → 입력 순서의 Delivery 목록.
+        조각 k 를 모든 채팅방에 보낸 뒤 k+1 로 넘어간다 — 채팅방 안 순서는 지키면서,
+        한 채팅방이 간격을 기다리는 동안 다른 채팅방이 전송 슬롯을 쓴다.
+        metrics 에는 채팅방 · 조각 · 재시도 수와 실패한 채팅방을 기록한다.
+        """
+        metrics = metrics or ScanMetrics()
+        items = list(messages.items() if isinstance(messages, dict) else messages)
+        chunks = [chunk_message(text) for _, text in items]
+        sent = [0] * len(items)
+        errors = [None] * len(items)
+        retried = self.retried
+        with metrics.stage("send"):
+            with ThreadPoolExecutor(max_workers=max(1, min(self.workers, len(items)))) as pool:
+                for k in range(max(map(len, chunks), default=0)):
+                    active = [i for i in range(len(items)) if errors[i] is None and k < len(chunks[i])]
+                    results = pool.map(lambda i: self.post(items[i][0], chunks[i][k]), active)
+                    for i, error in zip(active, results):
+                        if error is None:
+                            sent[i] += 1
+                        else:
+                            errors[i] = error
+        deliveries = [Delivery(chat_id, errors[i] is None, sent[i], len(chunks[i]), errors[i])
+                      for i, (chat_id, _) in enumerate(items)]
+        metrics.count("chats", len(items))
+        metrics.count("chunks_sent", sum(sent))
+        metrics.count("send_retries", self.retried - retried)
+        metrics.drop({str(d.chat_id): d.error for d in deliveries if not d.ok})
+        return deliveries
+
+
+# ===== 로컬 가짜 Bot API (시험용) =====
+class StubTelegram:
+    """
+    sendMessage 만 흉내 내는 로컬 HTTP 서버. 받은 메시지를 (chat_id, text, 시각)으로 기록하고,
+    채팅방 간격(chat_interval)을 어기면 429, fail_every 번째 요청마다 502 를 돌려준다.
+    """
+
+    def __init__(self, chat_interval=CHAT_INTERVAL, fail_every=0, retry_after=1):
+        self.chat_interval = chat_interval
+        self.fail_every = fail_every
+        self.retry_after = retry_after
+        self.messages = []
+        self.responses = {}
+        self.requests = 0
+        self._last = {}
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def reply(self, chat_id, text):
+        """요청 하나에 대한 (상태 코드, 본문 dict)"""
+        now = time.monotonic()
+        with self._lock:
+            self.requests += 1
+            if self.fail_every and self.requests % self.fail_every == 0:
+                status = 502
+            elif now - self._last.get(chat_id, -1e9) < self.chat_interval * 0.9:
+                status = 429
+            else:
+                status = 200
+                self._last[chat_id] = now
+                self.messages.append((chat_id, text, now))
+            self.responses[status] = self.responses.get(status, 0) + 1
+        if status == 429:
+            return status, {"ok": False, "error_code": 429, "parameters": {"retry_after": self.retry_after}}
+        if status == 502:
+            return status, {"ok": False, "error_code": 502, "description": "Bad Gateway"}
+        return status, {"ok": True, "result": {"chat": {"id": chat_id}, "text": text}}
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                status, reply = stub.reply(body.get("chat_id"), body.get("text", ""))
+                data = json.dumps(reply).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="가짜 Bot API 로 전송 엔진 시험")
+    parser.add_argument("--chats", type=int, default=50, help="채팅방 수")
+    parser.add_argument("--length", type=int, default=6000, help="리포트 길이(글자)")
+    parser.add_argument("--fail-every", type=int, default=25, help="N 번째 요청마다 502 (0 = 끔)")
+    args = parser.parse_args()
+
+    block = "🔥 종목 [섹터] — 85점\n   12,345원 (+3.21%)\n   📊거래량 x3.2 | 📈3일연속"
+    report = "\n\n".join([block] * (args.length // (len(block) + 2) + 1))
+    with StubTelegram(fail_every=args.fail_every) as stub, TelegramSender("TEST", api_base=stub.url) as sender:
+        metrics = ScanMetrics("telegram.stub")
+        started = time.monotonic()
+        deliveries = sender.broadcast({1000 + i: report for i in range(args.chats)}, metrics)
+        elapsed = time.monotonic() - started
+
+    times = sorted(t for _, _, t in stub.messages)
+    peak = max((sum(1 for u in times if t <= u < t + 1) for t in times), default=0)
+    print(f"{args.chats}채팅방 · 조각 {sum(d.sent for d in deliveries)}개 · {elapsed:.1f}초 · "
+          f"실패 {sum(not d.ok for d in deliveries)} · 재시도 {sender.retried} · 초당 최대 {peak}건")
+    print(f"응답 {stub.responses}")
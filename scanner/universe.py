@@ -0,0 +1,331 @@
+"""
+스캔 대상 종목 유니버스
+
+상장 목록 파일(CSV · Parquet — 종목코드, 종목명, 섹터, 시장, 상장상태 + 선택으로
+세부업종 · 시가총액)을 읽어
+정수 인덱스 심볼 테이블(Universe)을 만든다. 종목별 속성은 배열로, 섹터 소속은
+섹터 코드 배열과 섹터별 행 번호(오프셋)로 한 번만 만들어 둔다.
+
+    SCANNER_UNIVERSE=listing.csv      # 기본 유니버스를 목록 파일로 (없으면 아래 SECTOR_MAP)
+
+    Universe.from_map(SECTOR_MAP).to_frame().to_csv("listing.csv", index=False)  # 목록 파일 시작점
+
+Universe 는 기존 sector_map(종목코드 → (종목명, 섹터)) 자리에 그대로 쓸 수 있다.
+"""
+
+import logging
+import os
+from collections.abc import Mapping
+from functools import cached_property, lru_cache
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LISTING = os.environ.get("SCANNER_UNIVERSE")
+LISTED = "listed"
+MARKET_SUFFIX = {"KOSPI": ".KS", "KOSDAQ": ".KQ"}
+LISTING_COLUMNS = ("ticker", "name", "sector", "market", "status", "industry", "market_cap")
+LEVEL_FIELDS = {"sector": "sectors", "industry": "industries", "market": "markets"}
+# 거래소 목록 파일의 한글 헤더 → 표준 컬럼
+COLUMN_ALIASES = {
+    "종목코드": "ticker", "단축코드": "ticker",
+    "종목명": "name", "한글 종목약명": "name",
+    "섹터": "sector", "업종": "sector", "업종명": "sector",
+    "시장": "market", "시장구분": "market",
+    "상장상태": "status",
+    "세부업종": "industry", "업종세분류": "industry",
+    "시가총액": "market_cap", "상장시가총액": "market_cap",
+}
+
+SECTOR_MAP = {
+    # 반도체
+    "005930.KS": ("삼성전자", "반도체"),
+    "000660.KS": ("SK하이닉스", "반도체"),
+    "009150.KS": ("삼성전기", "반도체"),
+    "034220.KS": ("LG디스플레이", "반도체"),
+    "067310.KQ": ("하나마이크론", "반도체"),
+    "058470.KQ": ("리노공업", "반도체"),
+    "036930.KQ": ("주성엔지니어링", "반도체"),
+    "240810.KQ": ("원익IPS", "반도체"),
+    "005290.KQ": ("동진쎄미켐", "반도체"),
+    "089030.KQ": ("테크윙", "반도체"),
+    "403870.KQ": ("HPSP", "반도체"),
+    "095340.KQ": ("ISC", "반도체"),
+    "039030.KQ": ("이오테크닉스", "반도체"),
+    "140860.KQ": ("파크시스템스", "반도체"),
+    # 2차전지
+    "373220.KS": ("LG에너지솔루션", "2차전지"),
+    "051910.KS": ("LG화학", "2차전지"),
+    "006400.KS": ("삼성SDI", "2차전지"),
+    "003670.KS": ("포스코퓨처엠", "2차전지"),
+    "247540.KQ": ("에코프로비엠", "2차전지"),
+    "086520.KQ": ("에코프로", "2차전지"),
+    "383310.KQ": ("에코프로에이치엔", "2차전지"),
+    "078600.KQ": ("대주전자재료", "2차전지"),
+    "009830.KS": ("한화솔루션", "2차전지"),
+    # 자동차
+    "005380.KS": ("현대차", "자동차"),
+    "000270.KS": ("기아", "자동차"),
+    "012330.KS": ("현대모비스", "자동차"),
+    "004020.KS": ("현대제철", "자동차"),
+    "161390.KS": ("한국타이어앤테크놀로지", "자동차"),
+    "329180.KS": ("현대오토에버", "자동차"),
+    # 바이오
+    "207940.KS": ("삼성바이오로직스", "바이오"),
+    "068270.KS": ("셀트리온", "바이오"),
+    "000100.KS": ("유한양행", "바이오"),
+    "128940.KS": ("한미약품", "바이오"),
+    "326030.KS": ("SK바이오팜", "바이오"),
+    "028300.KQ": ("HLB", "바이오"),
+    "196170.KQ": ("알테오젠", "바이오"),
+    "145020.KQ": ("휴젤", "바이오"),
+    "068760.KQ": ("셀트리온제약", "바이오"),
+    "141080.KQ": ("레고켐바이오", "바이오"),
+    "298380.KQ": ("에이비엘바이오", "바이오"),
+    "214150.KQ": ("클래시스", "바이오"),
+    # IT/플랫폼
+    "035420.KS": ("NAVER", "IT/플랫폼"),
+    "035720.KS": ("카카오", "IT/플랫폼"),
+    "018260.KS": ("삼성에스디에스", "IT/플랫폼"),
+    "377300.KQ": ("카카오페이", "IT/플랫폼"),
+    "042000.KQ": ("카페24", "IT/플랫폼"),
+    "067160.KQ": ("아프리카TV", "IT/플랫폼"),
+    # 게임/엔터
+    "036570.KS": ("엔씨소프트", "게임/엔터"),
+    "259960.KQ": ("크래프톤", "게임/엔터"),
+    "263750.KQ": ("펄어비스", "게임/엔터"),
+    "293490.KQ": ("카카오게임즈", "게임/엔터"),
+    "112040.KQ": ("위메이드", "게임/엔터"),
+    "352820.KQ": ("하이브", "게임/엔터"),
+    "041510.KQ": ("에스엠", "게임/엔터"),
+    "035900.KQ": ("JYP Ent.", "게임/엔터"),
+    "253450.KQ": ("스튜디오드래곤", "게임/엔터"),
+    # 금융
+    "105560.KS": ("KB금융", "금융"),
+    "055550.KS": ("신한지주", "금융"),
+    "086790.KS": ("하나금융지주", "금융"),
+    "316140.KS": ("우리금융지주", "금융"),
+    "024110.KS": ("기업은행", "금융"),
+    "138040.KS": ("메리츠금융지주", "금융"),
+    "000810.KS": ("삼성화재", "금융"),
+    "032830.KS": ("삼성생명", "금융"),
+    "006800.KS": ("미래에셋증권", "금융"),
+    "016360.KS": ("삼성증권", "금융"),
+    # 조선/방산
+    "009540.KS": ("한국조선해양", "조선/방산"),
+    "267250.KS": ("현대중공업", "조선/방산"),
+    "042660.KS": ("한화오션", "조선/방산"),
+    "010140.KS": ("삼성중공업", "조선/방산"),
+    "047810.KS": ("한국항공우주", "조선/방산"),
+    # 철강/소재
+    "005490.KS": ("POSCO홀딩스", "철강/소재"),
+    "010130.KS": ("고려아연", "철강/소재"),
+    "011170.KS": ("롯데케미칼", "철강/소재"),
+    "003410.KS": ("쌍용C&E", "철강/소재"),
+    "011790.KS": ("SKC", "철강/소재"),
+    "357780.KQ": ("솔브레인", "철강/소재"),
+    # 유통/소비재
+    "139480.KS": ("이마트", "유통/소비재"),
+    "002790.KS": ("아모레퍼시픽", "유통/소비재"),
+    "271560.KS": ("오리온", "유통/소비재"),
+    "021240.KS": ("코웨이", "유통/소비재"),
+    "007070.KS": ("GS리테일", "유통/소비재"),
+    "008770.KS": ("호텔신라", "유통/소비재"),
+    # 에너지/인프라
+    "096770.KS": ("SK이노베이션", "에너지/인프라"),
+    "010950.KS": ("S-Oil", "에너지/인프라"),
+    "015760.KS": ("한국전력", "에너지/인프라"),
+    "036460.KS": ("한국가스공사", "에너지/인프라"),
+    "034020.KS": ("두산에너빌리티", "에너지/인프라"),
+    # 지주/통신
+    "034730.KS": ("SK", "지주/통신"),
+    "003550.KS": ("LG", "지주/통신"),
+    "028260.KS": ("삼성물산", "지주/통신"),
+    "017670.KS": ("SK텔레콤", "지주/통신"),
+    "030200.KS": ("KT", "지주/통신"),
+    "078930.KS": ("GS", "지주/통신"),
+    "006260.KS": ("LS", "지주/통신"),
+    # 물류/운송
+    "011200.KS": ("HMM", "물류/운송"),
+    "003490.KS": ("대한항공", "물류/운송"),
+    "180640.KS": ("한진칼", "물류/운송"),
+    "047050.KS": ("포스코인터내셔널", "물류/운송"),
+}
+
+
+class Universe(Mapping):
+    """
+    정수 인덱스 심볼 테이블 — 행 i 가 종목 하나.
+    tickers(list) · names · sectors · markets · status(object 배열),
+    sector_codes(int64, 처음 나온 순서의 섹터 번호)와 sector_labels 를 가진다.
+    세부업종(industries)을 모르면 섹터와 같고, 시가총액(caps)을 모르면 NaN 이다.
+    """
+
+    def __init__(self, tickers, names, sectors, markets=None, status=None, industries=None, caps=None):
+        self.tickers = [str(t) for t in tickers]
+        self.names = np.asarray(names, dtype=object)
+        self.sectors = np.asarray(sectors, dtype=object)
+        if markets is None:
+            suffix = {v: k for k, v in MARKET_SUFFIX.items()}
+            markets = [suffix.get(t[-3:], "") for t in self.tickers]  # 접미사로 추정
+        self.markets = np.asarray(markets, dtype=object)
+        self.status = np.asarray([LISTED] * len(self.tickers) if status is None else status, dtype=object)
+        self.industries = self.sectors if industries is None else np.asarray(industries, dtype=object)
+        self.caps = np.full(len(self.tickers), np.nan) if caps is None else np.asarray(caps, dtype=np.float64)
+        codes, labels = pd.factorize(pd.Index(self.sectors))
+        self.sector_codes = codes.astype(np.int64)
+        self.sector_labels = list(labels)
+
+    @classmethod
+    def from_map(cls, sector_map):
+        """종목코드 → (종목명, 섹터) dict 로부터"""
+        tickers = list(sector_map)
+        pairs = list(sector_map.values())
+        return cls(tickers, [p[0] for p in pairs], [p[1] for p in pairs])
+
+    # ===== sector_map 호환 (Mapping) =====
+    def __getitem__(self, ticker):
+        i = self.position[ticker]
+        return self.names[i], self.sectors[i]
+
+    def __iter__(self):
+        return iter(self.tickers)
+
+    def __len__(self):
+        return len(self.tickers)
+
+    # ===== 지연 생성 색인 =====
+    @cached_property
+    def position(self):
+        """종목코드 → 행 번호"""
+        return {t: i for i, t in enumerate(self.tickers)}
+
+    @cached_property
+    def sector_order(self):
+        """섹터 코드 순으로 정렬한 행 번호 (섹터 안에서는 원래 순서)"""
+        return np.argsort(self.sector_codes, kind="stable")
+
+    @cached_property
+    def sector_offsets(self):
+        """sector_order[sector_offsets[s]:sector_offsets[s + 1]] = 섹터 s 의 행"""
+        return np.searchsorted(self.sector_codes[self.sector_order], np.arange(len(self.sector_labels) + 1))
+
+    def members(self, sector):
+        """섹터 코드 하나의 행 번호"""
+        return self.sector_order[self.sector_offsets[sector]:self.sector_offsets[sector + 1]]
+
+    @cached_property
+    def _groups(self):
+        return {"sector": (self.sector_codes, self.sector_labels)}
+
+    def group_codes(self, level):
+        """분류 단계(LEVEL_FIELDS) 하나의 (그룹 코드 int64 배열, 그룹 이름 목록)"""
+        if level not in self._groups:
+            codes, labels = pd.factorize(pd.Index(getattr(self, LEVEL_FIELDS[level])))
+            self._groups[level] = codes.astype(np.int64), list(labels)
+        return self._groups[level]
+
+    # ===== 부분 유니버스 =====
+    def take(self, rows):
+        """행 번호 순서대로 고른 부분 유니버스 (섹터 코드는 다시 매긴다)"""
+        rows = np.asarray(rows, dtype=np.int64)
+        return Universe([self.tickers[i] for i in rows], self.names[rows], self.sectors[rows],
+                        self.markets[rows], self.status[rows], self.industries[rows], self.caps[rows])
+
+    def subset(self, tickers):
+        """주어진 종목코드 순서의 부분 유니버스 (모르는 종목은 KeyError)"""
+        tickers = list(tickers)
+        if tickers == self.tickers:
+            return self
+        return self.take([self.position[t] for t in tickers])
+
+    def filter(self, markets=None, sectors=None, status=LISTED, tickers=None):
+        """시장 · 섹터 · 상장상태 · 종목코드 조건에 맞는 부분 유니버스 (원래 순서 유지)"""
+        mask = np.ones(len(self), dtype=bool)
+        if markets is not None:
+            mask &= np.isin(self.markets, list(markets))
+        if sectors is not None:
+            mask &= np.isin(self.sectors, list(sectors))
+        if status is not None:
+            mask &= self.status == status
+        if tickers is not None:
+            mask &= pd.Index(self.tickers).isin(list(tickers))
+        return self if mask.all() else self.take(np.flatnonzero(mask))
+
+    def to_frame(self):
+        return pd.DataFrame({
+            "ticker": self.tickers, "name": self.names, "sector": self.sectors,
+            "market": self.markets, "status": self.status,
+            "industry": self.industries, "market_cap": self.caps,
+        })
+
+
+def read_listing(path):
+    """상장 목록 파일 → 표준 컬럼(LISTING_COLUMNS) DataFrame"""
+    if str(path).endswith((".parquet", ".pq")):
+        frame = pd.read_parquet(path)  # pyarrow 또는 fastparquet 필요
+    else:
+        frame = pd.read_csv(path, dtype=str, keep_default_na=False)  # 종목코드 앞자리 0 유지
+    frame = frame.rename(columns=lambda c: COLUMN_ALIASES.get(str(c).strip(), str(c).strip().lower()))
+    missing = {"ticker", "name", "sector"} - set(frame.columns)
+    if missing:
+        raise ValueError(f"{path}: 목록 파일에 {sorted(missing)} 컬럼이 없습니다")
+    for column in ("market", "status", "market_cap"):
+        if column not in frame.columns:
+            frame[column] = ""
+    if "industry" not in frame.columns:
+        frame["industry"] = frame["sector"]
+    return frame[list(LISTING_COLUMNS)].fillna("").astype(str)  # 빈 칸이 "nan" · "None" 이 되지 않게
+
+
+def load_universe(path, listed_only=True):
+    """
+    상장 목록 파일 → Universe.
+    종목코드에 거래소 접미사가 없으면 시장(KOSPI/KOSDAQ)으로 .KS/.KQ 를 붙이고
+    (시장을 알 수 없으면 경고를 남기고 뺀다),
+    상장상태가 비어 있으면 상장으로 보고, 세부업종이 비어 있으면 섹터를 쓴다.
+    """
+    frame = read_listing(path)
+    ticker = frame["ticker"].str.strip()
+    market = frame["market"].str.strip().str.upper()
+    bare = ~ticker.str.contains(".", regex=False)
+    unknown = bare & ~market.isin(list(MARKET_SUFFIX))
+    if unknown.any():
+        logger.warning("%s: 시장을 알 수 없는 %d종목 제외: %s", path, int(unknown.sum()),
+                       ", ".join(ticker[unknown].head(20)))
+        frame, ticker, market, bare = frame[~unknown], ticker[~unknown], market[~unknown], bare[~unknown]
+    ticker = ticker.where(~bare, ticker.str.zfill(6) + market.map(MARKET_SUFFIX))
+    suffix = {v: k for k, v in MARKET_SUFFIX.items()}
+    market = market.where(market != "", ticker.str[-3:].map(suffix).fillna(""))
+    status = frame["status"].str.strip().str.lower().replace({"": LISTED, "상장": LISTED})
+    sector = frame["sector"].str.strip()
+    industry = frame["industry"].str.strip()
+    caps = pd.to_numeric(frame["market_cap"].str.replace(",", ""), errors="coerce")
+    universe = Universe(ticker, frame["name"].str.strip(), sector, market, status,
+                        industry.where(industry != "", sector), caps)
+    return universe.filter(status=LISTED) if listed_only else universe
+
+
+@lru_cache(maxsize=None)
+def default_universe():
+    """SCANNER_UNIVERSE 목록 파일이 있으면 그것, 아니면 SECTOR_MAP"""
+    if DEFAULT_LISTING:
+        return load_universe(DEFAULT_LISTING)
+    return Universe.from_map(SECTOR_MAP)
+
+
+def as_universe(sector_map=None):
+    """None → 기본 유니버스, dict → Universe, Universe → 그대로"""
+    if sector_map is None:
+        return default_universe()
+    if isinstance(sector_map, Universe):
+        return sector_map
+    return Universe.from_map(sector_map)
+
+
+def sector_names(sector_map=None):
+    """섹터 목록 (가나다순)"""
+    return sorted(as_universe(sector_map).sector_labels)
+
@@ -0,0 +1,30 @@
+import numpy as np
+import pandas as pd
+
+from scanner import SECTOR_MAP
+from scanner.bench import synthetic_panel
+from scanner.intraday import IntradayScanner
+
+TICKERS = list(SECTOR_MAP)
+
+
+def minute_bars(ticker, times, opens, closes, volumes):
+    return pd.DataFrame({"Ticker": ticker, "Datetime": pd.to_datetime(times).tz_localize("Asia/Seoul"),
+                         "Open": opens, "Close": closes, "Volume": volumes})
+
+
+def test_first_batch_with_two_bars_keeps_session_open():
+    daily = synthetic_panel(TICKERS, 30, nan_frac=0.0)
+    scanner = IntradayScanner.from_panel(daily, SECTOR_MAP, session_date="2026-03-02")
+    # 밀린 분봉 두 개가 늦은 봉부터 한 묶음으로 온다
+    bars = minute_bars(TICKERS[0], ["2026-03-02 09:01", "2026-03-02 09:00"],
+                       [105.0, 100.0], [106.0, 104.0], [300, 500])
+    scanner.on_minute(bars)
+    assert scanner.day_open[0] == 100.0
+    assert scanner.day_close[0] == 106.0
+    assert scanner.day_volume[0] == 800
+
+    scanner.on_minute(minute_bars(TICKERS[0], ["2026-03-02 09:02"], [107.0], [108.0], [100]))
+    assert scanner.day_open[0] == 100.0
+    assert scanner.day_close[0] == 108.0
+    assert np.isnan(scanner.day_open[1:]).all()
@@ -0,0 +1,44 @@
+import numpy as np
+
+from scanner import SECTOR_MAP
+from scanner.bench import synthetic_panel
+from scanner.incremental import IncrementalScanner
+from scanner.providers import to_long
+from scanner.quality import OUTLIER, SPLIT, clean_arrays
+from scanner.scoring import panel_arrays
+
+TICKERS = list(SECTOR_MAP)
+
+
+def spiked_panel():
+    """첫 종목의 끝에서 두 번째 봉만 분할 비율(2배)로 튀고 마지막 봉에서 되돌아간다"""
+    panel = synthetic_panel(TICKERS, 30, nan_frac=0.0)
+    panel.loc[:, (slice(None), "Volume")] += 1  # 거래량 0 봉 없이
+    for field in ("Open", "High", "Low", "Close"):
+        panel.loc[panel.index[-2], (TICKERS[0], field)] *= 2
+    return panel
+
+
+def batch_flags(panel):
+    return clean_arrays(*panel_arrays(panel, TICKERS)).flags
+
+
+def test_reverted_spike_is_outlier_not_split():
+    flags = batch_flags(spiked_panel())
+    assert flags[0] & OUTLIER
+    assert not flags[0] & SPLIT
+
+
+def test_incremental_flags_match_batch_on_reverted_spike():
+    panel = spiked_panel()
+    scanner = IncrementalScanner.from_panel(panel, SECTOR_MAP)
+    np.testing.assert_array_equal(scanner.flags, batch_flags(panel))
+
+
+def test_incremental_clears_split_when_next_bar_reverts():
+    panel = spiked_panel()
+    scanner = IncrementalScanner.from_panel(panel.iloc[:-2], SECTOR_MAP)
+    scanner.update(to_long(panel.iloc[[-2]]))
+    assert scanner.flags[0] & SPLIT
+    scanner.update(to_long(panel.iloc[[-1]]))
+    np.testing.assert_array_equal(scanner.flags, batch_flags(panel))